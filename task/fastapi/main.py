@@ -1,27 +1,478 @@
-from typing import Union
+import asyncio
+import json
+import tempfile
+import time
+from html import escape
+import xml.etree.ElementTree as ET
+import zipfile
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator, List, Optional, Tuple, TypeVar, Union
 
-from fastapi import FastAPI
+import anyio
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
+from starlette.requests import ClientDisconnect
 
-app = FastAPI()
+from task.three.converter import Metrics, Profiling
+from task.three.converter.Cache import CachedConverter
+from task.three.converter.Converter import KoreanMathConverter
+from task.three.converter.HwpxReader import HwpxReader, MemberTooLarge
+from task.three.converter.Html import TAIL, iter_html
+from task.three.converter.Limits import ConversionError, TimeLimitExceeded
+from task.three.converter.Preview import LivePreview
+from task.three.converter.Streaming import EquationExtractor
 
+NDJSON = "application/x-ndjson"
 
-class Item(BaseModel):
-    name: str
-    price: float
-    is_offer: Union[bool, None] = None
+T = TypeVar("T")
+
+# Uploads larger than this are spooled to disk instead of memory
+SPOOL_SIZE = 8 * 1024 * 1024
+# Upload bodies larger than this are refused with 413
+MAX_BODY = 64 * 1024 * 1024
+# Largest HWPX section (uncompressed) an upload may make the server inflate
+MAX_SECTION = 64 * 1024 * 1024
+# Seconds an upload may take from its first byte to its last result; 0 means no limit
+REQUEST_TIME_LIMIT = 60.0
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Converters are built once and shared by every request
+    app.state.converter = CachedConverter(KoreanMathConverter())
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+class ProfileRequests:
+    """Profile the conversions of requests that send ``X-HWP-Profile: 1``.
+
+    Only installed when HWP_PROFILE_DIR is set, so requests pay nothing
+    otherwise. The header marks the request's context; equations and
+    documents converted for it are profiled whatever HWP_PROFILE_RATE is.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.header = Profiling.HEADER.encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        value = dict(scope["headers"]).get(self.header, b"")
+        token = Profiling.request(value not in (b"", b"0"))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            Profiling.reset(token)
+
+
+if Profiling.ENABLED:
+    app.add_middleware(ProfileRequests)
+
+
+@app.exception_handler(ConversionError)
+async def conversion_error(request: Request, exc: ConversionError):
+    # Too long or too deeply nested: the input is at fault, not the server
+    return JSONResponse(status_code=422, content={"detail": str(exc)})
+
+
+class HangulExpression(BaseModel):
+    expression: str
+
+
+class LatexExpression(BaseModel):
+    latex: str
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse whose body is produced while the request body is still read.
+
+    StreamingResponse reads the request channel itself to notice a
+    disconnect, which would take body chunks from under the generator;
+    here the generator is the only reader, and a disconnect reaches it as
+    ClientDisconnect.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def _line(record: dict) -> bytes:
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _failure(e: Exception) -> str:
+    return f"{type(e).__name__}: {e}"
+
+
+def _equation(converter, equation_id: Optional[str], script: str) -> bytes:
+    # The response has already started (status 200): report the equation, keep streaming
+    try:
+        return _line({"id": equation_id, "script": script, "latex": converter.korean_to_latex(script)})
+    except ConversionError as e:
+        return _line({"id": equation_id, "script": script, "error": str(e)})
+    except Exception as e:
+        return _line({"id": equation_id, "script": script, "error": _failure(e)})
+
+
+async def _body(request: Request) -> AsyncIterator[bytes]:
+    """The request body chunk by chunk, refused with 413 once it passes MAX_BODY."""
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > MAX_BODY:
+        raise HTTPException(status_code=413, detail=f"request body over {MAX_BODY} bytes")
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > MAX_BODY:
+            raise HTTPException(status_code=413, detail=f"request body over {MAX_BODY} bytes")
+        yield chunk
+
+
+def _expired() -> TimeLimitExceeded:
+    return TimeLimitExceeded(f"request took longer than {REQUEST_TIME_LIMIT:g} s")
+
+
+def _deadline() -> float:
+    return time.monotonic() + REQUEST_TIME_LIMIT if REQUEST_TIME_LIMIT else float("inf")
+
+
+@contextmanager
+def _time_limit(deadline: float):
+    """Fail with 503 once ``deadline`` passes, before the response has started."""
+    try:
+        with anyio.fail_after(deadline - time.monotonic()):
+            yield
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail=str(_expired()))
+
+
+def _until(deadline: float, items: Iterator[T], expired: T) -> Iterator[T]:
+    """``items`` until ``deadline`` passes, then ``expired`` in place of the rest.
+
+    The status has been sent by then, so the deadline is checked as each
+    item is ready; an item is one equation or paragraph, which the script
+    limits keep short.
+    """
+    try:
+        for item in items:
+            if time.monotonic() > deadline:
+                yield expired
+                return
+            yield item
+    finally:
+        items.close()
+
+
+async def _open_hwpx(request: Request) -> Tuple[HwpxReader, tempfile.SpooledTemporaryFile]:
+    """Spool the body (zip needs random access) and open it, its members' sizes checked."""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    try:
+        async for chunk in _body(request):
+            # Writes past SPOOL_SIZE go to disk, so they run off the event loop
+            await run_in_threadpool(spool.write, chunk)
+        spool.seek(0)
+        reader = await run_in_threadpool(HwpxReader, spool, MAX_SECTION)
+    except zipfile.BadZipFile:
+        spool.close()
+        raise HTTPException(status_code=400, detail="not an HWPX (zip) document")
+    except BaseException:
+        spool.close()
+        raise
+
+    try:
+        await run_in_threadpool(reader.sections)
+        return reader, spool
+    except MemberTooLarge as e:
+        error = HTTPException(status_code=413, detail=str(e))
+    except (KeyError, zipfile.BadZipFile, ET.ParseError) as e:
+        error = HTTPException(status_code=400, detail=f"not an HWPX document: {_failure(e)}")
+    except BaseException:
+        reader.close()
+        spool.close()
+        raise
+    reader.close()
+    spool.close()
+    raise error
 
 
 @app.get("/")
 def read_root():
-    return {"Hello": "World"}
+    return {"status": "ok"}
+
+
+@app.post("/convert/latex")
+def to_latex(body: HangulExpression, request: Request):
+    return {"latex": request.app.state.converter.korean_to_latex(body.expression)}
+
+
+@app.post("/convert/mathml")
+def to_mathml(body: HangulExpression, request: Request):
+    """Presentation MathML; cached per script like the LaTeX, so each is rendered once."""
+    return {"mathml": request.app.state.converter.korean_to_mathml(body.expression)}
+
+
+@app.post("/convert/hangul")
+def to_hangul(body: LatexExpression, request: Request):
+    return {"expression": request.app.state.converter.latex_to_korean(body.latex)}
+
+
+@app.get("/cache")
+def cache_stats(request: Request):
+    return request.app.state.converter.stats.as_dict()
+
+
+@app.get("/metrics")
+def metrics():
+    """Per-stage latency histograms in Prometheus text format (HWP_METRICS=1)."""
+    text = Metrics.render()
+    if text is None:
+        raise HTTPException(status_code=404, detail="metrics are disabled; set HWP_METRICS=1")
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+
+@app.post("/upload/hml")
+async def upload_hml(request: Request):
+    """Raw HML body, parsed chunk by chunk as it arrives; only the scripts are kept.
+
+    Parsing runs in the thread pool, so a large document does not hold up
+    the event loop. A body over MAX_BODY is refused with 413; past
+    REQUEST_TIME_LIMIT the request fails with 503, or ends with an error
+    record once the results have started.
+    """
+    converter = request.app.state.converter
+    deadline = _deadline()
+    extractor = EquationExtractor()
+    equations = []
+    with _time_limit(deadline):
+        try:
+            async for chunk in _body(request):
+                equations.extend(await run_in_threadpool(extractor.feed, chunk))
+            equations.extend(await run_in_threadpool(extractor.close))
+        except ET.ParseError as e:
+            raise HTTPException(status_code=400, detail=f"not an HML document: {e}")
+
+    def results() -> Iterator[bytes]:
+        for equation_id, script in equations:
+            yield _equation(converter, equation_id, script)
+
+    expired = _line({"error": _failure(_expired())})
+    return StreamingResponse(Profiling.profiled_iter("upload_hml", _until(deadline, results(), expired)),
+                             media_type=NDJSON)
+
+
+@app.post("/upload/hwpx")
+async def upload_hwpx(request: Request):
+    """Raw HWPX body; zip needs random access, so chunks go to a spooled file.
+
+    Limited like ``/upload/hml``; a section over MAX_SECTION uncompressed
+    is refused with 413 before any is inflated.
+    """
+    converter = request.app.state.converter
+    deadline = _deadline()
+    with _time_limit(deadline):
+        reader, spool = await _open_hwpx(request)
+
+    def results() -> Iterator[bytes]:
+        try:
+            for _, equation_id, script in reader.iter_equations():
+                yield _equation(converter, equation_id, script)
+        except (OSError, KeyError, zipfile.BadZipFile, ET.ParseError) as e:
+            # A broken section after the response started: end with an error record
+            yield _line({"error": _failure(e)})
+        finally:
+            reader.close()
+            spool.close()
+
+    expired = _line({"error": _failure(_expired())})
+    return StreamingResponse(Profiling.profiled_iter("upload_hwpx", _until(deadline, results(), expired)),
+                             media_type=NDJSON)
+
+
+@app.post("/export/html")
+async def export_html(request: Request, mathml: bool = False):
+    """Raw HWPX body exported as a MathJax HTML page, one paragraph per chunk.
+
+    With ``?mathml=true`` the equations are MathML and the page needs no MathJax.
+    Limited like ``/upload/hwpx``; past the time limit the page ends with an
+    error paragraph.
+    """
+    converter = request.app.state.converter
+    deadline = _deadline()
+    with _time_limit(deadline):
+        reader, spool = await _open_hwpx(request)
+
+    method = converter.korean_to_mathml if mathml else converter.korean_to_latex
+
+    def convert(script: str) -> str:
+        try:
+            return method(script)
+        except ConversionError:
+            raise
+        except Exception as e:
+            # Shown as text like a script over the limits, instead of ending the page
+            raise ConversionError(_failure(e)) from e
+
+    def results() -> Iterator[str]:
+        try:
+            yield from iter_html(reader.iter_document(), convert, mathml=mathml)
+        except (OSError, KeyError, zipfile.BadZipFile, ET.ParseError) as e:
+            yield f'<p class="error">{escape(_failure(e))}</p>\n{TAIL}'
+        finally:
+            reader.close()
+            spool.close()
+
+    expired = f'<p class="error">{escape(_failure(_expired()))}</p>\n{TAIL}'
+    return StreamingResponse(Profiling.profiled_iter("export_html", _until(deadline, results(), expired)),
+                             media_type="text/html; charset=utf-8")
+
+
+def _convert_record(converter, line: bytes) -> dict:
+    """One NDJSON batch line: ``{"id", "expression"}`` or ``{"id", "latex"}``."""
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return {"error": f"invalid JSON: {e}"}
+    if not isinstance(record, dict):
+        return {"error": "expected a JSON object"}
+
+    result: dict = {"id": record.get("id")}
+    expression: Union[str, None] = record.get("expression")
+    latex: Union[str, None] = record.get("latex")
+    try:
+        if isinstance(expression, str):
+            result["latex"] = converter.korean_to_latex(expression)
+        elif isinstance(latex, str):
+            result["expression"] = converter.latex_to_korean(latex)
+        else:
+            result["error"] = 'expected "expression" or "latex"'
+    except ConversionError as e:
+        result["error"] = str(e)
+    except Exception as e:
+        result["error"] = _failure(e)
+    return result
+
+
+def _convert_lines(converter, lines: List[bytes], session: Optional[Profiling.Session] = None) -> bytes:
+    if session is not None:
+        with session.step():
+            return _convert_lines(converter, lines)
+    return b"".join(_line(_convert_record(converter, line)) for line in lines)
+
+
+@app.post("/batch")
+async def batch(request: Request):
+    """NDJSON in, NDJSON out: each line is written back as soon as it is converted.
+
+    The complete lines of each chunk are converted in the thread pool and
+    sent while the rest of the body is still arriving, so the first
+    results go out before the upload ends and memory holds about a chunk.
+    """
+    converter = request.app.state.converter
+
+    async def results() -> AsyncIterator[bytes]:
+        # One profiled run for the whole response, each chunk a step of it
+        session = Profiling.start("batch")
+        # The line still being received, in pieces; only new chunks are split
+        tail: List[bytes] = []
+        try:
+            async for chunk in request.stream():
+                *complete, rest = chunk.split(b"\n")
+                if complete:
+                    complete[0] = b"".join(tail) + complete[0]
+                    tail = []
+                    lines = [line for line in complete if line.strip()]
+                    if lines:
+                        yield await run_in_threadpool(_convert_lines, converter, lines, session)
+                if rest:
+                    tail.append(rest)
+            last = b"".join(tail)
+            if last.strip():
+                yield await run_in_threadpool(_convert_lines, converter, [last], session)
+        except ClientDisconnect:
+            return
+        finally:
+            if session is not None:
+                await run_in_threadpool(session.close)
+
+    return DuplexStreamingResponse(results(), media_type=NDJSON)
+
+
+class PreviewConnection:
+    """Parse state and pending render of one ``/ws/preview`` client."""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.session = LivePreview()
+        self.seq = None
+        self.generation = 0
+        self.changed = asyncio.Event()
+
+    def apply(self, message: str) -> Optional[str]:
+        """Apply ``{"seq", "script"}`` or ``{"seq", "start", "end", "text"}``; an error message if neither."""
+        try:
+            record = json.loads(message)
+        except ValueError as e:
+            return f"invalid JSON: {e}"
+        if not isinstance(record, dict):
+            return "expected a JSON object"
+
+        if isinstance(record.get("script"), str):
+            self.session.text = record["script"]
+        elif (isinstance(record.get("start"), int) and isinstance(record.get("end"), int)
+              and isinstance(record.get("text"), str)):
+            self.session.edit(record["start"], record["end"], record["text"])
+        else:
+            return 'expected "script" or "start", "end" and "text"'
+        self.seq = record.get("seq")
+        self.generation += 1
+        self.changed.set()
+        return None
+
+    async def receive(self):
+        while True:
+            error = self.apply(await self.websocket.receive_text())
+            if error is not None:
+                await self.websocket.send_json({"error": error})
 
+    async def render(self):
+        while True:
+            # Render as soon as anything changed; edits that arrive while a
+            # render runs set the event again and are rendered together next
+            await self.changed.wait()
+            self.changed.clear()
+            generation, seq = self.generation, self.seq
+            try:
+                latex = await run_in_threadpool(self.session.render, lambda: self.generation != generation)
+            except ConversionError as e:
+                if self.generation == generation:
+                    await self.websocket.send_json({"seq": seq, "error": str(e)})
+                continue
+            # A newer edit arrived meanwhile: its own render replaces this one
+            if latex is not None and self.generation == generation:
+                await self.websocket.send_json({"seq": seq, "latex": latex})
 
-@app.get("/items/{item_id}")
-def read_item(item_id: int, q: Union[str, None] = None):
-    return {"item_id": item_id, "q": q}
 
+@app.websocket("/ws/preview")
+async def live_preview(websocket: WebSocket):
+    """LaTeX preview while typing: send edits, get the LaTeX of the newest text back.
 
-@app.put("/items/{item_id}")
-def update_item(item_id: int, item: Item):
-    return {"item_name": item.name, "item_id": item_id}
\ No newline at end of file
+    Each connection keeps its script's segments, so an edit reparses only
+    the segments around it. Renders run off the event loop; one that is
+    overtaken by a newer edit stops early and is never sent.
+    """
+    await websocket.accept()
+    connection = PreviewConnection(websocket)
+    renderer = asyncio.create_task(connection.render())
+    try:
+        await connection.receive()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        renderer.cancel()
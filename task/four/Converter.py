@@ -1,127 +1,135 @@
 import re
-from typing import Dict, List, Tuple
+from types import MappingProxyType
+
+from task.three.converter.Ast import Number, Row, Scripts
+from task.three.converter.Emitter import PlainEmitter
+from task.three.converter.LatexParser import parse_latex
+from task.three.converter.Metrics import timed
+from task.three.converter.Rules import formula_profile
+
+
+class FormulaEmitter(PlainEmitter):
+    """PlainEmitter that writes numeric subscripts as plain digits (x_{1} -> x1)."""
+
+    def _scripts(self, node: Scripts):
+        sub = self._inner(node.sub) if node.sub is not None else None
+        if type(sub) is Row and len(sub.children) == 1:
+            sub = sub.children[0]
+        if node.base is None or type(sub) is not Number:
+            return super()._scripts(node)
+
+        # 숫자 아래첨자는 convert_korean_to_latex의 x1 -> x_{1} 규칙의 역
+        parts = [node.base, sub.text]
+        if node.sup is not None:
+            parts += self._script('^', node.sup)
+        return parts
+
+
+# 기본 수학 기호 매핑
+KOREAN_TO_LATEX_MAP = MappingProxyType({
+    '≤': r'\leq',
+    '≥': r'\geq',
+    '×': r'\times',
+    '÷': r'\div',
+    '±': r'\pm',
+    '∓': r'\mp',
+    '→': r'\rightarrow',
+    '←': r'\leftarrow',
+    '↔': r'\leftrightarrow',
+    '∴': r'\therefore',
+    '∵': r'\because',
+    '∞': r'\infty',
+    '≠': r'\neq',
+    '≈': r'\approx',
+    '∀': r'\forall',
+    '∃': r'\exists',
+    '∄': r'\nexists',
+    '∈': r'\in',
+    '∉': r'\notin',
+    '⊂': r'\subset',
+    '⊃': r'\supset',
+    '⊆': r'\subseteq',
+    '⊇': r'\supseteq',
+    '∪': r'\cup',
+    '∩': r'\cap',
+    '∅': r'\emptyset'
+})
+
+# 함수 매핑
+FUNCTION_MAP = MappingProxyType({
+    'sin': r'\sin',
+    'cos': r'\cos',
+    'tan': r'\tan',
+    'log': r'\log',
+    'ln': r'\ln',
+    'lim': r'\lim',
+    'max': r'\max',
+    'min': r'\min'
+})
+
+# 괄호 매핑
+BRACKET_MAP = MappingProxyType({
+    '(': r'\left(',
+    ')': r'\right)',
+    '[': r'\left[',
+    ']': r'\right]',
+    '{': r'\left\{',
+    '}': r'\right\}'
+})
+
+# 역변환: LaTeX 수식 트리를 기호 문자로 출력하는 에미터
+FORMULA_EMITTER = FormulaEmitter({
+    **{v: k for k, v in KOREAN_TO_LATEX_MAP.items()},
+    **{v: k for k, v in FUNCTION_MAP.items()}
+})
+
+# 분수/기호/첨자/제곱 규칙을 하나의 정규식으로 합쳐 한 번에 적용
+FORMULA_RULES = formula_profile({**KOREAN_TO_LATEX_MAP, **FUNCTION_MAP, **BRACKET_MAP})
+
+# 전처리 정규식
+SPACE_PATTERN = re.compile(r'\s+')
+FRACTION_PATTERN = re.compile(r'(?<!\d)(\d+)/(\d+)')
+LEFT_RIGHT_PATTERN = re.compile(r'\\left|\\right')
+
 
 class MathFormulaConverter:
+    # 출력이 바뀌면 올려서 캐시·매니페스트에 남은 이전 결과를 쓰지 않게 함
+    VERSION = '4'
+
     def __init__(self):
-        # 기본 수학 기호 매핑
-        self.korean_to_latex_map = {
-            '≤': r'\leq',
-            '≥': r'\geq',
-            '×': r'\times',
-            '÷': r'\div',
-            '±': r'\pm',
-            '∓': r'\mp',
-            '→': r'\rightarrow',
-            '←': r'\leftarrow',
-            '↔': r'\leftrightarrow',
-            '∴': r'\therefore',
-            '∵': r'\because',
-            '∞': r'\infty',
-            '≠': r'\neq',
-            '≈': r'\approx',
-            '∀': r'\forall',
-            '∃': r'\exists',
-            '∄': r'\nexists',
-            '∈': r'\in',
-            '∉': r'\notin',
-            '⊂': r'\subset',
-            '⊃': r'\supset',
-            '⊆': r'\subseteq',
-            '⊇': r'\supseteq',
-            '∪': r'\cup',
-            '∩': r'\cap',
-            '∅': r'\emptyset'
-        }
-
-        # 함수 매핑
-        self.function_map = {
-            'sin': r'\sin',
-            'cos': r'\cos',
-            'tan': r'\tan',
-            'log': r'\log',
-            'ln': r'\ln',
-            'lim': r'\lim',
-            'max': r'\max',
-            'min': r'\min'
-        }
-
-        # 괄호 매핑
-        self.bracket_map = {
-            '(': r'\left(',
-            ')': r'\right)',
-            '[': r'\left[',
-            ']': r'\right]',
-            '{': r'\left\{',
-            '}': r'\right\}'
-        }
+        # 규칙 테이블과 정규식은 모듈 로드 시 한 번만 만들고 모든 인스턴스가 공유
+        self.korean_to_latex_map = KOREAN_TO_LATEX_MAP
+        self.function_map = FUNCTION_MAP
+        self.bracket_map = BRACKET_MAP
+        self.formula_emitter = FORMULA_EMITTER
+        self.rules = FORMULA_RULES
+        # 기호 매핑·분수 등 규칙 치환 단계 (HWP_METRICS가 없으면 원래 함수 그대로)
+        self._rewrite = timed('rule_rewrite', self.rules.sub)
 
     def preprocess_korean_formula(self, formula: str) -> str:
-        """한글 수식 전처리"""
-        # 불필요한 공백 제거
-        formula = re.sub(r'\s+', ' ', formula.strip())
-
-        # 분수 표현 정규화
-        formula = re.sub(r'(\d+)/(\d+)', r'\\frac{\1}{\2}', formula)
-
-        return formula
+        """한글 수식 전처리 (공백 정리, 분수 정규화)"""
+        # 변환은 규칙 엔진이 한 번에 하므로 이 단계를 쓰지 않지만, 공개 메서드라 그대로 둠
+        formula = SPACE_PATTERN.sub(' ', formula.strip())
+        return FRACTION_PATTERN.sub(r'\\frac{\1}{\2}', formula)
 
     def convert_korean_to_latex(self, formula: str) -> str:
         """한글 수식을 LaTeX로 변환"""
-        formula = self.preprocess_korean_formula(formula)
-
-        # 기본 수학 기호 변환
-        for k, v in self.korean_to_latex_map.items():
-            formula = formula.replace(k, v)
-
-        # 함수 변환
-        for k, v in self.function_map.items():
-            formula = re.sub(r'\b' + re.escape(k) + r'\b', v, formula)
-
-        # 괄호 변환
-        for k, v in self.bracket_map.items():
-            formula = formula.replace(k, v)
-
-        # 첨자 처리
-        formula = re.sub(r'([a-zA-Z])(\d+)', r'\1_{\2}', formula)
-
-        # 제곱 처리
-        formula = re.sub(r'\^(\d+)', r'^{\1}', formula)
+        formula = SPACE_PATTERN.sub(' ', formula.strip())
 
-        return formula
+        # 분수, 기호/함수/괄호, 첨자, 제곱을 한 번의 스캔으로 변환
+        # (치환 결과는 다시 검사하지 않으므로 \frac{1}{2}의 중괄호가 \left\{로 바뀌지 않음)
+        return self._rewrite(formula)
 
     def preprocess_latex_formula(self, formula: str) -> str:
-        """LaTeX 수식 전처리"""
-        # LaTeX 명령어 정규화
-        formula = formula.replace('\\left', '').replace('\\right', '')
-        formula = re.sub(r'\s+', ' ', formula.strip())
-        return formula
+        """LaTeX 수식 전처리 (\\left/\\right 제거, 공백 정리)"""
+        # 변환은 LaTeX 파서가 하므로 이 단계를 쓰지 않지만, 공개 메서드라 그대로 둠
+        formula = LEFT_RIGHT_PATTERN.sub('', formula)
+        return SPACE_PATTERN.sub(' ', formula.strip())
 
     def convert_latex_to_korean(self, formula: str) -> str:
         """LaTeX 수식을 한글로 변환"""
-        formula = self.preprocess_latex_formula(formula)
-
-        # LaTeX를 한글로 변환하기 위한 역매핑 생성
-        latex_to_korean_map = {v: k for k, v in self.korean_to_latex_map.items()}
-
-        # 기본 수학 기호 변환
-        for k, v in latex_to_korean_map.items():
-            formula = formula.replace(k, v)
-
-        # 함수 변환
-        latex_to_function_map = {v: k for k, v in self.function_map.items()}
-        for k, v in latex_to_function_map.items():
-            formula = formula.replace(k, v)
-
-        # 분수 변환
-        formula = re.sub(r'\\frac\{(\d+)\}\{(\d+)\}', r'\1/\2', formula)
-
-        # 첨자 변환
-        formula = re.sub(r'_\{(\d+)\}', r'\1', formula)
-
-        # 제곱 변환
-        formula = re.sub(r'\^\{(\d+)\}', r'^{\1}', formula)
-
-        return formula
+        # \left/\right, 중첩 \frac, 첨자를 한 번의 파싱으로 처리
+        return self.formula_emitter.emit(parse_latex(formula))
 
 
 def test_converter():
@@ -145,4 +153,8 @@ def test_converter():
 
         # 역변환 테스트
         reverse = converter.convert_latex_to_korean(result)
-        print(f"역변환 결과: {reverse}")
\ No newline at end of file
+        print(f"역변환 결과: {reverse}")
+
+
+if __name__ == "__main__":
+    test_converter()
@@ -1,92 +1,32 @@
-import re
-from typing import Dict, List, Optional
+from task.three.converter.Emitter import HwpEmitter, LatexEmitter
+from task.three.converter.LatexParser import parse_latex
+from task.three.converter.Parser import parse
 
 
-class MathExpressionConverter:
-    def __init__(self):
-        self.korean_to_latex_map = {
-            # Basic operators
-            'TIMES': r'\times',
-            'over': r'\frac',
-            'LEFT': r'\left',
-            'RIGHT': r'\right',
-
-            # Special symbols
-            'SMALLINTER': r'\cap',
-            '^{C}': r'^{\complement}',
-
-            # Function names
-            'P': r'\mathrm{P}',
-            'C': r'\mathrm{C}',
-        }
+# Emitters hold no per-call state, so every converter shares them
+LATEX_EMITTER = LatexEmitter()
+HWP_EMITTER = HwpEmitter()
 
-        self.latex_to_korean_map = {v: k for k, v in self.korean_to_latex_map.items()}
 
-    def parse_korean_expression(self, expression: str) -> List[str]:
-        """Parse Korean mathematical expression into tokens."""
-        # Remove 'rm' prefix if exists
-        expression = expression.replace('rm ', '')
-
-        # Split by spaces but keep parentheses together
-        tokens = []
-        current_token = ''
-        paren_count = 0
-
-        for char in expression:
-            if char == ' ' and paren_count == 0:
-                if current_token:
-                    tokens.append(current_token)
-                    current_token = ''
-            else:
-                if char == '(':
-                    paren_count += 1
-                elif char == ')':
-                    paren_count -= 1
-                current_token += char
+class MathExpressionConverter:
+    """three's parser and emitters under the original names; the output is three's."""
 
-        if current_token:
-            tokens.append(current_token)
+    # Bump when conversion output changes so cached results are not reused
+    VERSION = '3'
 
-        return tokens
+    def __init__(self):
+        self.latex_emitter = LATEX_EMITTER
+        self.hwp_emitter = HWP_EMITTER
 
     def korean_to_latex(self, expression: str) -> str:
         """Convert Korean mathematical expression to LaTeX."""
-        tokens = self.parse_korean_expression(expression)
-        latex_tokens = []
-
-        i = 0
-        while i < len(tokens):
-            token = tokens[i]
-
-            # Handle fractions
-            if token == 'over':
-                # Extract numerator and denominator
-                numerator = latex_tokens.pop()
-                i += 1
-                denominator = tokens[i]
-                latex_tokens.append(f'\\frac{{{numerator}}}{{{denominator}}}')
-
-            # Handle special functions and symbols
-            elif token in self.korean_to_latex_map:
-                latex_tokens.append(self.korean_to_latex_map[token])
-
-            # Handle regular tokens
-            else:
-                latex_tokens.append(token)
-
-            i += 1
-
-        return ''.join(latex_tokens)
+        # Parse into an equation AST in one pass and emit LaTeX from it
+        return self.latex_emitter.emit(parse(expression))
 
     def latex_to_korean(self, expression: str) -> str:
         """Convert LaTeX expression to Korean mathematical expression."""
-        # This is a simplified version - would need more complex parsing for complete conversion
-        korean_expr = expression
-
-        for latex_symbol, korean_symbol in self.latex_to_korean_map.items():
-            korean_expr = korean_expr.replace(latex_symbol, korean_symbol)
-
-        return korean_expr
+        # Parse the LaTeX into the same equation AST and write it back as HWP script
+        return self.hwp_emitter.emit(parse_latex(expression))
 
 
 def test_converter():
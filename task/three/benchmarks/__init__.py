@@ -0,0 +1,13 @@
+import os
+from typing import List
+
+from ..converter.HwpxReader import HwpxReader
+
+
+SAMPLE_HWPX = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'sample2.hwpx')
+
+
+def sample_scripts(path: str = SAMPLE_HWPX) -> List[str]:
+    """Return every equation script of the sample exam document."""
+    with HwpxReader(path) as reader:
+        return [script for _, _, script in reader.iter_equations()]
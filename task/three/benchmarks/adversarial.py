@@ -0,0 +1,86 @@
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .suite import ENGINES
+from ..converter.Converter import KoreanMathConverter
+from ..converter.Converter2 import MathConverter as MathConverter2
+from ..converter.Limits import ConversionError
+from task.four.Converter import MathFormulaConverter
+
+# Repetitions of each family's unit; the output is linear if the time grows like the size
+SIZES = (500, 1000, 2000, 4000)
+# Growth of time per character from the smallest to the largest size that counts as superlinear
+SUPERLINEAR = 2.5
+
+# family -> script of ``n`` repetitions
+FAMILIES: Dict[str, Callable[[int], str]] = {
+    'deep braces': lambda n: '{' * n + 'x' + '}' * n,
+    'nested over': lambda n: '{1 over ' * n + 'x' + '}' * n,
+    'over chain': lambda n: ' over '.join(['a'] * n),
+    'leading over': lambda n: 'over ' * n,
+    'unclosed {': lambda n: '{' * n,
+    'unclosed (': lambda n: '(' * n,
+    'stray }': lambda n: '}' * n,
+    'LEFT chain': lambda n: 'LEFT ( ' * n + 'x',
+    'sqrt chain': lambda n: 'sqrt ' * n + 'x',
+    'script chain': lambda n: '^'.join(['x'] * n),
+    'matrix{ chain': lambda n: 'matrix{' * n,
+    'long word': lambda n: 'a' * n,
+    'long number': lambda n: '1' * n,
+    'letters, digits': lambda n: 'a1' * n,
+    'subscript run': lambda n: 'a_' * n,
+    'unclosed [[': lambda n: '[[' * n,
+    'unclosed √{': lambda n: '√{' * n,
+    r'\frac{ chain': lambda n: r'\frac{' * n,
+    r'nested \frac': lambda n: r'\frac{1}{' * n + 'x' + '}' * n,
+    r'\over chain': lambda n: r' \over '.join(['a'] * n),
+}
+
+
+def engines() -> List[Tuple[str, Callable[[str], str]]]:
+    """Every HWP -> LaTeX path of the suite plus the LaTeX parsers of the reverse direction."""
+    converters = [(name, getattr(cls(), method)) for name, (cls, method) in ENGINES.items()]
+    converters += [
+        ('three.latex_to_korean', KoreanMathConverter().latex_to_korean),
+        ('Converter2.latex_to_hangul', MathConverter2().latex_to_hangul),
+        ('four.convert_latex_to_korean', MathFormulaConverter().convert_latex_to_korean),
+    ]
+    return converters
+
+
+def measure(convert: Callable[[str], str], script: str, repeat: int = 3) -> Tuple[float, Optional[str]]:
+    """Best time of ``repeat`` runs and the outcome: None, ``rejected`` or the exception name."""
+    best = float('inf')
+    outcome = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            convert(script)
+        except ConversionError:
+            outcome = 'rejected'
+        except Exception as e:
+            outcome = type(e).__name__
+        best = min(best, time.perf_counter() - start)
+    return best, outcome
+
+
+def main():
+    print(f"{'family':<16} {'engine':<30} {'us/char':>8} {'growth':>7}  outcome")
+    failures = 0
+    for family, build in FAMILIES.items():
+        for name, convert in engines():
+            scripts = [build(n) for n in SIZES]
+            results = [measure(convert, script) for script in scripts]
+            (first, _), (last, outcome) = results[0], results[-1]
+            # Time per character at the largest size over that at the smallest
+            growth = (last / len(scripts[-1])) / (first / len(scripts[0])) if first else 0.0
+            flag = outcome or 'ok'
+            if growth > SUPERLINEAR or outcome not in (None, 'rejected'):
+                flag += '  <-- superlinear' if growth > SUPERLINEAR else ''
+                failures += 1
+            print(f"{family:<16} {name:<30} {last / len(scripts[-1]) * 1e6:8.3f} {growth:7.2f}  {flag}")
+    print(f"{failures} paths superlinear or failing")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import random
+import time
+from typing import Callable, List
+
+from . import sample_scripts
+from ..converter.Bulk import STRUCTURE_PATTERN
+from ..converter.Converter import KoreanMathConverter
+
+SHORT_SCRIPTS = 200_000
+
+
+def measure(func: Callable[[], object], repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def short_scripts(scripts: List[str], count: int = SHORT_SCRIPTS, seed: int = 0) -> List[str]:
+    """``count`` scripts drawn from the sample's flat ones (``1``, ``=5``, ``x``)."""
+    flat = [script for script in scripts if STRUCTURE_PATTERN.search(script) is None]
+    rng = random.Random(seed)
+    return [rng.choice(flat) for _ in range(count)]
+
+
+def report(name: str, scripts: List[str], converter: KoreanMathConverter):
+    one_by_one = measure(lambda: [converter.korean_to_latex(script) for script in scripts])
+    bulk = measure(lambda: converter.korean_to_latex_many(scripts))
+    print(f"{name:<24} {len(scripts):>7} scripts: one by one {one_by_one * 1000:8.1f} ms "
+          f"({one_by_one / len(scripts) * 1e6:5.2f} us/eq), bulk {bulk * 1000:8.1f} ms "
+          f"({bulk / len(scripts) * 1e6:5.2f} us/eq)")
+
+
+def main():
+    converter = KoreanMathConverter()
+    scripts = sample_scripts()
+    flat = [script for script in scripts if STRUCTURE_PATTERN.search(script) is None]
+    report('sample2.hwpx', scripts, converter)
+    report('  flat scripts only', flat, converter)
+    report('short-script corpus', short_scripts(scripts), converter)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import re
+import time
+
+from . import sample_scripts
+from ..converter.Emitter import HwpEmitter, LatexEmitter
+from ..converter.LatexParser import parse_latex
+from ..converter.Parser import parse
+
+FRAC_PATTERN = re.compile(r'\\frac\{(.*?)\}\{(.*?)\}')
+
+
+def legacy_latex_to_hangul(latex: str) -> str:
+    """Previous reverse path: rewrite \\frac until nothing matches."""
+    while FRAC_PATTERN.search(latex):
+        latex = FRAC_PATTERN.sub(r'\1 over \2', latex)
+    return latex
+
+
+def nested(depth: int) -> str:
+    return r'\frac{1}{' * depth + 'x' + '}' * depth
+
+
+def measure(func, inputs, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for latex in inputs:
+            func(latex)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    emitter = HwpEmitter()
+
+    def convert(latex: str) -> str:
+        return emitter.emit(parse_latex(latex))
+
+    latex_emitter = LatexEmitter()
+    corpus = [latex_emitter.emit(parse(script)) for script in sample_scripts()]
+    characters = sum(len(latex) for latex in corpus)
+    seconds = measure(convert, corpus)
+    print(f"sample2.hwpx as LaTeX: {len(corpus)} equations, {seconds * 1000:.1f} ms "
+          f"({characters / seconds / 1e6:.2f} M chars/s)")
+
+    # Nesting depth: the fixpoint loop rescans the string once per level
+    for depth in (10, 50, 150):
+        inputs = [nested(depth)]
+        print(f"  nested depth {depth:>3}: parser {measure(convert, inputs) * 1000:7.2f} ms, "
+              f"regex fixpoint {measure(legacy_latex_to_hangul, inputs) * 1000:7.2f} ms")
+
+    # Size: a question bank is many equations joined
+    for copies in (1, 4, 16):
+        joined = [' '.join(corpus) * copies]
+        seconds = measure(convert, joined, repeat=3)
+        print(f"  joined x{copies:<2}: {len(joined[0]) / 1024:6.0f} KiB in {seconds * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import time
+import tracemalloc
+
+from . import sample_scripts
+from ..converter.Lexer import tokenize, tokenize_stream
+
+
+def legacy_tokenize(expression: str):
+    """Character loop previously used by the converters, kept for comparison."""
+    tokens = []
+    current_token = ''
+    paren_count = 0
+
+    for char in expression:
+        if char == ' ' and paren_count == 0:
+            if current_token:
+                tokens.append(current_token)
+                current_token = ''
+        else:
+            if char == '(':
+                paren_count += 1
+            elif char == ')':
+                paren_count -= 1
+            current_token += char
+
+    if current_token:
+        tokens.append(current_token)
+
+    return tokens
+
+
+def measure(func, scripts, repeat: int = 20):
+    best = float('inf')
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = sum(len(func(script)) for script in scripts)
+        best = min(best, time.perf_counter() - start)
+    return count, best
+
+
+def retained(func, scripts) -> float:
+    """Bytes per script held by the tokenizer's results."""
+    tracemalloc.start()
+    results = [func(script) for script in scripts]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return current / len(scripts)
+
+
+def main():
+    scripts = sample_scripts()
+    characters = sum(len(script) for script in scripts)
+    print(f"{len(scripts)} scripts, {characters} characters")
+
+    count, seconds = measure(tokenize, scripts)
+    print(f"   lexer: {count} tokens in {seconds * 1000:.2f} ms "
+          f"({count / seconds / 1e6:.2f} M tokens/s, {characters / seconds / 1e6:.2f} M chars/s)")
+
+    count, seconds = measure(tokenize_stream, scripts)
+    print(f"  stream: {count} tokens in {seconds * 1000:.2f} ms "
+          f"({count / seconds / 1e6:.2f} M tokens/s, {characters / seconds / 1e6:.2f} M chars/s)")
+    print(f"  held per script: {retained(tokenize, scripts):.0f} B as Token tuples, "
+          f"{retained(tokenize_stream, scripts):.0f} B as a TokenStream")
+
+    _, seconds = measure(legacy_tokenize, scripts)
+    print(f"  legacy: {seconds * 1000:.2f} ms ({characters / seconds / 1e6:.2f} M chars/s)")
+
+    # One long script: the whole corpus joined
+    joined = [' '.join(scripts)]
+    count, seconds = measure(tokenize, joined)
+    print(f"  joined: {count} tokens in {seconds * 1000:.2f} ms "
+          f"({count / seconds / 1e6:.2f} M tokens/s)")
+    count, seconds = measure(tokenize_stream, joined)
+    print(f"  joined stream: {count} tokens in {seconds * 1000:.2f} ms "
+          f"({count / seconds / 1e6:.2f} M tokens/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import random
+import time
+from typing import Callable, List
+
+from . import sample_scripts
+from .suite import percentile
+from ..converter.Converter import KoreanMathConverter
+from ..converter.Preview import LivePreview
+
+SCRIPT_BYTES = 2048
+KEYSTROKES = 2000
+
+
+def long_script(scripts: List[str], size: int = SCRIPT_BYTES) -> str:
+    """Sample scripts joined with spaces until the text reaches ``size`` characters."""
+    parts: List[str] = []
+    length = 0
+    for script in scripts:
+        parts.append(script)
+        length += len(script) + 1
+        if length >= size:
+            break
+    return ' '.join(parts)
+
+
+def replay(render: Callable[[str], object], base: str, snippets: List[str],
+           seed: int = 0) -> List[float]:
+    """Type a snippet one character at a time at a random place, then backspace it away.
+
+    Every keystroke renders the whole text; half-typed snippets leave braces
+    open for a while, as real typing does.
+    """
+    rng = random.Random(seed)
+    latencies = []
+
+    def keystroke(text: str):
+        start = time.perf_counter()
+        render(text)
+        latencies.append(time.perf_counter() - start)
+
+    while len(latencies) < KEYSTROKES:
+        position = rng.randrange(len(base) + 1)
+        snippet = rng.choice(snippets)
+        for end in range(1, len(snippet) + 1):
+            keystroke(base[:position] + snippet[:end] + base[position:])
+        for end in range(len(snippet) - 1, -1, -1):
+            keystroke(base[:position] + snippet[:end] + base[position:])
+    return sorted(latencies)
+
+
+def report(name: str, latencies: List[float]):
+    print(f"{name:<22} p50 {percentile(latencies, 50) * 1000:6.3f} ms  "
+          f"p99 {percentile(latencies, 99) * 1000:6.3f} ms  max {latencies[-1] * 1000:6.3f} ms")
+
+
+def main():
+    scripts = sample_scripts()
+    base = long_script(scripts)
+    snippets = [script for script in scripts if 3 <= len(script) <= 40]
+    print(f"{len(base)} character script, {KEYSTROKES} keystrokes")
+
+    converter = KoreanMathConverter()
+    report('korean_to_latex', replay(converter.korean_to_latex, base, snippets))
+
+    session = LivePreview()
+    session.update(base)
+    report('LivePreview.update', replay(session.update, base, snippets))
+    print(f"  segments reparsed {session.reparsed}, reused {session.reused}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import os
+import tempfile
+import time
+import zipfile
+from typing import List
+
+from . import SAMPLE_HWPX
+from ..converter.Batch import convert_many
+
+SECTIONS = 8
+
+
+def write_book(path: str, sections: int = SECTIONS, source: str = SAMPLE_HWPX):
+    """An HWPX file whose ``sections`` sections are each a copy of the sample's section0."""
+    with zipfile.ZipFile(source) as sample:
+        data = sample.read('Contents/section0.xml')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as book:
+        book.writestr('mimetype', 'application/hwp+zip', zipfile.ZIP_STORED)
+        for index in range(sections):
+            book.writestr(f'Contents/section{index}.xml', data)
+
+
+def measure(paths: List[str], **options) -> float:
+    start = time.perf_counter()
+    for result in convert_many(paths, **options):
+        assert result.error is None, result.error
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{os.cpu_count()} CPUs, {SECTIONS} sections of sample2.hwpx")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'book.hwpx')
+        write_book(path)
+        serial = measure([path])
+        print(f"{'serial':<16} {serial * 1000:8.1f} ms")
+        for jobs in (2, 4, SECTIONS):
+            elapsed = measure([path], section_jobs=jobs)
+            print(f"{f'section_jobs={jobs}':<16} {elapsed * 1000:8.1f} ms  ({serial / elapsed:4.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from .suite import ENGINES
+
+# Run in a fresh interpreter so every import is cold
+CHILD = '''
+import importlib, json, time
+start = time.perf_counter()
+module = importlib.import_module({module!r})
+imported = time.perf_counter()
+converter = getattr(module, {cls!r})()
+constructed = time.perf_counter()
+getattr(converter, {method!r})({script!r})
+converted = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - start) * 1000,
+    'construct_us': (constructed - imported) * 1e6,
+    'first_convert_ms': (converted - constructed) * 1000,
+}}))
+'''
+
+SCRIPT = 'rm P LEFT ( A SMALLINTER B ^{C} RIGHT ) = {1} over {8}'
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+def cold_start(cls: type, method: str, repeat: int) -> dict:
+    """Best of ``repeat`` fresh interpreters: import, first instance, first conversion."""
+    code = CHILD.format(module=cls.__module__, cls=cls.__name__, method=method, script=SCRIPT)
+    best: dict = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                                capture_output=True, text=True).stdout
+        result = json.loads(output)
+        result['process_ms'] = (time.perf_counter() - start) * 1000
+        for key, value in result.items():
+            best[key] = min(best.get(key, value), value)
+    return best
+
+
+def bare_interpreter(repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def construct_cost(cls: type, count: int = 10000) -> float:
+    """Warm per-instance constructor cost in microseconds."""
+    start = time.perf_counter()
+    for _ in range(count):
+        cls()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold start: import + first conversion per converter')
+    parser.add_argument('--engine', action='append', choices=sorted(ENGINES),
+                        help='only these converters (default: all)')
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters per converter')
+    parser.add_argument('-o', '--output', help='write results as JSON')
+    args = parser.parse_args()
+
+    # Baseline: an interpreter that imports nothing of ours
+    baseline = bare_interpreter(args.repeat)
+    print(f"bare interpreter: {baseline:.1f} ms")
+
+    results = {}
+    for name in args.engine or ENGINES:
+        cls, method = ENGINES[name]
+        result = cold_start(cls, method, args.repeat)
+        result['warm_construct_us'] = construct_cost(cls)
+        results[name] = result
+        print(f"{name:<32} import {result['import_ms']:6.1f} ms  "
+              f"new {result['construct_us']:7.1f} us (warm {result['warm_construct_us']:5.2f} us)  "
+              f"first convert {result['first_convert_ms']:6.2f} ms  "
+              f"process {result['process_ms']:6.1f} ms")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'bare_interpreter_ms': baseline, 'engines': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
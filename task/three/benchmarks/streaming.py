@@ -0,0 +1,51 @@
+import io
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+import zipfile
+
+from . import SAMPLE_HWPX
+from ..converter.Streaming import iter_equations
+
+SECTION = 'Contents/section0.xml'
+HP_NS = 'http://www.hancom.co.kr/hwpml/2011/paragraph'
+
+
+def dom_scripts(data: bytes) -> int:
+    """Previous approach: build the whole tree, then findall."""
+    root = ET.parse(io.BytesIO(data)).getroot()
+    return len([elem.text or '' for elem in root.findall(f'.//{{{HP_NS}}}script')])
+
+
+def streaming_scripts(data: bytes) -> int:
+    """Streaming extractor; scripts are consumed one by one."""
+    return sum(1 for _ in iter_equations(io.BytesIO(data)))
+
+
+def measure(func, data: bytes, repeat: int = 5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = func(data)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return count, best, peak
+
+
+def main():
+    with zipfile.ZipFile(SAMPLE_HWPX) as archive:
+        data = archive.read(SECTION)
+
+    print(f"{SECTION}: {len(data) / 1024:.0f} KiB")
+    for name, func in (('dom', dom_scripts), ('streaming', streaming_scripts)):
+        count, seconds, peak = measure(func, data)
+        print(f"{name:>10}: {count} scripts, {seconds * 1000:.1f} ms, peak {peak / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from . import sample_scripts
+from task.four.Converter import MathFormulaConverter
+from task.one.Converter import MathExpressionConverter
+from task.two.Converter import AdvancedMathConverter
+from ..converter.Converter import KoreanMathConverter
+from ..converter.Converter2 import MathConverter as MathConverter2
+from ..converter.Converter3 import MathConverter as MathConverter3
+
+
+# name -> (converter class, HWP -> LaTeX method)
+ENGINES: Dict[str, Tuple[type, str]] = {
+    'one.MathExpressionConverter': (MathExpressionConverter, 'korean_to_latex'),
+    'two.AdvancedMathConverter': (AdvancedMathConverter, 'korean_to_latex'),
+    'three.KoreanMathConverter': (KoreanMathConverter, 'korean_to_latex'),
+    'three.Converter2.MathConverter': (MathConverter2, 'hangul_to_latex'),
+    'three.Converter3.MathConverter': (MathConverter3, 'hangul_to_latex'),
+    'four.MathFormulaConverter': (MathFormulaConverter, 'convert_korean_to_latex'),
+}
+
+PERCENTILES = (50, 90, 99)
+
+
+def nested_scripts(depths=(5, 20, 50, 100)) -> List[str]:
+    """Fractions nested inside braces, ``{1 over {1 over {...}}}``."""
+    return [('{1 over ' * depth) + 'x' + ('}' * depth) for depth in depths]
+
+
+def long_scripts(lengths=(100, 1000, 5000)) -> List[str]:
+    """Long flat sums with scripts and fractions: ``a_{1} ^{2} + {1} over {2} + ...``."""
+    return [' + '.join(f'a_{{{i}}} ^{{2}} + {{{i}}} over {{{i + 1}}}' for i in range(length))
+            for length in lengths]
+
+
+def corpora() -> Dict[str, List[str]]:
+    return {
+        'sample2.hwpx': sample_scripts(),
+        'nested': nested_scripts(),
+        'long': long_scripts(),
+    }
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def measure(convert: Callable[[str], str], scripts: List[str], repeat: int) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    total = 0.0
+
+    for _ in range(repeat):
+        for script in scripts:
+            start = time.perf_counter()
+            try:
+                convert(script)
+            except Exception:
+                errors += 1
+            elapsed = time.perf_counter() - start
+            latencies.append(elapsed)
+            total += elapsed
+
+    # Separate pass: tracemalloc slows allocation down and would skew timings
+    tracemalloc.start()
+    for script in scripts:
+        try:
+            convert(script)
+        except Exception:
+            pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    characters = sum(len(script) for script in scripts) * repeat
+    result = {f'p{p}_us': percentile(latencies, p) * 1e6 for p in PERCENTILES}
+    result.update({
+        'max_us': latencies[-1] * 1e6 if latencies else 0.0,
+        'scripts_per_s': len(latencies) / total if total else 0.0,
+        'chars_per_s': characters / total if total else 0.0,
+        'peak_kib': peak / 1024,
+        'errors': errors // repeat,
+    })
+    return result
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def run(engines: List[str], repeat: int) -> dict:
+    inputs = corpora()
+    results = {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'repeat': repeat,
+        'corpora': {name: len(scripts) for name, scripts in inputs.items()},
+        'results': {},
+    }
+
+    for engine in engines:
+        cls, method = ENGINES[engine]
+        convert = getattr(cls(), method)
+        results['results'][engine] = {name: measure(convert, scripts, repeat)
+                                      for name, scripts in inputs.items()}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='변환기 구현별 지연 시간/처리량/메모리 벤치마크')
+    parser.add_argument('--engine', action='append', choices=sorted(ENGINES),
+                        help='측정할 변환기 (여러 번 지정 가능, 기본값: 전부)')
+    parser.add_argument('--repeat', type=int, default=5, help='코퍼스 반복 횟수')
+    parser.add_argument('-o', '--output', help='결과를 저장할 JSON 파일')
+    args = parser.parse_args()
+
+    results = run(args.engine or list(ENGINES), args.repeat)
+
+    for engine, by_corpus in results['results'].items():
+        print(engine)
+        for name, r in by_corpus.items():
+            print(f"  {name:>13}: p50 {r['p50_us']:8.1f} us  p99 {r['p99_us']:9.1f} us  "
+                  f"{r['scripts_per_s']:9.0f} scripts/s  peak {r['peak_kib']:7.0f} KiB"
+                  + (f"  ({r['errors']} errors)" if r['errors'] else ''))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+from typing import List, Optional
+
+
+class Node:
+    """Base class of the equation AST shared by every parser and emitter."""
+    __slots__ = ()
+
+    def __repr__(self):
+        fields = ', '.join(repr(getattr(self, name)) for name in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+    def __eq__(self, other):
+        return (type(self) is type(other)
+                and all(getattr(self, name) == getattr(other, name) for name in self.__slots__))
+
+
+class Row(Node):
+    """Sequence of nodes, e.g. the whole script or the inside of ``{...}``."""
+    __slots__ = ('children',)
+
+    def __init__(self, children: Optional[List[Node]] = None):
+        self.children = children if children is not None else []
+
+
+class Group(Node):
+    """Explicit ``{...}`` grouping; invisible in the output."""
+    __slots__ = ('body',)
+
+    def __init__(self, body: Row):
+        self.body = body
+
+
+class Number(Node):
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class Identifier(Node):
+    """Variable name; ``style`` is ``'rm'``/``'bold'`` after ``rm``/``bold``."""
+    __slots__ = ('text', 'style')
+
+    def __init__(self, text: str, style: Optional[str] = None):
+        self.text = text
+        self.style = style
+
+
+class Symbol(Node):
+    """Named symbol, operator or function (``times``, ``pi``, ``lim``, ...)."""
+    __slots__ = ('name',)
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+class Operator(Node):
+    """Punctuation or operator characters (``+``, ``=``, ``<=``, ...)."""
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class Text(Node):
+    """Literal text such as Hangul words or quoted strings."""
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class Space(Node):
+    """Explicit spacing: ``'thin'`` for a backtick, ``'normal'`` for ``~``."""
+    __slots__ = ('width',)
+
+    def __init__(self, width: str):
+        self.width = width
+
+
+class Fraction(Node):
+    """``a over b``; ``line`` is False for ``a atop b``."""
+    __slots__ = ('numerator', 'denominator', 'line')
+
+    def __init__(self, numerator: Node, denominator: Node, line: bool = True):
+        self.numerator = numerator
+        self.denominator = denominator
+        self.line = line
+
+
+class Root(Node):
+    """``sqrt x`` or ``root n of x``."""
+    __slots__ = ('radicand', 'index')
+
+    def __init__(self, radicand: Node, index: Optional[Node] = None):
+        self.radicand = radicand
+        self.index = index
+
+
+class Scripts(Node):
+    """Sub/superscripts; ``base`` is None for prescripts such as ``_2 C_1``."""
+    __slots__ = ('base', 'sub', 'sup')
+
+    def __init__(self, base: Optional[Node], sub: Optional[Node] = None, sup: Optional[Node] = None):
+        self.base = base
+        self.sub = sub
+        self.sup = sup
+
+
+class Fenced(Node):
+    """Delimited body. ``sized`` fences come from ``LEFT``/``RIGHT``.
+
+    An empty ``right`` means the closing delimiter was missing.
+    """
+    __slots__ = ('left', 'right', 'body', 'sized')
+
+    def __init__(self, left: str, right: str, body: Row, sized: bool = True):
+        self.left = left
+        self.right = right
+        self.body = body
+        self.sized = sized
+
+
+class Matrix(Node):
+    """``matrix``/``pmatrix``/``bmatrix``/``dmatrix``/``cases``/``pile`` layouts."""
+    __slots__ = ('kind', 'rows')
+
+    def __init__(self, kind: str, rows: List[List[Row]]):
+        self.kind = kind
+        self.rows = rows
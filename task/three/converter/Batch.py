@@ -0,0 +1,237 @@
+import argparse
+import glob
+import io
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .Bulk import korean_to_latex_many
+from .Cache import CachedConverter, ConversionCache, SqliteStore
+from .Converter import KoreanMathConverter
+from .HwpxReader import HwpxReader
+from .Incremental import convert_document as convert_incremental, manifest_path
+from .Limits import ConversionError, TimeLimitExceeded, fallback_latex, time_limit
+from .Profiling import profile
+
+
+EXTENSIONS = ('.hwpx', '.hml')
+# A document still converting after this long is given up on
+TIME_LIMIT = 60.0
+
+
+class DocumentResult(NamedTuple):
+    path: str
+    equations: List[Tuple[str, str]]  # (script, latex) in document order
+    error: Optional[str] = None
+    reused: int = 0       # with a manifest directory: outputs taken from the manifest
+    recomputed: int = 0
+    rejected: int = 0     # scripts refused by the limits, kept as \text{...}
+
+
+# One converter per worker process, built by the pool initializer
+_converter = None
+_manifest_dir = None
+_time_limit: Optional[float] = TIME_LIMIT
+
+
+def _init_worker(cache_dir: Optional[str] = None, manifest_dir: Optional[str] = None,
+                 seconds: Optional[float] = TIME_LIMIT):
+    global _converter, _manifest_dir, _time_limit
+    store = SqliteStore(cache_dir) if cache_dir else None
+    _converter = CachedConverter(KoreanMathConverter(), ConversionCache(store=store))
+    _manifest_dir = manifest_dir
+    _time_limit = seconds
+
+
+def _refusing(rejected: List[str]) -> Callable[[str], str]:
+    """Converts a script; one refused by the limits is appended to ``rejected`` and kept as text."""
+
+    def convert(script: str) -> str:
+        try:
+            return _converter.korean_to_latex(script)
+        except ConversionError:
+            # One oversized or too deeply nested script does not fail the document
+            rejected.append(script)
+            return fallback_latex(script)
+
+    return convert
+
+
+def _convert_scripts(scripts: List[str]) -> Tuple[List[Tuple[str, str]], int]:
+    """``(script, latex)`` pairs and the number of scripts refused by the limits."""
+    rejected: List[str] = []
+    return list(zip(scripts, korean_to_latex_many(scripts, _refusing(rejected)))), len(rejected)
+
+
+def convert_document(path: str, data: Optional[bytes] = None) -> DocumentResult:
+    """Convert every equation of one HWPX/HML document to LaTeX.
+
+    With ``data`` the document is read from those bytes (a download) and
+    ``path`` only names it; its extension still picks HWPX or HML. Such a
+    document is always converted in full: manifests are kept per file on
+    disk, so the manifest directory does not apply to it.
+    """
+    if _converter is None:
+        _init_worker()
+
+    parse = _converter.parse_hml if path.lower().endswith('.hml') else _converter.parse_hwpx
+    source = path if data is None else io.BytesIO(data)
+    try:
+        # One profile per document when HWP_PROFILE_DIR is set
+        with time_limit(_time_limit), profile(os.path.basename(path)):
+            if _manifest_dir is not None and data is None:
+                # Only scripts missing from the document's manifest are converted
+                # and a refused one is kept as text without being recorded
+                result = convert_incremental(_converter, path, manifest_path(_manifest_dir, path),
+                                             fallback_latex)
+                equations = [(script, latex) for _, script, latex in result.equations]
+                return DocumentResult(path, equations, reused=result.reused,
+                                      recomputed=result.recomputed, rejected=result.rejected)
+            equations, rejected = _convert_scripts(list(parse(source)))
+    except (OSError, KeyError, zipfile.BadZipFile, ET.ParseError, ConversionError, TimeLimitExceeded) as e:
+        return DocumentResult(path, [], f'{type(e).__name__}: {e}')
+    return DocumentResult(path, equations, recomputed=len(equations) - rejected, rejected=rejected)
+
+
+def convert_section(data: bytes) -> Tuple[List[Tuple[str, str]], int]:
+    """Convert every equation of one HWPX section, given its XML."""
+    if _converter is None:
+        _init_worker()
+
+    with time_limit(_time_limit):
+        return _convert_scripts(list(_converter.parse_section(data)))
+
+
+def convert_sections(path: str, pool: ProcessPoolExecutor) -> DocumentResult:
+    """Convert one HWPX document with its sections spread over ``pool``.
+
+    Sections are inflated here and sent to the workers as bytes, so a
+    worker never opens the archive; each returns its ``(script, latex)``
+    pairs and ``pool.map`` keeps them in document order. HML files,
+    manifest runs and single-section documents are converted here. The
+    time limit applies to each section.
+    """
+    if _manifest_dir is not None or not path.lower().endswith('.hwpx'):
+        return convert_document(path)
+    try:
+        with HwpxReader(path) as reader:
+            sections = [reader.read_section(section) for section in reader.sections()]
+        results = pool.map(convert_section, sections) if len(sections) > 1 else map(convert_section, sections)
+        equations: List[Tuple[str, str]] = []
+        rejected = 0
+        for pairs, refused in results:
+            equations.extend(pairs)
+            rejected += refused
+    except (OSError, KeyError, zipfile.BadZipFile, ET.ParseError, ConversionError, TimeLimitExceeded) as e:
+        return DocumentResult(path, [], f'{type(e).__name__}: {e}')
+    return DocumentResult(path, equations, recomputed=len(equations) - rejected, rejected=rejected)
+
+
+def convert_many(paths: Iterable[str], jobs: int = 1, chunksize: int = 4,
+                 cache_dir: Optional[str] = None,
+                 manifest_dir: Optional[str] = None,
+                 section_jobs: int = 1,
+                 seconds: Optional[float] = TIME_LIMIT) -> Iterator[DocumentResult]:
+    """Convert documents over ``jobs`` processes.
+
+    Documents are handed to workers ``chunksize`` at a time; results are
+    yielded in input order as soon as each one (and all before it) is done.
+    With ``section_jobs`` > 1 documents are taken one at a time instead and
+    the sections of each are converted over ``section_jobs`` processes,
+    which finishes a single long document sooner. A document (or section)
+    that takes longer than ``seconds`` comes back with an error.
+    """
+    if section_jobs > 1:
+        _init_worker(cache_dir, manifest_dir, seconds)
+        with ProcessPoolExecutor(section_jobs, initializer=_init_worker,
+                                 initargs=(cache_dir, None, seconds)) as pool:
+            for path in paths:
+                yield convert_sections(path, pool)
+        return
+
+    if jobs <= 1:
+        _init_worker(cache_dir, manifest_dir, seconds)
+        yield from map(convert_document, paths)
+        return
+
+    with ProcessPoolExecutor(jobs, initializer=_init_worker,
+                             initargs=(cache_dir, manifest_dir, seconds)) as pool:
+        yield from pool.map(convert_document, paths, chunksize=chunksize)
+
+
+def expand_paths(inputs: Iterable[str]) -> List[str]:
+    """Files, directories (searched recursively) and glob patterns -> sorted documents."""
+    found = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                found.update(os.path.join(root, name) for name in files
+                             if name.lower().endswith(EXTENSIONS))
+        elif os.path.isfile(item):
+            found.add(item)
+        else:
+            found.update(path for path in glob.glob(item, recursive=True)
+                         if path.lower().endswith(EXTENSIONS))
+    return sorted(found)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='HWPX/HML 문서의 수식을 LaTeX로 일괄 변환')
+    parser.add_argument('inputs', nargs='+', help='파일, 디렉터리 또는 glob 패턴')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='작업 프로세스 수')
+    parser.add_argument('--chunksize', type=int, default=4, help='한 번에 작업자에게 넘기는 문서 수')
+    parser.add_argument('-o', '--output', help='결과 NDJSON 파일 (기본값: 표준 출력)')
+    parser.add_argument('--cache-dir', help='프로세스 간 공유하는 SQLite 캐시 디렉터리')
+    parser.add_argument('--manifest-dir', help='문서별 매니페스트 디렉터리 (바뀐 수식만 다시 변환)')
+    parser.add_argument('--section-jobs', type=int, default=1,
+                        help='2 이상이면 문서를 하나씩 처리하며 섹션을 이 수만큼의 프로세스로 나눠 변환 (-j 무시)')
+    parser.add_argument('--time-limit', type=float, default=TIME_LIMIT,
+                        help=f'문서 하나의 최대 변환 시간(초), 0이면 제한 없음 (기본값: {TIME_LIMIT:g})')
+    args = parser.parse_args(argv)
+
+    paths = expand_paths(args.inputs)
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+
+    documents = equations = failed = reused = rejected = 0
+    start = time.perf_counter()
+    try:
+        for result in convert_many(paths, args.jobs, args.chunksize, args.cache_dir, args.manifest_dir,
+                                   args.section_jobs, args.time_limit):
+            record = {
+                'path': result.path,
+                'equations': [{'script': script, 'latex': latex} for script, latex in result.equations],
+            }
+            if args.manifest_dir:
+                record['reused'] = result.reused
+                record['recomputed'] = result.recomputed
+            if result.rejected:
+                record['rejected'] = result.rejected
+            if result.error:
+                record['error'] = result.error
+                failed += 1
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            documents += 1
+            equations += len(result.equations)
+            reused += result.reused
+            rejected += result.rejected
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    rate = 1 / elapsed if elapsed else 0.0
+    print(f"{documents} documents ({failed} failed), {equations} equations in {elapsed:.2f} s: "
+          f"{documents * rate:.1f} docs/s, {equations * rate:.0f} eq/s", file=sys.stderr)
+    if args.manifest_dir:
+        print(f"{reused} reused, {equations - reused} recomputed", file=sys.stderr)
+    if rejected:
+        print(f"{rejected} equations over the length/depth limits kept as text", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .Emitter import LatexEmitter
+from .Lexer import CLASSIFIED_LIMIT, KEY_IDS, KEYWORDS, TOKEN_PATTERN, key_text
+from .Limits import MAX_LENGTH
+from .Parser import parse
+from .Substitution import ends_with_command
+
+# Joins the scripts in the buffer; always a token of its own
+SEPARATOR = '\x00'
+# Stands in for a token that needs the parser
+STRUCTURED = '\x01'
+
+# Keys that make one node each and never combine with their neighbours:
+# "(" only brackets what follows, which is output in the same order
+FLAT_KEYS = frozenset(KEY_IDS[name] for name in (
+    'SPACE', 'NUMBER', 'WORD', 'TEXT', 'OP', 'CHAR', 'THIN', 'TILDE', 'RBRACE',
+    'LPAREN', 'RPAREN', 'LBRACKET', 'RBRACKET', 'AMP', 'ROW', 'times', 'of',
+))
+# Anything that may lex as a structural token; a keyword can also start or
+# follow a glued word ("sqrtx"), so keywords are looked for anywhere
+STRUCTURE_PATTERN = re.compile(
+    r'["{^_\x00\x01]|(?i:%s)' % '|'.join(sorted(KEYWORDS - {'times', 'of'}, key=len, reverse=True)))
+
+LATEX_EMITTER = LatexEmitter()
+
+# token text -> (LaTeX, starts with a letter, ends with a control word),
+# or None for a token that needs the parser
+_PIECES: Dict[str, Optional[Tuple[str, bool, bool]]] = {SEPARATOR: (SEPARATOR, False, False)}
+
+
+def _piece(text: str) -> Optional[Tuple[str, bool, bool]]:
+    key = key_text(text)
+    keys = [key] if type(key) is int else [piece for piece, _ in key]
+    if not all(key in FLAT_KEYS for key in keys):
+        return None
+    # A flat token's output is the same alone as in any flat script
+    latex = LATEX_EMITTER.emit(parse(text))
+    return latex, latex[:1].isalpha(), ends_with_command(latex)
+
+
+def korean_to_latex_many(scripts: Sequence[str], convert: Callable[[str], str]) -> List[str]:
+    """LaTeX of every script, converting flat scripts in bulk over one joined buffer.
+
+    Most scripts in an exam paper are a number, a variable or a short run
+    of operators (``1``, ``=5``, ``x``). Those contain no token that builds
+    structure, so their LaTeX is each token's own LaTeX in order, with the
+    emitter's spacing rule between neighbours. They are joined into one
+    buffer, every token is replaced in a single regex pass and the result
+    is split back at the separators; scripts that turn out to need the
+    parser go through ``convert`` one by one; a quick search for anything
+    that could be structural keeps most of them out of the buffer. The
+    output is the same as ``convert`` gives; scripts over the length limit
+    are left to ``convert`` to refuse.
+    """
+    results: List[Optional[str]] = [None] * len(scripts)
+    search = STRUCTURE_PATTERN.search
+    flat = [i for i, script in enumerate(scripts) if len(script) <= MAX_LENGTH and search(script) is None]
+
+    pieces = _PIECES
+    previous_command = False
+
+    def replace(match) -> str:
+        nonlocal previous_command
+        text = match.group()
+        entry = pieces.get(text)
+        if entry is None:
+            if text in pieces:
+                return STRUCTURED
+            if '0' <= text[0] <= '9':
+                entry = (text, False, False)
+            else:
+                entry = _piece(text)
+                if len(pieces) < CLASSIFIED_LIMIT:
+                    pieces[text] = entry
+                if entry is None:
+                    return STRUCTURED
+        latex, starts_alpha, ends_command = entry
+        if not latex:
+            return latex
+        if starts_alpha and previous_command:
+            latex = ' ' + latex
+        previous_command = ends_command
+        return latex
+
+    joined = TOKEN_PATTERN.sub(replace, SEPARATOR.join(scripts[i] for i in flat))
+    for i, latex in zip(flat, joined.split(SEPARATOR)):
+        if STRUCTURED not in latex:
+            results[i] = latex
+
+    return [convert(script) if latex is None else latex for script, latex in zip(scripts, results)]
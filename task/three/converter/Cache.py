@@ -0,0 +1,223 @@
+import os
+import re
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+
+CacheKey = Tuple[str, str, str, str]
+
+_WHITESPACE = re.compile(r'\s+')
+# Quoted text as the lexer reads it, up to the closing quote or the end
+_QUOTED = re.compile(r'("[^"]*"?)')
+
+
+def converter_name(converter) -> str:
+    """Module-qualified class name; Converter2 and Converter3 both define ``MathConverter``."""
+    cls = type(converter)
+    return f'{cls.__module__}.{cls.__qualname__}'
+
+
+def normalize_script(script: str) -> str:
+    """Collapse the whitespace of an HWP script, which only separates tokens.
+
+    Quoted text is literal and kept as it is.
+    """
+    parts = _QUOTED.split(script)
+    # Odd parts are the quotes; the first and last parts are never quoted
+    parts[::2] = [_WHITESPACE.sub(' ', part) for part in parts[::2]]
+    parts[0] = parts[0].lstrip()
+    parts[-1] = parts[-1].rstrip()
+    return ''.join(parts)
+
+
+class CacheStats:
+    """Counters of a :class:`ConversionCache`."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'disk_hits': self.disk_hits,
+            'hit_rate': self.hit_rate,
+        }
+
+
+class SqliteStore:
+    """On-disk cache tier shared by every process on the host.
+
+    One SQLite file in ``directory``; WAL mode lets several workers read
+    while one writes, so cache state survives restarts.
+    """
+
+    FILENAME = 'conversions.sqlite3'
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, self.FILENAME)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS conversions (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self._db.commit()
+
+    @staticmethod
+    def _encode(key: CacheKey) -> str:
+        return '\x1f'.join(key)
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute('SELECT value FROM conversions WHERE key = ?',
+                                   (self._encode(key),)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: CacheKey, value: str):
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO conversions (key, value) VALUES (?, ?)',
+                             (self._encode(key), value))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class ConversionCache:
+    """Bounded LRU cache of conversion results.
+
+    Bounded both by entry count and by the approximate memory held by keys
+    and values; the least recently used entries are evicted first. An
+    optional :class:`SqliteStore` is consulted on a miss and written through
+    on every store.
+    """
+
+    def __init__(self, max_entries: int = 100_000, max_bytes: int = 64 * 1024 * 1024,
+                 store: Optional[SqliteStore] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.store = store
+        self.stats = CacheStats()
+        self.size_bytes = 0
+        self._entries: 'OrderedDict[CacheKey, Tuple[str, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return entry[0]
+
+        if self.store is not None:
+            value = self.store.get(key)
+            if value is not None:
+                self._remember(key, value)
+                with self._lock:
+                    self.stats.hits += 1
+                    self.stats.disk_hits += 1
+                return value
+
+        with self._lock:
+            self.stats.misses += 1
+        return None
+
+    def put(self, key: CacheKey, value: str):
+        self._remember(key, value)
+        if self.store is not None:
+            self.store.put(key, value)
+
+    def get_or_convert(self, key: CacheKey, convert: Callable[[str], str], script: str) -> str:
+        """The value of ``key``, else ``convert(script)`` stored under it."""
+        value = self.get(key)
+        if value is None:
+            value = convert(script)
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def _remember(self, key: CacheKey, value: str):
+        size = sys.getsizeof(key[-1]) + sys.getsizeof(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size_bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self.size_bytes += size
+
+            while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size_bytes -= evicted
+                self.stats.evictions += 1
+
+
+class CachedConverter:
+    """Memoizing front for a converter object.
+
+    Results are keyed on ``(converter, version, method, script)`` so a new
+    converter version never reads stale output. The script is normalized
+    in the key only for the methods the converter lists in
+    ``NORMALIZED_METHODS``, those whose output does not depend on its
+    whitespace; the converter always gets the script as it was given. Any
+    attribute that is not a cached conversion method is passed through to
+    the converter.
+    """
+
+    METHODS = ('korean_to_latex', 'korean_to_mathml', 'latex_to_korean', 'hangul_to_latex', 'latex_to_hangul')
+
+    def __init__(self, converter, cache: Optional[ConversionCache] = None):
+        self.converter = converter
+        self.cache = cache if cache is not None else ConversionCache()
+        self.name = converter_name(converter)
+        # Every wrapped converter declares VERSION, bumped whenever its output changes
+        self.version = str(converter.VERSION)
+        self.normalized = frozenset(getattr(converter, 'NORMALIZED_METHODS', ()))
+
+        for method in self.METHODS:
+            if hasattr(converter, method):
+                setattr(self, method, self._cached(method))
+
+    def _cached(self, method: str) -> Callable[[str], str]:
+        convert = getattr(self.converter, method)
+        prefix = (self.name, self.version, method)
+        cache = self.cache
+        key = normalize_script if method in self.normalized else str
+
+        def cached(script: str) -> str:
+            return cache.get_or_convert(prefix + (key(script),), convert, script)
+
+        cached.__name__ = method
+        cached.__doc__ = convert.__doc__
+        return cached
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.cache.stats
+
+    def __getattr__(self, name):
+        return getattr(self.converter, name)
@@ -1,68 +1,125 @@
-import xml.etree.ElementTree as ET
-from typing import Dict, List, Optional
+from types import MappingProxyType
+from typing import Iterator, List, Optional, Sequence, Tuple
 import re
 
+from .Bulk import korean_to_latex_many
+from .Emitter import HwpEmitter, LatexEmitter, MathMLEmitter
+from .HwpxReader import HwpxReader
+from .LatexParser import parse_latex
+from .Lexer import split_terms, tokenize_stream
+from . import Profiling
+from .Metrics import timed
+from .Parser import parse
+from .Streaming import EQUATION, iter_document, iter_equations, iter_equations_from_chunks
+
+
+SYMBOL_MAP = MappingProxyType({
+    # Basic operators
+    'TIMES': r'\times',
+    'over': r'\frac',
+    'LEFT': r'\left',
+    'RIGHT': r'\right',
+
+    # Mathematical functions
+    'P': r'\mathrm{P}',
+    'C': r'\mathrm{C}',
+    'lim': r'\lim',
+    'sum': r'\sum',
+    'int': r'\int',
+
+    # Special symbols
+    'SMALLINTER': r'\cap',
+    '^{C}': r'^{\complement}',
+    'infty': r'\infty',
+    'sqrt': r'\sqrt',
+
+    # Probability notation
+    'cap': r'\cap',
+    'cup': r'\cup',
+
+    # Common subscripts
+    '_n': r'_{n}',
+    '_1': r'_{1}',
+    '_2': r'_{2}'
+})
+
+# Emitters hold no per-call state, so every converter shares them
+LATEX_EMITTER = LatexEmitter()
+HWP_EMITTER = HwpEmitter()
+MATHML_EMITTER = MathMLEmitter()
+
+SPACE_PATTERN = re.compile(r'\s+')
+
+# Entry points profiled as a whole when HWP_PROFILE_DIR is set
+PROFILED_METHODS = ('korean_to_latex', 'korean_to_mathml', 'latex_to_korean')
+
 
 class KoreanMathConverter:
+    # Bump when conversion output changes so cached results are not reused
+    VERSION = '6'
+    # Whitespace outside quotes only separates tokens in these methods' input
+    NORMALIZED_METHODS = ('korean_to_latex', 'korean_to_mathml')
+
     def __init__(self):
-        self.symbol_map = {
-            # Basic operators
-            'TIMES': r'\times',
-            'over': r'\frac',
-            'LEFT': r'\left',
-            'RIGHT': r'\right',
-
-            # Mathematical functions
-            'P': r'\mathrm{P}',
-            'C': r'\mathrm{C}',
-            'lim': r'\lim',
-            'sum': r'\sum',
-            'int': r'\int',
-
-            # Special symbols
-            'SMALLINTER': r'\cap',
-            '^{C}': r'^{\complement}',
-            'infty': r'\infty',
-            'sqrt': r'\sqrt',
-
-            # Probability notation
-            'cap': r'\cap',
-            'cup': r'\cup',
-
-            # Common subscripts
-            '_n': r'_{n}',
-            '_1': r'_{1}',
-            '_2': r'_{2}'
-        }
-
-        # Inverse mapping for LaTeX to Korean conversion
-        self.latex_to_korean_map = {v: k for k, v in self.symbol_map.items()}
-
-    def parse_hwpx(self, file_path: str) -> List[str]:
+        # Rule tables and emitters are module-level and shared by every instance
+        self.symbol_map = SYMBOL_MAP
+        self.latex_emitter = LATEX_EMITTER
+        self.hwp_emitter = HWP_EMITTER
+        self.mathml_emitter = MATHML_EMITTER
+
+        # Pipeline stages; plain functions unless HWP_METRICS is set
+        self._tokenize = timed('tokenize', tokenize_stream, script=True)
+        self._parse = timed('parse', parse)
+        self._emit = timed('emit', self.latex_emitter.emit)
+        self._parse_latex = timed('latex_parse', parse_latex)
+        self._emit_hwp = timed('hwp_emit', self.hwp_emitter.emit)
+        self._emit_mathml = timed('mathml_emit', self.mathml_emitter.emit)
+
+        if Profiling.ENABLED:
+            # Nothing is wrapped unless profiling is on
+            for method in PROFILED_METHODS:
+                setattr(self, method, Profiling.profiled(method, getattr(self, method)))
+
+    def parse_hwpx(self, file_path: str) -> Iterator[str]:
         """Parse mathematical expressions from HWPX file."""
-        tree = ET.parse(file_path)
-        root = tree.getroot()
-
-        # Extract math zones from HWPX
-        math_expressions = []
-        for math_elem in root.findall(".//math"):
-            expr = self._clean_math_text(math_elem.text)
-            math_expressions.append(expr)
-
-        return math_expressions
+        # HWPX is a zip archive: only the section parts are inflated
+        with HwpxReader(file_path) as reader:
+            for _, _, script in reader.iter_equations():
+                yield self._clean_math_text(script)
 
-    def parse_hml(self, file_path: str) -> List[str]:
+    def parse_hml(self, file_path: str) -> Iterator[str]:
         """Parse mathematical expressions from HML file."""
-        tree = ET.parse(file_path)
-        root = tree.getroot()
-
-        # Extract math zones from HML
-        math_expressions = []
-        for math_elem in root.findall(".//hmath"):
-            expr = self._clean_math_text(math_elem.text)
-            math_expressions.append(expr)
-
-        return math_expressions
+        # Scripts are emitted as their end tags arrive
+        for _, script in iter_equations(file_path):
+            yield self._clean_math_text(script)
+
+    def parse_section(self, data: bytes) -> Iterator[str]:
+        """Parse mathematical expressions from the XML of one HWPX section."""
+        for _, script in iter_equations_from_chunks([data]):
+            yield self._clean_math_text(script)
+
+    def iter_equations(self, file_path: str) -> Iterator[Tuple[Optional[str], str]]:
+        """Yield ``(equation id, script)`` of an HWPX or HML file, in document order."""
+        if str(file_path).lower().endswith('.hwpx'):
+            with HwpxReader(file_path) as reader:
+                for _, equation_id, script in reader.iter_equations():
+                    yield equation_id, self._clean_math_text(script)
+        else:
+            for equation_id, script in iter_equations(file_path):
+                yield equation_id, self._clean_math_text(script)
+
+    def iter_document(self, file_path: str) -> Iterator[Tuple[str, str]]:
+        """Yield ``(event, text)`` document events of an HWPX or HML file, in order."""
+        if str(file_path).lower().endswith('.hwpx'):
+            with HwpxReader(file_path) as reader:
+                events = reader.iter_document()
+                yield from self._clean_equations(events)
+        else:
+            yield from self._clean_equations(iter_document(file_path))
+
+    def _clean_equations(self, events: Iterator[Tuple[str, str]]) -> Iterator[Tuple[str, str]]:
+        for event, text in events:
+            yield event, self._clean_math_text(text) if event == EQUATION else text
 
     def _clean_math_text(self, text: str) -> str:
         """Clean and normalize mathematical text."""
@@ -70,7 +127,7 @@ class KoreanMathConverter:
             return ""
 
         # Remove unnecessary whitespace
-        text = re.sub(r'\s+', ' ', text.strip())
+        text = SPACE_PATTERN.sub(' ', text.strip())
 
         # Normalize brackets
         text = text.replace('（', '(').replace('）', ')')
@@ -79,84 +136,26 @@ class KoreanMathConverter:
 
     def korean_to_latex(self, expression: str) -> str:
         """Convert Korean mathematical expression to LaTeX."""
-        # Parse the expression into tokens
-        tokens = self._tokenize_expression(expression)
-        latex_tokens = []
-
-        i = 0
-        while i < len(tokens):
-            token = tokens[i]
+        # Build the equation AST in one pass, then walk it to emit LaTeX
+        return self._emit(self._parse(expression, self._tokenize(expression)))
 
-            # Handle fractions
-            if token == 'over':
-                numerator = latex_tokens.pop()
-                i += 1
-                denominator = tokens[i]
-                latex_tokens.append(f'\\frac{{{numerator}}}{{{denominator}}}')
+    def korean_to_mathml(self, expression: str) -> str:
+        """Convert Korean mathematical expression to a presentation MathML ``<math>`` element."""
+        # Same AST as korean_to_latex; the browser lays it out without parsing TeX
+        return self._emit_mathml(self._parse(expression, self._tokenize(expression)))
 
-            # Handle special functions
-            elif token in self.symbol_map:
-                latex_tokens.append(self.symbol_map[token])
-
-            # Handle subscripts and superscripts
-            elif token.startswith('_') or token.startswith('^'):
-                prev_token = latex_tokens[-1] if latex_tokens else ''
-                latex_tokens[-1] = f'{prev_token}{token}'
-
-            # Handle regular tokens
-            else:
-                latex_tokens.append(token)
-
-            i += 1
-
-        return ''.join(latex_tokens)
+    def korean_to_latex_many(self, expressions: Sequence[str]) -> List[str]:
+        """Convert many expressions; flat ones in one pass over a joined buffer."""
+        return korean_to_latex_many(expressions, self.korean_to_latex)
 
     def latex_to_korean(self, latex: str) -> str:
         """Convert LaTeX expression to Korean mathematical expression."""
-        korean_expr = latex
-
-        # Replace LaTeX commands with Korean equivalents
-        for latex_symbol, korean_symbol in self.latex_to_korean_map.items():
-            korean_expr = korean_expr.replace(latex_symbol, korean_symbol)
-
-        # Handle special cases
-        korean_expr = self._handle_special_cases_latex_to_korean(korean_expr)
-
-        return korean_expr
+        # Same AST as the forward direction; nested \frac needs no repeated passes
+        return self._emit_hwp(self._parse_latex(latex))
 
     def _tokenize_expression(self, expression: str) -> List[str]:
         """Tokenize mathematical expression."""
-        tokens = []
-        current_token = ''
-        paren_count = 0
-
-        for char in expression:
-            if char == ' ' and paren_count == 0:
-                if current_token:
-                    tokens.append(current_token)
-                    current_token = ''
-            else:
-                if char == '(':
-                    paren_count += 1
-                elif char == ')':
-                    paren_count -= 1
-                current_token += char
-
-        if current_token:
-            tokens.append(current_token)
-
-        return tokens
-
-    def _handle_special_cases_latex_to_korean(self, expr: str) -> str:
-        """Handle special cases when converting from LaTeX to Korean."""
-        # Handle fraction special cases
-        expr = re.sub(r'\\frac\{([^}]+)\}\{([^}]+)\}', r'\1 over \2', expr)
-
-        # Handle probability notation
-        expr = re.sub(r'\\mathrm\{P\}', 'P', expr)
-        expr = re.sub(r'\\mathrm\{C\}', 'C', expr)
-
-        return expr
+        return split_terms(expression)
 
 
 def test_converter():
@@ -1,105 +1,73 @@
 import xml.etree.ElementTree as ET
-import re
-from typing import Dict, List, Tuple
+from types import MappingProxyType
+from typing import Iterator
+
+from .Emitter import PlainEmitter
+from .LatexParser import parse_latex
+from .Metrics import timed
+from .Rules import plain_profile
+from .Streaming import iter_equations_from_chunks
+
+
+# 기본 수식 기호 매핑
+SYMBOL_MAP = MappingProxyType({
+    '×': r'\times',
+    '÷': r'\div',
+    '∩': r'\cap',
+    '∪': r'\cup',
+    '⊂': r'\subset',
+    '⊃': r'\supset',
+    '∈': r'\in',
+    '∉': r'\notin',
+    '≠': r'\neq',
+    '≤': r'\leq',
+    '≥': r'\geq',
+    '±': r'\pm',
+    '∓': r'\mp',
+    '∞': r'\infty',
+    '∴': r'\therefore',
+    '∵': r'\because',
+})
+
+# 역변환: LaTeX 수식 트리를 1/3, x^2, √{x}, [[1 2;3 4]] 표기로 출력
+PLAIN_EMITTER = PlainEmitter({v: k for k, v in SYMBOL_MAP.items()})
+
+# 기호, 분수, 첨자, 루트, 조합, 행렬 규칙을 합친 단일 패스 엔진
+PLAIN_RULES = plain_profile(SYMBOL_MAP)
 
 
 class MathConverter:
+    # 출력이 바뀌면 올려서 캐시·매니페스트에 남은 이전 결과를 쓰지 않게 함
+    VERSION = '4'
+
     def __init__(self):
-        # 기본 수식 기호 매핑
-        self.symbol_map = {
-            '×': r'\times',
-            '÷': r'\div',
-            '∩': r'\cap',
-            '∪': r'\cup',
-            '⊂': r'\subset',
-            '⊃': r'\supset',
-            '∈': r'\in',
-            '∉': r'\notin',
-            '≠': r'\neq',
-            '≤': r'\leq',
-            '≥': r'\geq',
-            '±': r'\pm',
-            '∓': r'\mp',
-            '∞': r'\infty',
-            '∴': r'\therefore',
-            '∵': r'\because',
-        }
-
-        # 특수 수식 구조 패턴
-        self.patterns = {
-            'fraction': r'(\d+)\s*\/\s*(\d+)',
-            'superscript': r'(\w+)\^(\w+)',
-            'subscript': r'(\w+)_(\w+)',
-            'root': r'√\{([^}]+)\}',
-            'matrix': r'\[\[(.*?)\]\]',
-            'combination': r'_(\d+)C_(\d+)',
-            'sum': r'Σ_\{([^}]+)\}\^\{([^}]+)\}',
-            'integral': r'∫_\{([^}]+)\}\^\{([^}]+)\}'
-        }
-
-    def parse_hangul_xml(self, xml_content: str) -> List[str]:
+        # 테이블, 에미터, 정규식은 모든 인스턴스가 공유 (생성 비용 없음)
+        self.symbol_map = SYMBOL_MAP
+        self.plain_emitter = PLAIN_EMITTER
+        self.rules = PLAIN_RULES
+        # 기호 매핑·분수 등 규칙 치환 단계 (HWP_METRICS가 없으면 원래 함수 그대로)
+        self._rewrite = timed('rule_rewrite', self.rules.sub)
+
+    def parse_hangul_xml(self, xml_content: str) -> Iterator[str]:
         """한글 XML에서 수식 추출"""
+        # DOM을 만들지 않고 수식이 닫히는 즉시 내보냄
         try:
-            root = ET.fromstring(xml_content)
-            math_elements = root.findall(".//math")
-            return [elem.text for elem in math_elements if elem.text]
+            for _, script in iter_equations_from_chunks([xml_content], frozenset({'math'})):
+                if script:
+                    yield script
         except ET.ParseError as e:
             print(f"XML 파싱 오류: {e}")
-            return []
 
     def hangul_to_latex(self, math_expr: str) -> str:
         """한글 수식을 LaTeX로 변환"""
-        result = math_expr
-
-        # 기본 기호 변환
-        for k, v in self.symbol_map.items():
-            result = result.replace(k, v)
-
-        # 특수 구조 변환
-        result = re.sub(self.patterns['fraction'], r'\\frac{\1}{\2}', result)
-        result = re.sub(self.patterns['superscript'], r'{\1}^{\2}', result)
-        result = re.sub(self.patterns['subscript'], r'{\1}_{\2}', result)
-        result = re.sub(self.patterns['root'], r'\\sqrt{\1}', result)
-        result = re.sub(self.patterns['combination'], r'C_{\1}^{\2}', result)
-
-        # 행렬 처리
-        def matrix_to_latex(match):
-            content = match.group(1)
-            rows = content.split(';')
-            matrix_content = r' \\ '.join([' & '.join(row.split()) for row in rows])
-            return f"\\begin{{pmatrix}}{matrix_content}\\end{{pmatrix}}"
-
-        result = re.sub(self.patterns['matrix'], matrix_to_latex, result)
-
-        return result
+        # 기호와 특수 구조를 우선순위대로 합친 정규식 하나로 한 번에 변환
+        # (첨자/루트 안쪽은 같은 규칙으로 변환, 행렬 셀도 마찬가지)
+        return self._rewrite(math_expr)
 
     def latex_to_hangul(self, latex_expr: str) -> str:
         """LaTeX를 한글 수식으로 변환"""
-        result = latex_expr
-
-        # 역변환 맵 생성
-        reverse_map = {v: k for k, v in self.symbol_map.items()}
-
-        # 기본 기호 역변환
-        for k, v in reverse_map.items():
-            result = result.replace(k, v)
-
-        # 특수 구조 역변환
-        result = re.sub(r'\\frac\{([^}]+)\}\{([^}]+)\}', r'\1/\2', result)
-        result = re.sub(r'\{([^}]+)\}\^([^}]+)', r'\1^\2', result)
-        result = re.sub(r'\{([^}]+)\}_([^}]+)', r'\1_\2', result)
-        result = re.sub(r'\\sqrt\{([^}]+)\}', r'√{\1}', result)
-
-        # 행렬 역변환
-        def latex_to_matrix(match):
-            content = match.group(1)
-            rows = content.split(r'\\')
-            matrix_content = ';'.join([row.replace('&', ' ').strip() for row in rows])
-            return f"[[{matrix_content}]]"
-
-        result = re.sub(r'\\begin\{pmatrix\}(.*?)\\end\{pmatrix\}', latex_to_matrix, result)
-
-        return result
+        # 중첩된 \frac, 첨자, 행렬도 한 번의 파싱으로 처리
+        return self.plain_emitter.emit(parse_latex(latex_expr))
 
 
 # 사용 예시
@@ -1,70 +1,55 @@
 import re
-from typing import Dict, List, Optional
+from typing import List
+
+from .Emitter import HwpEmitter, LatexEmitter
+from .LatexParser import parse_latex
+from .Parser import parse
+
+
+HANGUL_MATH_PATTERN = re.compile(r'\[(한글수식)\](.*?)\[/한글수식\]', re.DOTALL)
+SPACE_PATTERN = re.compile(r'\s+')
+VALIDATION_PATTERN = re.compile(r'[\s\{\}]')
+
+# 에미터는 상태가 없어 모든 인스턴스가 공유
+LATEX_EMITTER = LatexEmitter()
+HWP_EMITTER = HwpEmitter()
 
 
 class MathConverter:
+    # 출력이 바뀌면 올려서 캐시·매니페스트에 남은 이전 결과를 쓰지 않게 함
+    VERSION = '4'
+    # 이 메서드는 따옴표 밖의 공백이 토큰을 나누기만 하므로 캐시 키에서 정규화
+    NORMALIZED_METHODS = ('hangul_to_latex',)
+
     def __init__(self):
-        # 기본 변환 규칙 정의
-        self.hangul_to_latex_rules = {
-            'TIMES': r'\times',
-            'over': r'\frac',
-            'LEFT': r'\left',
-            'RIGHT': r'\right',
-            'SMALLINTER': r'\cap',
-            r'\(': '{',
-            r'\)': '}',
-            'rm': '',
-            'C': r'C'
-        }
-
-        self.latex_to_hangul_rules = {v: k for k, v in self.hangul_to_latex_rules.items()}
+        self.latex_emitter = LATEX_EMITTER
+        self.hwp_emitter = HWP_EMITTER
 
     def parse_hangul_xml(self, xml_content: str) -> List[str]:
         """한글 XML에서 수식 추출"""
         # 정규표현식을 사용하여 수식 부분 추출
-        math_patterns = re.findall(r'\[(한글수식)\](.*?)\[/한글수식\]', xml_content, re.DOTALL)
+        math_patterns = HANGUL_MATH_PATTERN.findall(xml_content)
         return [math[1].strip() for math in math_patterns]
 
     def hangul_to_latex(self, hangul_math: str) -> str:
         """한글 수식을 Latex로 변환"""
-        latex = hangul_math
-
-        # 분수 처리
-        fraction_pattern = r'(\w+)\s+over\s+(\w+)'
-        while re.search(fraction_pattern, latex):
-            latex = re.sub(fraction_pattern, r'\\frac{\1}{\2}', latex)
-
-        # 기본 변환 규칙 적용
-        for hangul, latex_sym in self.hangul_to_latex_rules.items():
-            latex = latex.replace(hangul, latex_sym)
-
-        # 공백 정리
-        latex = re.sub(r'\s+', ' ', latex).strip()
-
-        return latex
+        # 수식 트리를 한 번에 만든 뒤 순회하며 LaTeX 생성 (분수, 루트, 첨자, LEFT/RIGHT, 행렬)
+        return self.latex_emitter.emit(parse(hangul_math))
 
     def latex_to_hangul(self, latex: str) -> str:
         """Latex를 한글 수식으로 변환"""
-        hangul = latex
-
-        # 분수 처리
-        frac_pattern = r'\\frac\{(.*?)\}\{(.*?)\}'
-        while re.search(frac_pattern, hangul):
-            hangul = re.sub(frac_pattern, r'\1 over \2', hangul)
-
-        # 기본 변환 규칙 적용
-        for latex_sym, hangul_sym in self.latex_to_hangul_rules.items():
-            hangul = hangul.replace(latex_sym, hangul_sym)
+        # LaTeX도 같은 수식 트리로 한 번에 파싱 (중첩 분수를 반복 치환하지 않음)
+        hangul = self.hwp_emitter.emit(parse_latex(latex))
 
         # 공백 정리
-        hangul = re.sub(r'\s+', ' ', hangul).strip()
+        hangul = SPACE_PATTERN.sub(' ', hangul).strip()
 
         return hangul
 
     def validate_conversion(self, original: str, converted: str, reverse_converted: str) -> bool:
         """변환 결과 검증"""
         # 공백과 불필요한 문자 제거 후 비교
-        clean = lambda s: re.sub(r'[\s\{\}]', '', s)
+        clean = lambda s: VALIDATION_PATTERN.sub('', s)
         return clean(original) == clean(reverse_converted)
 
 
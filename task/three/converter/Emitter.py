@@ -0,0 +1,498 @@
+from html import escape
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+from .Ast import (Fenced, Fraction, Group, Identifier, Matrix, Node, Number, Operator,
+                  Root, Row, Scripts, Space, Symbol, Text)
+from .Limits import escape_text
+from .Substitution import ends_with_command
+from .Symbols import GREEK, OPERATORS, UNICODE, latex_symbol
+
+
+LATEX_DELIMITERS = {'{': r'\{', '}': r'\}', '': '.', '||': r'\|'}
+LATEX_SPACES = {'thin': r'\,', 'normal': '~'}
+LATEX_STYLES = {'rm': r'\mathrm', 'bold': r'\mathbf'}
+LATEX_MATRICES = {
+    'matrix': 'matrix', 'pmatrix': 'pmatrix', 'bmatrix': 'bmatrix', 'dmatrix': 'vmatrix',
+    'cases': 'cases', 'pile': 'matrix', 'lpile': 'matrix', 'rpile': 'matrix',
+}
+
+# Handlers return output pieces and child nodes still to be expanded
+Part = Union[str, Node]
+
+
+class Emitter:
+    """Walk an equation AST and write it out as text.
+
+    Each handler returns the node's output as a sequence of strings and child
+    nodes; an explicit stack expands them in order. There is no recursion,
+    so left-deep trees from long ``over`` chains cannot overflow the stack,
+    and the pieces are joined once at the end, so emission is linear.
+    Subclasses provide one ``_<node>`` handler per node type.
+    """
+
+    def __init__(self):
+        self._dispatch: Dict[type, Callable[[Node], Sequence[Part]]] = {
+            Row: self._row,
+            Group: self._group,
+            Number: self._number,
+            Identifier: self._identifier,
+            Symbol: self._symbol,
+            Operator: self._operator,
+            Text: self._text,
+            Space: self._space,
+            Fraction: self._fraction,
+            Root: self._root,
+            Scripts: self._scripts,
+            Fenced: self._fenced,
+            Matrix: self._matrix,
+        }
+
+    def emit(self, node: Node) -> str:
+        out: List[str] = []
+        stack: List[Part] = [node]
+        dispatch = self._dispatch
+        separate = self._separate
+
+        while stack:
+            part = stack.pop()
+            if type(part) is str:
+                if part:
+                    if out and separate(out[-1], part):
+                        out.append(' ')
+                    out.append(part)
+            else:
+                stack.extend(reversed(dispatch[type(part)](part)))
+
+        return ''.join(out)
+
+    @staticmethod
+    def _separate(previous: str, piece: str) -> bool:
+        """True if a space must go between two adjacent output pieces."""
+        return False
+
+    @staticmethod
+    def _inner(node: Node) -> Node:
+        """A node that its parent already wraps in braces."""
+        return node.body if type(node) is Group else node
+
+    def _row(self, node: Row) -> Sequence[Part]:
+        return node.children
+
+    def _group(self, node: Group) -> Sequence[Part]:
+        return '{', node.body, '}'
+
+
+class LatexEmitter(Emitter):
+    """Write an equation AST as LaTeX."""
+
+    @staticmethod
+    def _separate(previous: str, piece: str) -> bool:
+        # Keep "\times x" from turning into the unknown command "\timesx"
+        return piece[0].isalpha() and ends_with_command(previous)
+
+    def _number(self, node: Number) -> Sequence[Part]:
+        return node.text,
+
+    def _identifier(self, node: Identifier) -> Sequence[Part]:
+        if node.style in LATEX_STYLES:
+            return f'{LATEX_STYLES[node.style]}{{{node.text}}}',
+        return node.text,
+
+    def _symbol(self, node: Symbol) -> Sequence[Part]:
+        return latex_symbol(node.name),
+
+    def _operator(self, node: Operator) -> Sequence[Part]:
+        return OPERATORS.get(node.text, node.text),
+
+    def _text(self, node: Text) -> Sequence[Part]:
+        # "50%" would comment out the rest of the line; braces would unbalance it
+        return f'\\text{{{escape_text(node.text)}}}',
+
+    def _space(self, node: Space) -> Sequence[Part]:
+        return LATEX_SPACES[node.width],
+
+    def _fraction(self, node: Fraction) -> Sequence[Part]:
+        numerator = self._inner(node.numerator)
+        denominator = self._inner(node.denominator)
+        if node.line:
+            return r'\frac{', numerator, '}{', denominator, '}'
+        return '{', numerator, r' \atop ', denominator, '}'
+
+    def _root(self, node: Root) -> Sequence[Part]:
+        if node.index is None:
+            return r'\sqrt{', self._inner(node.radicand), '}'
+        return r'\sqrt[', self._inner(node.index), ']{', self._inner(node.radicand), '}'
+
+    def _scripts(self, node: Scripts) -> Sequence[Part]:
+        if node.base is None:
+            parts: List[Part] = ['{}']
+        elif type(node.base) is Scripts:
+            # x^2^3: LaTeX refuses a double superscript without braces
+            parts = ['{', node.base, '}']
+        else:
+            parts = [node.base]
+        if node.sub is not None:
+            parts += ['_{', self._inner(node.sub), '}']
+        if node.sup is not None:
+            parts += ['^{', self._inner(node.sup), '}']
+        return parts
+
+    def _fenced(self, node: Fenced) -> Sequence[Part]:
+        if node.sized:
+            return (r'\left' + LATEX_DELIMITERS.get(node.left, node.left),
+                    node.body,
+                    r'\right' + LATEX_DELIMITERS.get(node.right, node.right))
+        return node.left, node.body, node.right
+
+    def _matrix(self, node: Matrix) -> Sequence[Part]:
+        environment = LATEX_MATRICES[node.kind]
+        parts: List[Part] = [f'\\begin{{{environment}}}']
+        for r, row in enumerate(node.rows):
+            if r:
+                parts.append(r' \\ ')
+            cells = row
+            if node.kind == 'cases':
+                # HWP aligns cases with "&&"; LaTeX cases has two columns
+                cells = [cell for cell in row if cell.children] or row
+            for c, cell in enumerate(cells):
+                if c:
+                    parts.append(' & ')
+                parts.append(cell)
+        parts.append(f'\\end{{{environment}}}')
+        return parts
+
+
+HWP_DELIMITERS = {'{': 'lbrace', '}': 'rbrace', '': '.'}
+HWP_OPERATORS = {'{': 'lbrace', '}': 'rbrace'}
+HWP_SPACES = {'thin': '`', 'normal': '~'}
+# Adjacent characters the HWP lexer would read as one operator ("3! =6")
+HWP_DIGRAPHS = frozenset({'<=', '>=', '!=', '==', '->', '<-'})
+
+
+def _is_hangul(text: str) -> bool:
+    return all('가' <= char <= '힣' or 'ㄱ' <= char <= 'ㆎ' or char == ' ' for char in text)
+
+
+class HwpEmitter(Emitter):
+    """Write an equation AST as an HWP equation script."""
+
+    @staticmethod
+    def _separate(previous: str, piece: str) -> bool:
+        # "a times b", not "atimesb": HWP words need a space between them
+        last, first = previous[-1], piece[0]
+        return ((last.isalpha() and first.isalpha()) or (last.isdigit() and first.isdigit())
+                or last + first in HWP_DIGRAPHS)
+
+    def _number(self, node: Number) -> Sequence[Part]:
+        return node.text,
+
+    def _identifier(self, node: Identifier) -> Sequence[Part]:
+        if node.style is not None:
+            # Styles stay on until "it" switches back to italic
+            return node.style, node.text, 'it'
+        return node.text,
+
+    def _symbol(self, node: Symbol) -> Sequence[Part]:
+        return node.name,
+
+    def _operator(self, node: Operator) -> Sequence[Part]:
+        return HWP_OPERATORS.get(node.text, node.text),
+
+    def _text(self, node: Text) -> Sequence[Part]:
+        return node.text if _is_hangul(node.text) else f'"{node.text}"',
+
+    def _space(self, node: Space) -> Sequence[Part]:
+        return HWP_SPACES[node.width],
+
+    def _fraction(self, node: Fraction) -> Sequence[Part]:
+        keyword = '} over {' if node.line else '} atop {'
+        return '{', self._inner(node.numerator), keyword, self._inner(node.denominator), '}'
+
+    def _root(self, node: Root) -> Sequence[Part]:
+        if node.index is None:
+            return 'sqrt {', self._inner(node.radicand), '}'
+        return 'root {', self._inner(node.index), '} of {', self._inner(node.radicand), '}'
+
+    def _scripts(self, node: Scripts) -> Sequence[Part]:
+        base = node.base
+        if base is None:
+            parts: List[Part] = ['{}']
+        elif type(base) is Scripts:
+            parts = ['{', base, '}']
+        elif type(base) is Identifier and base.style is not None:
+            # "rm C it _{4}" would attach the script to "it"; a group ends the style
+            parts = ['{', base.style, base.text, '}']
+        else:
+            parts = [base]
+        if node.sub is not None:
+            parts += ['_{', self._inner(node.sub), '}']
+        if node.sup is not None:
+            parts += ['^{', self._inner(node.sup), '}']
+        return parts
+
+    def _fenced(self, node: Fenced) -> Sequence[Part]:
+        if node.sized:
+            return ('LEFT ' + HWP_DELIMITERS.get(node.left, node.left),
+                    node.body,
+                    'RIGHT ' + HWP_DELIMITERS.get(node.right, node.right))
+        return node.left, node.body, node.right
+
+    def _matrix(self, node: Matrix) -> Sequence[Part]:
+        parts: List[Part] = [node.kind, '{']
+        for r, row in enumerate(node.rows):
+            if r:
+                parts.append(' # ')
+            for c, cell in enumerate(row):
+                if c:
+                    parts.append(' & ')
+                parts.append(cell)
+        parts.append('}')
+        return parts
+
+
+class PlainEmitter(Emitter):
+    """Write an equation AST in the linear notation of Converter2/four.
+
+    ``1/3``, ``x^2``, ``√{x}``, ``[[1 2;3 4]]``, with symbols written as the
+    characters in ``symbols`` (LaTeX command -> character, e.g. ``\\times`` -> ``×``).
+    An operand longer than one piece is parenthesized: ``1/(2/3)``, ``x_(ij)``.
+    """
+
+    def __init__(self, symbols: Optional[Dict[str, str]] = None):
+        super().__init__()
+        self.symbols = symbols or {}
+
+    @staticmethod
+    def _separate(previous: str, piece: str) -> bool:
+        return previous[-1].isalpha() and piece[0].isalpha()
+
+    @staticmethod
+    def _operand(node: Node) -> Node:
+        """The node under its braces and one-item rows."""
+        while True:
+            if type(node) is Group:
+                node = node.body
+            elif type(node) is Row and len(node.children) == 1:
+                node = node.children[0]
+            else:
+                return node
+
+    @staticmethod
+    def _unit(node: Node) -> bool:
+        """True if ``node`` is written as one piece that needs no parentheses."""
+        if type(node) is Fenced:
+            return node.left != '.' and node.right != '.'
+        return type(node) in (Number, Identifier, Symbol, Text, Root, Matrix)
+
+    def _atom(self, node: Node) -> Sequence[Part]:
+        """Parenthesize anything but one piece, e.g. ``(a+b)/2``, ``1/(2/3)``, ``(x^2)^3``."""
+        inner = self._operand(node)
+        return (inner,) if self._unit(inner) else ('(', inner, ')')
+
+    def _script(self, mark: str, node: Node) -> Sequence[Part]:
+        """``x^2``, ``x^10``; a name of several letters is grouped too, ``x_(ij)``."""
+        inner = self._operand(node)
+        if type(inner) in (Identifier, Text):
+            grouped = len(inner.text) > 1
+        elif type(inner) is Symbol:
+            grouped = len(self._symbol(inner)[0]) > 1
+        else:
+            grouped = not self._unit(inner)
+        return (mark, '(', inner, ')') if grouped else (mark, inner)
+
+    def _number(self, node: Number) -> Sequence[Part]:
+        return node.text,
+
+    def _identifier(self, node: Identifier) -> Sequence[Part]:
+        return node.text,
+
+    def _symbol(self, node: Symbol) -> Sequence[Part]:
+        latex = latex_symbol(node.name)
+        return self.symbols.get(latex, latex.lstrip('\\')),
+
+    def _operator(self, node: Operator) -> Sequence[Part]:
+        return node.text,
+
+    def _text(self, node: Text) -> Sequence[Part]:
+        return node.text,
+
+    def _space(self, node: Space) -> Sequence[Part]:
+        return ' ',
+
+    def _fraction(self, node: Fraction) -> Sequence[Part]:
+        return (*self._atom(node.numerator), '/', *self._atom(node.denominator))
+
+    def _root(self, node: Root) -> Sequence[Part]:
+        if node.index is None:
+            return '√{', self._inner(node.radicand), '}'
+        return '√[', self._inner(node.index), ']{', self._inner(node.radicand), '}'
+
+    def _scripts(self, node: Scripts) -> Sequence[Part]:
+        parts: List[Part] = [] if node.base is None else list(self._atom(node.base))
+        if node.sub is not None:
+            parts += self._script('_', node.sub)
+        if node.sup is not None:
+            parts += self._script('^', node.sup)
+        return parts
+
+    def _fenced(self, node: Fenced) -> Sequence[Part]:
+        left = '' if node.left == '.' else node.left
+        right = '' if node.right == '.' else node.right
+        return left, node.body, right
+
+    def _matrix(self, node: Matrix) -> Sequence[Part]:
+        parts: List[Part] = ['[[']
+        for r, row in enumerate(node.rows):
+            if r:
+                parts.append(';')
+            for c, cell in enumerate(row):
+                if c:
+                    parts.append(' ')
+                parts.append(cell)
+        parts.append(']]')
+        return parts
+
+
+MATHML_NAMESPACE = 'http://www.w3.org/1998/Math/MathML'
+MATHML_OPERATORS = {'-': '\u2212', '*': '\u2217', "'": '\u2032'}
+MATHML_DELIMITERS = {'': '', '.': '', '||': '\u2016', '<': '\u27e8', '>': '\u27e9'}
+MATHML_SPACES = {'thin': '0.1667em', 'normal': '0.3333em'}
+MATHML_STYLES = {'rm': 'normal', 'bold': 'bold'}
+# kind -> (left, right, column alignment)
+MATHML_MATRICES = {
+    'matrix': ('', '', 'center'), 'pmatrix': ('(', ')', 'center'), 'bmatrix': ('[', ']', 'center'),
+    'dmatrix': ('|', '|', 'center'), 'cases': ('{', '', 'left'), 'pile': ('', '', 'center'),
+    'lpile': ('', '', 'left'), 'rpile': ('', '', 'right'),
+}
+# Symbols written as identifiers; the rest are operators
+MATHML_IDENTIFIERS = frozenset(GREEK) | {'infty', 'inf', 'emptyset', 'partial', 'nabla'}
+# Symbols whose limits go under and over them, as in display-style LaTeX
+MATHML_LIMITS = frozenset({'sum', 'prod', 'bigcup', 'bigcap', 'lim', 'max', 'min'})
+
+
+class MathMLEmitter(Emitter):
+    """Write an equation AST as presentation MathML.
+
+    Browsers lay MathML out natively, so a page of converted equations needs
+    no TeX parsing on the client. Every node other than a Row comes out as
+    exactly one element, which is what fractions, roots and scripts take as
+    their arguments; a Row of several nodes is wrapped in ``<mrow>`` there.
+    """
+
+    def emit(self, node: Node) -> str:
+        return f'<math xmlns="{MATHML_NAMESPACE}">{super().emit(node)}</math>'
+
+    @staticmethod
+    def _argument(node: Node) -> Sequence[Part]:
+        """``node`` as a single element."""
+        if type(node) is Row:
+            if len(node.children) == 1:
+                return node.children[0],
+            return '<mrow>', node, '</mrow>'
+        return node,
+
+    @staticmethod
+    def _mo(text: str, stretchy: Optional[bool] = None) -> str:
+        if not text:
+            return ''
+        if stretchy is None:
+            return f'<mo>{escape(text, quote=False)}</mo>'
+        return f'<mo stretchy="{"true" if stretchy else "false"}">{escape(text, quote=False)}</mo>'
+
+    def _group(self, node: Group) -> Sequence[Part]:
+        return '<mrow>', node.body, '</mrow>'
+
+    def _number(self, node: Number) -> Sequence[Part]:
+        return f'<mn>{node.text}</mn>',
+
+    def _identifier(self, node: Identifier) -> Sequence[Part]:
+        if node.style in MATHML_STYLES:
+            return f'<mi mathvariant="{MATHML_STYLES[node.style]}">{escape(node.text, quote=False)}</mi>',
+        if len(node.text) == 1:
+            return f'<mi>{escape(node.text, quote=False)}</mi>',
+        # "abc" is three italic variables in LaTeX; a single <mi> would set it upright
+        return '<mrow>' + ''.join(f'<mi>{escape(char, quote=False)}</mi>' for char in node.text) + '</mrow>',
+
+    def _symbol(self, node: Symbol) -> Sequence[Part]:
+        latex = latex_symbol(node.name)
+        text = UNICODE.get(latex)
+        if text is None:
+            # Functions (sin, lim, ...) and omicron: upright names
+            return '<mi>' + latex.lstrip('\\') + '</mi>',
+        if node.name in MATHML_IDENTIFIERS:
+            if node.name.isupper():
+                return f'<mi mathvariant="normal">{text}</mi>',
+            return f'<mi>{text}</mi>',
+        return self._mo(text),
+
+    def _operator(self, node: Operator) -> Sequence[Part]:
+        if node.text == '#':
+            return '<mspace linebreak="newline"/>',
+        text = MATHML_OPERATORS.get(node.text)
+        if text is None:
+            latex = OPERATORS.get(node.text)
+            text = UNICODE.get(latex, node.text) if latex is not None else node.text
+        return self._mo(text, False if node.text in '()[]|' else None),
+
+    def _text(self, node: Text) -> Sequence[Part]:
+        return f'<mtext>{escape(node.text, quote=False)}</mtext>',
+
+    def _space(self, node: Space) -> Sequence[Part]:
+        return f'<mspace width="{MATHML_SPACES[node.width]}"/>',
+
+    def _fraction(self, node: Fraction) -> Sequence[Part]:
+        open_tag = '<mfrac>' if node.line else '<mfrac linethickness="0">'
+        return (open_tag, *self._argument(self._inner(node.numerator)),
+                *self._argument(self._inner(node.denominator)), '</mfrac>')
+
+    def _root(self, node: Root) -> Sequence[Part]:
+        if node.index is None:
+            return '<msqrt>', self._inner(node.radicand), '</msqrt>'
+        return ('<mroot>', *self._argument(self._inner(node.radicand)),
+                *self._argument(self._inner(node.index)), '</mroot>')
+
+    def _scripts(self, node: Scripts) -> Sequence[Part]:
+        base = node.base
+        limits = type(base) is Symbol and base.name in MATHML_LIMITS
+        if node.sub is not None and node.sup is not None:
+            tag = 'munderover' if limits else 'msubsup'
+        elif node.sub is not None:
+            tag = 'munder' if limits else 'msub'
+        else:
+            tag = 'mover' if limits else 'msup'
+        parts: List[Part] = [f'<{tag}>']
+        if base is None:
+            # A prescript ("_2 C_1") has an empty base, like LaTeX's "{}_{2}"
+            parts.append('<mrow/>')
+        elif limits and latex_symbol(base.name) not in UNICODE:
+            # lim, max, min: the limits go beside the name in inline math, as with \sum
+            parts.append(f'<mo movablelimits="true">{base.name}</mo>')
+        else:
+            parts += self._argument(base)
+        if node.sub is not None:
+            parts += self._argument(self._inner(node.sub))
+        if node.sup is not None:
+            parts += self._argument(self._inner(node.sup))
+        parts.append(f'</{tag}>')
+        return parts
+
+    def _fenced(self, node: Fenced) -> Sequence[Part]:
+        left = MATHML_DELIMITERS.get(node.left, node.left)
+        right = MATHML_DELIMITERS.get(node.right, node.right)
+        # LEFT/RIGHT grow with their body; plain brackets keep their size
+        return '<mrow>', self._mo(left, node.sized), node.body, self._mo(right, node.sized), '</mrow>'
+
+    def _matrix(self, node: Matrix) -> Sequence[Part]:
+        left, right, align = MATHML_MATRICES[node.kind]
+        parts: List[Part] = ['<mrow>', self._mo(left, True), f'<mtable columnalign="{align}">']
+        for row in node.rows:
+            cells = row
+            if node.kind == 'cases':
+                # HWP aligns cases with "&&"; drop the empty column as LaTeX does
+                cells = [cell for cell in row if cell.children] or row
+            parts.append('<mtr>')
+            for cell in cells:
+                parts += '<mtd>', cell, '</mtd>'
+            parts.append('</mtr>')
+        parts += '</mtable>', self._mo(right, True), '</mrow>'
+        return parts
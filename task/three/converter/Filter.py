@@ -0,0 +1,175 @@
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .Bulk import korean_to_latex_many
+from .Cache import CachedConverter
+from .Limits import ConversionError
+
+DIRECTIONS = ('korean_to_latex', 'latex_to_korean')
+# name -> (module, class) of the converters with korean_to_latex/latex_to_korean
+CONVERTERS = {
+    'one': ('task.one.Converter', 'MathExpressionConverter'),
+    'two': ('task.two.Converter', 'AdvancedMathConverter'),
+    'three': ('task.three.converter.Converter', 'KoreanMathConverter'),
+}
+# Lines converted together (flat scripts in bulk) and handed to a worker at a time
+CHUNK_LINES = 256
+# Chunks in flight per worker; reading stops while the window is full
+WINDOW = 4
+
+# One converter per process, built by the pool initializer
+_converter = None
+_bulk = False
+
+
+def _init_worker(name: str = 'three'):
+    global _converter, _bulk
+    module, cls = CONVERTERS[name]
+    # The LRU bounds the cache, so memory stays flat however long the stream
+    _converter = CachedConverter(getattr(importlib.import_module(module), cls)())
+    # Flat scripts in one pass over a joined buffer; the output is three's
+    _bulk = name == 'three'
+
+
+def _parse(line: bytes) -> Tuple[dict, Optional[str], Optional[str]]:
+    """The output record so far, the direction and the script, or a record with an error."""
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return {'error': f'invalid JSON: {e}'}, None, None
+    if not isinstance(record, dict):
+        return {'error': 'expected a JSON object'}, None, None
+
+    result = {'id': record.get('id')}
+    direction = record.get('direction', 'korean_to_latex')
+    script = record.get('script')
+    if not isinstance(script, str):
+        result['error'] = 'expected "script"'
+    elif direction not in DIRECTIONS or not hasattr(_converter, direction):
+        result['error'] = f'unsupported direction {direction!r}'
+    else:
+        return result, direction, script
+    return result, None, None
+
+
+def convert_lines(lines: List[bytes]) -> Tuple[bytes, int]:
+    """NDJSON output of ``lines`` in the same order, and the number of records with an error.
+
+    Each line is ``{"id", "script", "direction"}`` with a direction of
+    DIRECTIONS (``korean_to_latex`` if missing) and comes back as
+    ``{"id", "result"}``, or ``{"id", "error"}`` for a line that is not a
+    valid record or a script the converter refuses.
+    """
+    if _converter is None:
+        _init_worker()
+
+    parsed = [_parse(line) for line in lines]
+    # (direction, script) -> error, for the scripts refused by the limits
+    refused: Dict[Tuple[str, str], str] = {}
+
+    def convert(direction: str, script: str) -> str:
+        try:
+            return getattr(_converter, direction)(script)
+        except ConversionError as e:
+            refused[direction, script] = str(e)
+            return ''
+
+    outputs: Dict[int, str] = {}
+    if _bulk:
+        forward = [i for i, (_, direction, _) in enumerate(parsed) if direction == 'korean_to_latex']
+        latex = korean_to_latex_many([parsed[i][2] for i in forward],
+                                     lambda script: convert('korean_to_latex', script))
+        outputs.update(zip(forward, latex))
+
+    out = []
+    failed = 0
+    for i, (result, direction, script) in enumerate(parsed):
+        if direction is not None:
+            output = outputs[i] if i in outputs else convert(direction, script)
+            if (direction, script) in refused:
+                result['error'] = refused[direction, script]
+            else:
+                result['result'] = output
+        failed += 'error' in result
+        out.append(json.dumps(result, ensure_ascii=False))
+    out.append('')
+    return '\n'.join(out).encode('utf-8'), failed
+
+
+def _chunks(lines: Iterable[bytes], size: int) -> Iterator[List[bytes]]:
+    lines = (line for line in lines if line.strip())
+    while True:
+        chunk = list(islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_output(lines: Iterable[bytes], jobs: int = 1, converter: str = 'three',
+                chunk: int = CHUNK_LINES, window: int = WINDOW) -> Iterator[Tuple[bytes, int, int]]:
+    """Convert NDJSON ``lines`` as they are read; yields ``(output, failed, records)`` per chunk.
+
+    Lines are converted ``chunk`` at a time (``chunk=1`` answers each line
+    before reading the next). With ``jobs`` > 1 chunks go to the workers,
+    at most ``jobs * window`` in flight, and come back in input order: a
+    slow reader of the output stops the reading of the input, so memory is
+    bounded by the window whatever the length of the stream.
+    """
+    if jobs <= 1:
+        _init_worker(converter)
+        for batch in _chunks(lines, chunk):
+            yield (*convert_lines(batch), len(batch))
+        return
+
+    with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(converter,)) as pool:
+        pending: Deque[Tuple[Future, int]] = deque()
+        for batch in _chunks(lines, chunk):
+            if len(pending) >= jobs * window:
+                future, count = pending.popleft()
+                yield (*future.result(), count)
+            pending.append((pool.submit(convert_lines, batch), len(batch)))
+        while pending:
+            future, count = pending.popleft()
+            yield (*future.result(), count)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description='표준 입력의 NDJSON({"id", "script", "direction"})을 변환해 표준 출력으로 씀')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='작업 프로세스 수 (출력 순서는 입력과 같음)')
+    parser.add_argument('--converter', choices=sorted(CONVERTERS), default='three', help='사용할 변환기')
+    parser.add_argument('--chunk', type=int, default=CHUNK_LINES,
+                        help='한 번에 변환하는 줄 수 (1이면 줄마다 바로 출력)')
+    parser.add_argument('--window', type=int, default=WINDOW,
+                        help='작업자당 처리 중인 묶음 수, 가득 차면 입력 읽기를 멈춤')
+    args = parser.parse_args(argv)
+
+    out = sys.stdout.buffer
+    records = failed = 0
+    start = time.perf_counter()
+    try:
+        for data, errors, count in iter_output(sys.stdin.buffer, args.jobs, args.converter,
+                                               args.chunk, args.window):
+            out.write(data)
+            out.flush()
+            records += count
+            failed += errors
+    except BrokenPipeError:
+        # The reader went away (``| head``); stop quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+
+    elapsed = time.perf_counter() - start
+    print(f"{records} records ({failed} failed) in {elapsed:.2f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
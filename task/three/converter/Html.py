@@ -0,0 +1,103 @@
+import sys
+from html import escape
+from typing import Callable, Iterable, Iterator, Tuple
+
+from .Ast import Row, Text
+from .Emitter import MathMLEmitter
+from .Limits import ConversionError, fallback_latex
+from .Streaming import BREAK, END, EQUATION, PARAGRAPH, TEXT
+
+MATHJAX_URL = 'https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js'
+
+HEAD = '''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script>MathJax = {{tex: {{inlineMath: [['\\\\(', '\\\\)']]}}}};</script>
+<script id="MathJax-script" async src="{mathjax}"></script>
+</head>
+<body>
+'''
+# Browsers render MathML themselves: no script, nothing to typeset on load
+MATHML_HEAD = '''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+</head>
+<body>
+'''
+TAIL = '''</body>
+</html>
+'''
+
+
+MATHML_EMITTER = MathMLEmitter()
+
+
+def iter_html(events: Iterable[Tuple[str, str]], convert: Callable[[str], str],
+              title: str = '', mathjax: str = MATHJAX_URL, mathml: bool = False) -> Iterator[str]:
+    """Turn document events into HTML chunks: the head, one ``<p>`` per paragraph, the tail.
+
+    Only the paragraph being built is held in memory, so the output can be
+    written to a file or an HTTP response as it is produced. A script the
+    converter refuses is shown as text. With ``mathml`` ``convert`` returns
+    MathML (``korean_to_mathml``), which goes into the page as it is and
+    the page loads no MathJax.
+    """
+    if mathml:
+        yield MATHML_HEAD.format(title=escape(title))
+    else:
+        yield HEAD.format(title=escape(title), mathjax=escape(mathjax))
+
+    parts = []
+    for event, text in events:
+        if event == TEXT:
+            parts.append(escape(text, quote=False))
+        elif event == EQUATION:
+            if text:
+                try:
+                    math = convert(text)
+                except ConversionError:
+                    math = MATHML_EMITTER.emit(Row([Text(text)])) if mathml else fallback_latex(text)
+                parts.append(math if mathml else f'\\({escape(math, quote=False)}\\)')
+        elif event == BREAK:
+            parts.append('<br>')
+        elif event == END:
+            if parts:
+                yield f'<p>{"".join(parts)}</p>\n'
+            parts = []
+        elif event == PARAGRAPH:
+            parts = []
+
+    yield TAIL
+
+
+def write_html(converter, file_path, target_path, mathml: bool = False) -> int:
+    """Export an HWPX/HML file to ``target_path``; returns the number of chunks written."""
+    convert = converter.korean_to_mathml if mathml else converter.korean_to_latex
+    chunks = iter_html(converter.iter_document(file_path), convert, title=str(file_path), mathml=mathml)
+    count = 0
+    with open(target_path, 'w', encoding='utf-8') as f:
+        for chunk in chunks:
+            f.write(chunk)
+            count += 1
+    return count
+
+
+def main():
+    """python -m task.three.converter.Html <in.hwpx|in.hml> <out.html> [--mathml]: MathJax (or MathML) page."""
+    from .Converter import KoreanMathConverter
+
+    args = [arg for arg in sys.argv[1:] if arg != '--mathml']
+    if len(args) != 2:
+        print(main.__doc__)
+        sys.exit(2)
+
+    count = write_html(KoreanMathConverter(), args[0], args[1], mathml='--mathml' in sys.argv)
+    print(f"{count} chunks -> {args[1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import posixpath
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .Metrics import timed_reader
+from .Streaming import iter_document, iter_equations
+
+
+OPF_NS = 'http://www.idpf.org/2007/opf/'
+
+CONTENT_HPF = 'Contents/content.hpf'
+SECTION_PATTERN = re.compile(r'^Contents/section(\d+)\.xml$')
+
+
+class MemberTooLarge(ValueError):
+    """A member the reader would inflate is larger than its ``max_size``."""
+
+
+class HwpxReader:
+    """Lazy reader for the equations stored in an HWPX (zip) archive.
+
+    The archive is opened once. Only the ``Contents/section*.xml`` members are
+    ever inflated; ``BinData/`` images and the other parts are never read.
+    With ``max_size``, ``sections()`` raises MemberTooLarge before anything
+    is inflated if the manifest or a section is larger than that uncompressed.
+    """
+
+    def __init__(self, file_path, max_size: Optional[int] = None):
+        self._zip = zipfile.ZipFile(file_path)
+        self.max_size = max_size
+        self._sections: Optional[List[str]] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self._zip.close()
+
+    def sections(self) -> List[str]:
+        """Return the section members in document order."""
+        if self._sections is None:
+            self._sections = self._read_section_order()
+        return self._sections
+
+    def read_section(self, section: str) -> bytes:
+        """Inflated XML of one section member, e.g. to hand to another process."""
+        with self._zip.open(section) as fp:
+            return timed_reader(fp, 'zip_inflate').read()
+
+    def iter_equations(self) -> Iterator[Tuple[str, str, str]]:
+        """Yield ``(section, equation id, script)`` for every equation, lazily."""
+        for section in self.sections():
+            # Inflate and parse the member incrementally, never as a whole DOM
+            with self._zip.open(section) as fp:
+                for equation_id, script in iter_equations(timed_reader(fp, 'zip_inflate')):
+                    yield section, equation_id, script
+
+    def iter_document(self) -> Iterator[Tuple[str, str]]:
+        """Yield ``(event, text)`` document events of every section, in order."""
+        for section in self.sections():
+            with self._zip.open(section) as fp:
+                yield from iter_document(timed_reader(fp, 'zip_inflate'))
+
+    def _check_size(self, name: str):
+        # The declared size is what inflating stops at, so checking it is enough
+        size = self._zip.getinfo(name).file_size
+        if self.max_size is not None and size > self.max_size:
+            raise MemberTooLarge(f'{name} is {size} bytes uncompressed (limit {self.max_size})')
+
+    def _read_section_order(self) -> List[str]:
+        """Resolve the section order from the ``content.hpf`` manifest/spine."""
+        order = self._spine_order()
+        for section in order:
+            self._check_size(section)
+        return order
+
+    def _spine_order(self) -> List[str]:
+        names = set(self._zip.namelist())
+        fallback = sorted(
+            (name for name in names if SECTION_PATTERN.match(name)),
+            key=lambda name: int(SECTION_PATTERN.match(name).group(1))
+        )
+
+        if CONTENT_HPF not in names:
+            return fallback
+
+        self._check_size(CONTENT_HPF)
+        root = ET.fromstring(self._zip.read(CONTENT_HPF))
+        base = posixpath.dirname(CONTENT_HPF)
+
+        # Manifest: item id -> archive member
+        items: Dict[str, str] = {}
+        for item in root.iter(f'{{{OPF_NS}}}item'):
+            href = item.get('href', '')
+            if href not in names:
+                href = posixpath.normpath(posixpath.join(base, href))
+            if SECTION_PATTERN.match(href) and href in names:
+                items[item.get('id', '')] = href
+
+        # Spine order first, then any manifest sections the spine left out
+        order = []
+        for itemref in root.iter(f'{{{OPF_NS}}}itemref'):
+            href = items.get(itemref.get('idref', ''))
+            if href and href not in order:
+                order.append(href)
+        for href in items.values():
+            if href not in order:
+                order.append(href)
+
+        return order or fallback
@@ -0,0 +1,154 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .Cache import converter_name, normalize_script
+from .Limits import ConversionError
+
+
+def script_hash(script: str) -> str:
+    """Content address of a script; whitespace-only edits outside quotes keep the same hash."""
+    return hashlib.blake2b(normalize_script(script).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def converter_version(converter) -> str:
+    """``module.Name:VERSION`` of the converter (seen through a CachedConverter)."""
+    inner = getattr(converter, 'converter', converter)
+    return f"{converter_name(inner)}:{inner.VERSION}"
+
+
+class Manifest:
+    """``(equation id, script hash) -> LaTeX`` of one document, kept as JSON.
+
+    Equation ids are not unique inside a document (the sample reuses ten ids
+    for 923 equations), so an equation whose exact key is missing is still
+    reused when any entry has the same script hash: the output depends on
+    the script only.
+    """
+
+    def __init__(self, version: str, entries: Optional[Dict[Tuple[str, str], str]] = None):
+        self.version = version
+        self.entries: Dict[Tuple[str, str], str] = entries or {}
+        self._by_hash = {digest: latex for (_, digest), latex in self.entries.items()}
+
+    @classmethod
+    def load(cls, path: str, version: str) -> 'Manifest':
+        """Read ``path``; a missing file or another converter version gives an empty manifest."""
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(version)
+        if not isinstance(data, dict) or data.get('version') != version:
+            return cls(version)
+        entries = {(equation_id, digest): latex for equation_id, digest, latex in data.get('equations', [])}
+        return cls(version, entries)
+
+    def save(self, path: str):
+        """Write atomically, so an interrupted run leaves the previous manifest."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': self.version,
+                'equations': [[equation_id, digest, latex]
+                              for (equation_id, digest), latex in self.entries.items()],
+            }, f, ensure_ascii=False)
+        os.replace(temporary, path)
+
+    def get(self, equation_id: str, digest: str) -> Optional[str]:
+        latex = self.entries.get((equation_id, digest))
+        return latex if latex is not None else self._by_hash.get(digest)
+
+    def put(self, equation_id: str, digest: str, latex: str):
+        self.entries[(equation_id, digest)] = latex
+        self._by_hash[digest] = latex
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class IncrementalResult(NamedTuple):
+    equations: List[Tuple[Optional[str], str, str]]  # (id, script, latex) in document order
+    reused: int
+    recomputed: int
+    removed: int  # manifest entries that are no longer in the document
+    rejected: int = 0  # scripts refused by the limits, given their fallback
+
+
+def convert_equations(converter, equations: Iterable[Tuple[Optional[str], str]], manifest: Manifest,
+                      fallback: Optional[Callable[[str], str]] = None) -> Tuple[IncrementalResult, Manifest]:
+    """Convert only scripts that are not in ``manifest``; return the result and the new manifest.
+
+    With ``fallback`` a script the converter refuses (ConversionError) gets
+    ``fallback(script)`` instead of failing the run. Only real conversions
+    go into the manifest, so a refused script is tried again next time.
+    """
+    current = Manifest(manifest.version)
+    results = []
+    reused = recomputed = rejected = 0
+    for equation_id, script in equations:
+        key = (equation_id or '', script_hash(script))
+        latex = current.entries.get(key)
+        if latex is None:
+            latex = manifest.get(*key)
+        if latex is not None:
+            reused += 1
+        else:
+            try:
+                latex = converter.korean_to_latex(script)
+            except ConversionError:
+                if fallback is None:
+                    raise
+                rejected += 1
+                results.append((equation_id, script, fallback(script)))
+                continue
+            recomputed += 1
+        current.put(*key, latex)
+        results.append((equation_id, script, latex))
+
+    removed = sum(1 for key in manifest.entries if key not in current.entries)
+    return IncrementalResult(results, reused, recomputed, removed, rejected), current
+
+
+def convert_document(converter, path: str, manifest_path: str,
+                     fallback: Optional[Callable[[str], str]] = None) -> IncrementalResult:
+    """Convert an HWPX/HML file, reusing the outputs recorded in ``manifest_path``."""
+    manifest = Manifest.load(manifest_path, converter_version(converter))
+    result, updated = convert_equations(converter, converter.iter_equations(path), manifest, fallback)
+    updated.save(manifest_path)
+    return result
+
+
+def manifest_path(directory: str, path: str) -> str:
+    """Manifest file of a document inside ``directory``, one per document path."""
+    name = hashlib.blake2b(os.path.abspath(path).encode('utf-8'), digest_size=8).hexdigest()
+    return os.path.join(directory, f'{os.path.basename(path)}.{name}.json')
+
+
+def main(argv: Optional[List[str]] = None):
+    from .Converter import KoreanMathConverter
+
+    parser = argparse.ArgumentParser(description='바뀐 수식만 다시 변환')
+    parser.add_argument('document', help='HWPX/HML 파일')
+    parser.add_argument('-m', '--manifest', help='매니페스트 JSON 경로 (기본값: <문서>.manifest.json)')
+    parser.add_argument('-o', '--output', help='결과 NDJSON 파일')
+    args = parser.parse_args(argv)
+
+    result = convert_document(KoreanMathConverter(), args.document,
+                              args.manifest or f'{args.document}.manifest.json')
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as out:
+            for equation_id, script, latex in result.equations:
+                out.write(json.dumps({'id': equation_id, 'script': script, 'latex': latex},
+                                     ensure_ascii=False) + '\n')
+    print(f"{len(result.equations)} equations: {result.reused} reused, "
+          f"{result.recomputed} recomputed, {result.removed} removed", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+import re
+from typing import FrozenSet, List, Optional
+
+from .Ast import (Fenced, Fraction, Group, Identifier, Matrix, Node, Number, Operator,
+                  Root, Row, Scripts, Space, Symbol, Text)
+from .Lexer import Token
+from .Limits import MAX_DEPTH, check_length, too_deep, unescape_text
+from .Symbols import LATEX_NAMES
+
+
+# Every character belongs to exactly one match, as in Lexer.TOKEN_PATTERN
+LATEX_TOKEN_PATTERN = re.compile(
+    r'\\\\'                  # NEWLINE (row break)
+    r'|\\[A-Za-z]+'          # CMD
+    r'|\\.'                  # CMD (control symbol: \{ \, \| ...)
+    r'|\s+'                  # SPACE (dropped)
+    r'|\d+(?:\.\d+)?'        # NUMBER
+    r'|[A-Za-z]+'            # WORD
+    r'|[가-힣ㄱ-ㆎ]+'         # TEXT (Hangul)
+    r'|.',                   # single punctuation / CHAR
+    re.DOTALL
+)
+
+LATEX_PUNCTUATION = {
+    '{': 'LBRACE',
+    '}': 'RBRACE',
+    '[': 'LBRACKET',
+    ']': 'RBRACKET',
+    '^': 'SUP',
+    '_': 'SUB',
+    '&': 'AMP',
+    '~': 'TILDE',
+}
+
+_new_token = tuple.__new__
+
+
+def tokenize_latex(source: str) -> List[Token]:
+    """Split LaTeX math into tokens; whitespace only separates and is dropped."""
+    tokens: List[Token] = []
+    append = tokens.append
+    start = 0
+
+    for text in LATEX_TOKEN_PATTERN.findall(source):
+        end = start + len(text)
+        first = text[0]
+        if first == '\\':
+            kind = 'NEWLINE' if text == '\\\\' else 'CMD'
+        elif first.isspace():
+            start = end
+            continue
+        elif first in LATEX_PUNCTUATION:
+            kind = LATEX_PUNCTUATION[first]
+        elif '0' <= first <= '9':
+            kind = 'NUMBER'
+        elif 'a' <= first <= 'z' or 'A' <= first <= 'Z':
+            kind = 'WORD'
+        elif '가' <= first <= '힣' or 'ㄱ' <= first <= 'ㆎ':
+            kind = 'TEXT'
+        else:
+            kind = 'CHAR'
+        append(_new_token(Token, (kind, text, start, end)))
+        start = end
+
+    return tokens
+
+
+FRACTIONS = frozenset({r'\frac', r'\dfrac', r'\tfrac', r'\cfrac'})
+INFIX_FRACTIONS = {r'\over': True, r'\atop': False}
+STYLES = {
+    r'\mathrm': 'rm', r'\operatorname': 'rm', r'\textrm': 'rm', r'\mathbf': 'bold',
+    r'\boldsymbol': 'bold', r'\bm': 'bold', r'\mathit': None,
+    # Fonts HWP has no equivalent for are written upright
+    r'\mathbb': 'rm', r'\mathcal': 'rm', r'\mathfrak': 'rm', r'\mathscr': 'rm',
+    r'\mathsf': 'rm', r'\mathtt': 'rm', r'\textbf': 'bold', r'\textit': None,
+}
+TEXTS = frozenset({r'\text', r'\mbox', r'\textnormal', r'\hbox'})
+SPACES = {
+    r'\,': 'thin', r'\:': 'thin', r'\;': 'normal', '\\ ': 'normal',
+    r'\quad': 'normal', r'\qquad': 'normal', r'\enspace': 'normal',
+}
+IGNORED = frozenset({
+    r'\!', r'\displaystyle', r'\textstyle', r'\scriptstyle', r'\limits', r'\nolimits',
+    r'\nonumber', r'\notag',
+})
+# Accents HWP spells as a word before its argument ("hat {x}")
+ACCENTS = {
+    r'\hat': 'hat', r'\check': 'check', r'\tilde': 'tilde', r'\acute': 'acute',
+    r'\grave': 'grave', r'\dot': 'dot', r'\ddot': 'ddot', r'\bar': 'bar', r'\vec': 'vec',
+    r'\overline': 'overline', r'\underline': 'under',
+}
+SIZES = frozenset({
+    r'\big', r'\Big', r'\bigg', r'\Bigg', r'\bigl', r'\bigr', r'\Bigl', r'\Bigr',
+    r'\biggl', r'\biggr', r'\Biggl', r'\Biggr', r'\middle',
+})
+ENVIRONMENTS = {
+    'matrix': 'matrix', 'pmatrix': 'pmatrix', 'bmatrix': 'bmatrix', 'vmatrix': 'dmatrix',
+    'cases': 'cases', 'array': 'matrix', 'smallmatrix': 'matrix', 'aligned': 'matrix',
+}
+
+# LaTeX spelling -> delimiter as the HWP parser stores it in Fenced
+LATEX_DELIMITERS = {
+    r'\{': '{', r'\}': '}', r'\lbrace': '{', r'\rbrace': '}', r'\|': '||', r'\Vert': '||',
+    r'\vert': '|', r'\lvert': '|', r'\rvert': '|', r'\langle': '<', r'\rangle': '>',
+    r'\lbrack': '[', r'\rbrack': ']', '.': '.',
+}
+PLAIN_DELIMITERS = frozenset({'(', ')', '[', ']', '|', '/', '<', '>'})
+
+# Commands that become HWP operator text
+LATEX_OPERATORS = {
+    r'\{': '{', r'\}': '}', r'\|': '||', r'\%': '%', r'\$': '$', r'\&': '&',
+    r'\_': '_', r'\#': '#', r'\backslash': '\\', r'\langle': '<', r'\rangle': '>',
+    r'\vert': '|', r'\mid': '|', r'\to': '->', r'\gets': '<-',
+}
+
+NO_STOPS: FrozenSet[str] = frozenset()
+BRACE_STOPS = frozenset({'RBRACE'})
+BRACKET_STOPS = frozenset({'RBRACKET', 'RBRACE'})
+CELL_STOPS = frozenset({'AMP', 'NEWLINE', r'\end', 'RBRACE'})
+
+
+def _key(token: Token) -> str:
+    """Dispatch key: the command itself for commands, the token kind otherwise."""
+    return token.text if token.kind == 'CMD' else token.kind
+
+
+class LatexParser:
+    """Recursive-descent parser from LaTeX math to the equation AST.
+
+    Produces the same node types as :class:`Parser.Parser` does for HWP
+    scripts, so any emitter can write the result back out. Nested braces are
+    matched structurally in one left-to-right pass; malformed input never
+    raises, unmatched groups simply close at the end. Input longer than
+    ``Limits.MAX_LENGTH`` or nested deeper than ``Limits.MAX_DEPTH`` raises
+    ConversionError.
+    """
+
+    def __init__(self, source: str):
+        check_length(source)
+        self.source = source
+        self.tokens = tokenize_latex(source)
+        self.keys = [_key(token) for token in self.tokens]
+        self.pos = 0
+        self.depth = 0
+        self.style: Optional[str] = None
+
+    def parse(self) -> Row:
+        row = self.parse_row(NO_STOPS)
+        # Stray closing braces end parse_row early; keep going past them
+        while self.pos < len(self.keys):
+            self.pos += 1
+            row.children.extend(self.parse_row(NO_STOPS).children)
+        return row
+
+    def parse_row(self, stops: FrozenSet[str]) -> Row:
+        # Every level of nesting starts a row or takes a macro argument
+        self._enter()
+        items: List[Node] = []
+        keys = self.keys
+
+        while self.pos < len(keys):
+            key = keys[self.pos]
+            if key in stops or key == 'RBRACE':
+                break
+
+            if key in INFIX_FRACTIONS:
+                # {a \over b}: everything before and after in the group
+                self.pos += 1
+                denominator = self.parse_row(stops)
+                self.depth -= 1
+                return Row([Fraction(Row(items), denominator, INFIX_FRACTIONS[key])])
+
+            node = self.parse_term(stops)
+            if node is not None:
+                items.append(node)
+
+        self.depth -= 1
+        return Row(items)
+
+    def _enter(self):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise too_deep()
+
+    def parse_term(self, stops: FrozenSet[str]) -> Optional[Node]:
+        """A primary followed by any number of ``^``/``_`` scripts."""
+        keys = self.keys
+        base = None if self._peek() in ('SUP', 'SUB') else self.parse_primary(stops)
+        scripts: Optional[Scripts] = None
+
+        while self.pos < len(keys) and keys[self.pos] in ('SUP', 'SUB'):
+            which = 'sup' if keys[self.pos] == 'SUP' else 'sub'
+            self.pos += 1
+            operand = self._argument()
+
+            if scripts is None:
+                # {}_{2}C_{1}: the empty group only anchors a prescript
+                if type(base) is Group and not base.body.children:
+                    base = None
+                scripts = Scripts(base)
+            elif getattr(scripts, which) is not None:
+                scripts = Scripts(scripts)
+            setattr(scripts, which, operand)
+
+        return scripts if scripts is not None else base
+
+    def parse_primary(self, stops: FrozenSet[str]) -> Optional[Node]:
+        """One atom or command with its arguments; None when it produces no node."""
+        if self.pos >= len(self.keys):
+            return None
+        key = self.keys[self.pos]
+        if key in stops or key == 'RBRACE' or key in INFIX_FRACTIONS:
+            return None
+
+        token = self.tokens[self.pos]
+        self.pos += 1
+
+        if key == 'LBRACE':
+            style = self.style
+            body = self.parse_row(BRACE_STOPS)
+            self.style = style
+            self._accept('RBRACE')
+            return Group(body)
+
+        if token.kind == 'CMD':
+            return self._command(key, stops)
+
+        if key == 'NUMBER':
+            return Number(token.text)
+
+        if key == 'WORD':
+            return Identifier(token.text, self.style)
+
+        if key == 'TEXT':
+            return Text(token.text)
+
+        if key == 'TILDE':
+            return Space('normal')
+
+        if key == 'NEWLINE':
+            return Operator('#')
+
+        return Operator(token.text)
+
+    def _command(self, command: str, stops: FrozenSet[str]) -> Optional[Node]:
+        if command in FRACTIONS:
+            numerator = self._argument()
+            return Fraction(numerator, self._argument())
+
+        if command == r'\binom':
+            top = self._argument()
+            return Fenced('(', ')', Row([Fraction(top, self._argument(), line=False)]))
+
+        if command == r'\sqrt':
+            index = None
+            if self._accept('LBRACKET'):
+                index = self.parse_row(BRACKET_STOPS)
+                self._accept('RBRACKET')
+            return Root(self._argument(), index)
+
+        if command == r'\left':
+            left = self._delimiter()
+            body = self.parse_row(stops | {r'\right'})
+            right = self._delimiter() if self._accept(r'\right') else ''
+            return Fenced(left, right, body)
+
+        if command == r'\right':
+            delimiter = self._delimiter()
+            return Operator(delimiter) if delimiter != '.' else None
+
+        if command in SIZES:
+            delimiter = self._delimiter()
+            return Operator(delimiter) if delimiter != '.' else None
+
+        if command == r'\begin':
+            return self._environment()
+
+        if command in STYLES:
+            style = self.style
+            self.style = STYLES[command]
+            node = self._argument()
+            self.style = style
+            # \mathrm{P} is the styled identifier itself, not a group around it
+            if type(node) is Group and len(node.body.children) == 1:
+                return node.body.children[0]
+            return node
+
+        if command in TEXTS:
+            return Text(unescape_text(self._raw_group()))
+
+        if command in SPACES:
+            return Space(SPACES[command])
+
+        if command in IGNORED:
+            return None
+
+        name = LATEX_NAMES.get(command)
+        if name is not None:
+            return Symbol(name)
+
+        if command in LATEX_OPERATORS:
+            return Operator(LATEX_OPERATORS[command])
+
+        if command in ACCENTS:
+            return Identifier(ACCENTS[command])
+
+        # Unknown command: kept verbatim, backslash and all, so it is neither
+        # lost nor read as a variable name
+        return Operator(command)
+
+    def _argument(self) -> Node:
+        """A macro argument: a braced group, a command, or a single character."""
+        if self.pos >= len(self.tokens):
+            return Row()
+        token = self.tokens[self.pos]
+
+        # \frac12 and x^23 take one character, not the whole number or word
+        if token.kind in ('NUMBER', 'WORD') and len(token.text) > 1:
+            first, rest = token.text[0], token.text[1:]
+            # The rest stays in place as its own token; "2.5" leaves ".5"
+            kind = token.kind if rest[0] != '.' else 'CHAR'
+            self.tokens[self.pos] = _new_token(Token, (kind, rest, token.start + 1, token.end))
+            self.keys[self.pos] = kind
+            if token.kind == 'NUMBER':
+                return Number(first)
+            return Identifier(first, self.style)
+
+        self._enter()
+        node = self.parse_primary(NO_STOPS) or Row()
+        self.depth -= 1
+        return node
+
+    def _environment(self) -> Node:
+        name = self._raw_group().strip()
+        kind = ENVIRONMENTS.get(name.rstrip('*'), 'matrix')
+        if name == 'array' and self._peek() == 'LBRACE':
+            self._raw_group()  # column spec
+
+        rows: List[List[Row]] = [[]]
+        style = self.style
+        while True:
+            rows[-1].append(self.parse_row(CELL_STOPS))
+            if self._accept('AMP'):
+                continue
+            if self._accept('NEWLINE'):
+                rows.append([])
+                continue
+            if self._accept(r'\end'):
+                self._raw_group()
+                break
+            if self.pos >= len(self.keys):
+                break
+            self.pos += 1  # stray closing brace inside the environment
+        self.style = style
+
+        # A trailing \\ leaves an empty last row
+        if len(rows) > 1 and all(not cell.children for cell in rows[-1]):
+            rows.pop()
+        return Matrix(kind, rows)
+
+    def _raw_group(self) -> str:
+        """Source text of the next ``{...}`` group, unparsed (for ``\\text``)."""
+        if not self._accept('LBRACE'):
+            return ''
+        start = self.tokens[self.pos - 1].end
+        depth = 1
+        while self.pos < len(self.keys):
+            key = self.keys[self.pos]
+            self.pos += 1
+            if key == 'LBRACE':
+                depth += 1
+            elif key == 'RBRACE':
+                depth -= 1
+                if depth == 0:
+                    return self.source[start:self.tokens[self.pos - 1].start]
+        return self.source[start:]
+
+    def _delimiter(self) -> str:
+        """Delimiter after ``\\left``/``\\right``; anything else is the invisible ``.``."""
+        if self.pos >= len(self.tokens):
+            return '.'
+        text = self.tokens[self.pos].text
+        if text in LATEX_DELIMITERS:
+            self.pos += 1
+            return LATEX_DELIMITERS[text]
+        if text in PLAIN_DELIMITERS:
+            self.pos += 1
+            return text
+        return '.'
+
+    def _peek(self) -> Optional[str]:
+        return self.keys[self.pos] if self.pos < len(self.keys) else None
+
+    def _accept(self, key: str) -> bool:
+        if self.pos < len(self.keys) and self.keys[self.pos] == key:
+            self.pos += 1
+            return True
+        return False
+
+
+def parse_latex(source: str) -> Row:
+    """Parse LaTeX math into the equation AST."""
+    return LatexParser(source).parse()
@@ -0,0 +1,345 @@
+import re
+from array import array
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+from .Limits import check_length
+from .Symbols import CASED_WORDS, GREEK, WORDS
+
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+    start: int
+    end: int
+
+
+# One alternative per token class; every character of the input belongs to
+# exactly one match, so token offsets follow from the match lengths.
+TOKEN_PATTERN = re.compile(
+    r'\s+'                   # SPACE
+    r'|\d+(?:\.\d+)?'        # NUMBER
+    r'|[A-Za-z]+'            # WORD / KEYWORD
+    r'|[가-힣ㄱ-ㆎ]+'         # TEXT (Hangul)
+    r'|"[^"]*"?'             # QUOTE (literal text)
+    r'|<=|>=|!=|->|<-|=='     # OP
+    r'|.',                   # single punctuation / CHAR
+    re.DOTALL
+)
+
+PUNCTUATION = {
+    '`': 'THIN',      # HWP quarter space
+    '~': 'TILDE',     # HWP normal space
+    '{': 'LBRACE',
+    '}': 'RBRACE',
+    '(': 'LPAREN',
+    ')': 'RPAREN',
+    '[': 'LBRACKET',
+    ']': 'RBRACKET',
+    '^': 'SUP',
+    '_': 'SUB',
+    '&': 'AMP',       # matrix column separator
+    '#': 'ROW',       # matrix row separator
+    '"': 'QUOTE',
+}
+
+# Words with a meaning of their own; HWP accepts them in any case
+KEYWORDS = frozenset({
+    'over', 'atop', 'root', 'of', 'sqrt',
+    'left', 'right', 'rm', 'it', 'bold',
+    'times', 'sup', 'sub',
+    'matrix', 'pmatrix', 'bmatrix', 'dmatrix', 'cases', 'pile', 'lpile', 'rpile',
+})
+
+# Command words HWP also recognises when glued to what follows ("timesb",
+# "sinx"); shorter words are too likely to be variable names to split on
+PREFIX_WORDS = frozenset(word for word in KEYWORDS | set(WORDS) if len(word) >= 3)
+PREFIX_MAX = max(len(word) for word in PREFIX_WORDS)
+KNOWN_WORDS = KEYWORDS | set(WORDS) | {word.lower() for word in GREEK} | {word.lower() for word in CASED_WORDS}
+
+# token text -> (kind, text), or ('SPLIT', pieces) for glued words;
+# scripts reuse a small vocabulary
+_CLASSIFIED: Dict[str, Tuple] = {}
+# Entries a per-text memo (this one, TokenStream's, Bulk's) grows to at most
+CLASSIFIED_LIMIT = 4096
+
+_new_token = tuple.__new__
+
+
+def _classify(text: str) -> Tuple[str, str]:
+    first = text[0]
+    kind = PUNCTUATION.get(first)
+    if kind is not None:
+        return kind, text
+    if first.isspace():
+        return 'SPACE', text
+    if '0' <= first <= '9':
+        return 'NUMBER', text
+    if 'a' <= first <= 'z' or 'A' <= first <= 'Z':
+        lowered = text.lower()
+        if lowered in KEYWORDS:
+            return 'KEYWORD', lowered
+        pieces = _split_word(text, lowered)
+        if pieces is not None:
+            return 'SPLIT', pieces
+        return 'WORD', text
+    if '가' <= first <= '힣' or 'ㄱ' <= first <= 'ㆎ':
+        return 'TEXT', text
+    if len(text) > 1:
+        return 'OP', text
+    return 'CHAR', text
+
+
+def _split_word(text: str, lowered: str) -> Optional[Tuple[Tuple[str, str, int], ...]]:
+    """Split a glued word into ``(kind, text, length)`` pieces, if it is one."""
+    pieces = []
+    start = 0
+
+    while lowered[start:] not in KNOWN_WORDS:
+        for length in range(min(PREFIX_MAX, len(text) - start - 1), 2, -1):
+            if lowered[start:start + length] in PREFIX_WORDS:
+                break
+        else:
+            break
+        pieces.append(start + length)
+        start += length
+
+    if not pieces:
+        return None
+
+    result = []
+    start = 0
+    for end in pieces + [len(text)]:
+        word = lowered[start:end]
+        if word in KEYWORDS:
+            result.append(('KEYWORD', word, end - start))
+        else:
+            result.append(('WORD', text[start:end], end - start))
+        start = end
+    return tuple(result)
+
+
+OPENING = {'LBRACE': 'RBRACE', 'LPAREN': 'RPAREN', 'LBRACKET': 'RBRACKET'}
+CLOSING = frozenset(OPENING.values())
+
+
+def tokenize(expression: str, keep_space: bool = False) -> List[Token]:
+    """Tokenize an HWP equation script in a single pass.
+
+    Keywords come back as ``KEYWORD`` tokens whose text is the lower-case
+    keyword; every other token carries its source text. Scripts longer
+    than ``Limits.MAX_LENGTH`` raise ConversionError.
+    """
+    check_length(expression)
+    tokens = []
+    append = tokens.append
+    classified = _CLASSIFIED
+    position = 0
+
+    for text in TOKEN_PATTERN.findall(expression):
+        end = position + len(text)
+
+        kind_text = classified.get(text)
+        if kind_text is None:
+            kind_text = _classify(text)
+            if len(classified) < CLASSIFIED_LIMIT:
+                classified[text] = kind_text
+
+        kind = kind_text[0]
+        if kind == 'SPLIT':
+            start = position
+            for kind, text, length in kind_text[1]:
+                append(_new_token(Token, (kind, text, start, start + length)))
+                start += length
+        elif keep_space or kind != 'SPACE':
+            append(_new_token(Token, (kind, kind_text[1], position, end)))
+        position = end
+
+    return tokens
+
+
+def iter_tokens(expression: str, position: int = 0) -> Iterator[Token]:
+    """Lazily tokenize ``expression`` from ``position`` on, spaces skipped.
+
+    ``position`` must be where a token starts in the whole expression; the
+    tokens are then the same as ``tokenize(expression)`` from there on.
+    """
+    classified = _CLASSIFIED
+    for match in TOKEN_PATTERN.finditer(expression, position):
+        text = match.group()
+        kind_text = classified.get(text)
+        if kind_text is None:
+            kind_text = _classify(text)
+            if len(classified) < CLASSIFIED_LIMIT:
+                classified[text] = kind_text
+
+        kind = kind_text[0]
+        if kind == 'SPLIT':
+            start = match.start()
+            for kind, text, length in kind_text[1]:
+                yield _new_token(Token, (kind, text, start, start + length))
+                start += length
+        elif kind != 'SPACE':
+            yield _new_token(Token, (kind, kind_text[1], match.start(), match.end()))
+
+
+# Dispatch keys interned to small integers: the token kind, or the keyword
+# itself for keywords (which come last, from FIRST_KEYWORD on)
+KEY_NAMES: Tuple[str, ...] = (('SPACE', 'NUMBER', 'WORD', 'TEXT', 'OP', 'CHAR')
+                              + tuple(dict.fromkeys(PUNCTUATION.values()))
+                              + tuple(sorted(KEYWORDS)))
+KEY_IDS: Mapping[str, int] = MappingProxyType({name: key for key, name in enumerate(KEY_NAMES)})
+FIRST_KEYWORD = len(KEY_NAMES) - len(KEYWORDS)
+SPACE = KEY_IDS['SPACE']
+
+# token text -> key, or ((key, length), ...) for glued words
+_KEYED: Dict[str, Union[int, Tuple[Tuple[int, int], ...]]] = {}
+
+
+def key_of(token: Token) -> int:
+    """Interned dispatch key of a token."""
+    return KEY_IDS[token.text if token.kind == 'KEYWORD' else token.kind]
+
+
+def key_text(text: str) -> Union[int, Tuple[Tuple[int, int], ...]]:
+    """Dispatch key of a token's text, or ``(key, length)`` pieces for a glued word."""
+    kind, value = _classify(text)
+    if kind == 'SPLIT':
+        return tuple((KEY_IDS[word if kind == 'KEYWORD' else kind], length) for kind, word, length in value)
+    return KEY_IDS[value if kind == 'KEYWORD' else kind]
+
+
+class TokenStream:
+    """Tokens of a script as parallel columns over its source text.
+
+    ``keys`` holds interned dispatch keys (``KEY_IDS``) and ``starts``/``ends``
+    the offsets into ``source``; there is no object per token, and a
+    token's text is sliced from the source only when it is asked for.
+    Keywords read back in lower case, as ``Token.text`` does.
+    """
+
+    __slots__ = ('source', 'keys', 'starts', 'ends')
+
+    def __init__(self, source: str):
+        self.source = source
+        self.keys = array('B')
+        self.starts = array('I')
+        self.ends = array('I')
+
+    @classmethod
+    def from_tokens(cls, tokens: Iterable[Token]) -> 'TokenStream':
+        """Columns for tokens whose offsets may not match any one source (``Preview`` segments)."""
+        stream = cls('')
+        texts = []
+        position = 0
+        for token in tokens:
+            stream.keys.append(key_of(token))
+            stream.starts.append(position)
+            position += len(token.text)
+            stream.ends.append(position)
+            texts.append(token.text)
+        stream.source = ''.join(texts)
+        return stream
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def text(self, index: int) -> str:
+        key = self.keys[index]
+        if key >= FIRST_KEYWORD:
+            return KEY_NAMES[key]
+        return self.source[self.starts[index]:self.ends[index]]
+
+    def __getitem__(self, index: int) -> Token:
+        key = self.keys[index]
+        kind = 'KEYWORD' if key >= FIRST_KEYWORD else KEY_NAMES[key]
+        return Token(kind, self.text(index), self.starts[index], self.ends[index])
+
+    def __iter__(self) -> Iterator[Token]:
+        return map(self.__getitem__, range(len(self.keys)))
+
+
+def tokenize_stream(expression: str) -> TokenStream:
+    """``tokenize`` into a ``TokenStream``: same tokens, spaces skipped."""
+    check_length(expression)
+    stream = TokenStream(expression)
+    add_key, add_start, add_end = stream.keys.append, stream.starts.append, stream.ends.append
+    keyed = _KEYED
+    position = 0
+
+    for text in TOKEN_PATTERN.findall(expression):
+        end = position + len(text)
+
+        key = keyed.get(text)
+        if key is None:
+            key = key_text(text)
+            if len(keyed) < CLASSIFIED_LIMIT:
+                keyed[text] = key
+
+        if type(key) is int:
+            if key != SPACE:
+                add_key(key)
+                add_start(position)
+                add_end(end)
+        else:
+            start = position
+            for piece, length in key:
+                add_key(piece)
+                add_start(start)
+                start += length
+                add_end(start)
+        position = end
+
+    return stream
+
+
+def split_terms(expression: str) -> List[str]:
+    """Split at whitespace outside parentheses; parenthesised parts stay whole."""
+    terms = []
+    depth = 0
+    start = None
+
+    for token in tokenize(expression, keep_space=True):
+        if token.kind == 'SPACE' and depth == 0:
+            if start is not None:
+                terms.append(expression[start:token.start])
+                start = None
+            continue
+
+        if token.kind == 'LPAREN':
+            depth += 1
+        elif token.kind == 'RPAREN':
+            depth -= 1
+        if start is None:
+            start = token.start
+
+    if start is not None:
+        terms.append(expression[start:])
+
+    return terms
+
+
+def match_group(tokens: List[Token], index: int) -> Tuple[int, int]:
+    """Find the end of the bracket group opened at ``tokens[index]``.
+
+    Returns ``(end offset, next token index)``. An unbalanced group runs to
+    the first unmatched closing bracket or to the end of the input.
+    """
+    stack = []
+    end = tokens[index].start
+
+    while index < len(tokens):
+        token = tokens[index]
+        if token.kind in OPENING:
+            stack.append(OPENING[token.kind])
+        elif token.kind in CLOSING:
+            if not stack:
+                break
+            if token.kind == stack[-1]:
+                stack.pop()
+                if not stack:
+                    return token.end, index + 1
+        end = token.end
+        index += 1
+
+    return end, index
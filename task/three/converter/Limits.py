@@ -0,0 +1,82 @@
+import re
+import signal
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+# Longest script any converter accepts, in characters; exam scripts are a
+# few hundred at most, and every path is linear up to this
+MAX_LENGTH = 256 * 1024
+# Deepest nesting of groups, brackets, roots and scripts the parsers accept;
+# a level takes at most five Python frames (a LaTeX environment), which keeps
+# the deepest accepted script under 650 frames of the default limit of 1000
+MAX_DEPTH = 128
+
+LATEX_SPECIALS = re.compile(r'[\\{}$&#%_^~]')
+LATEX_ESCAPES = {'\\': r'\textbackslash{}', '^': r'\^{}', '~': r'\~{}'}
+# The escapes above, read back (``\%`` -> ``%``)
+LATEX_ESCAPED = re.compile(r'\\textbackslash\{\}|\\\^\{\}|\\~\{\}|\\([{}$&#%_])')
+LATEX_UNESCAPES = {v: k for k, v in LATEX_ESCAPES.items()}
+
+
+class ConversionError(ValueError):
+    """A script the converters refuse: too long, too deeply nested or too slow."""
+
+
+class TimeLimitExceeded(Exception):
+    """A document or section ran past its time limit.
+
+    Not a ConversionError: the script being converted when the alarm fires
+    is not at fault, so the whole run fails instead of that script being
+    kept as text.
+    """
+
+
+def check_length(script: str):
+    if len(script) > MAX_LENGTH:
+        raise ConversionError(f'script is {len(script)} characters long (limit {MAX_LENGTH})')
+
+
+def too_deep() -> ConversionError:
+    return ConversionError(f'script is nested more than {MAX_DEPTH} levels deep')
+
+
+def escape_text(text: str) -> str:
+    """``text`` with the LaTeX special characters escaped, for ``\\text{...}``."""
+    return LATEX_SPECIALS.sub(lambda match: LATEX_ESCAPES.get(match.group(), '\\' + match.group()), text)
+
+
+def unescape_text(text: str) -> str:
+    """The inverse of :func:`escape_text`."""
+    return LATEX_ESCAPED.sub(lambda match: match.group(1) or LATEX_UNESCAPES[match.group()], text)
+
+
+def fallback_latex(script: str) -> str:
+    """The script itself as LaTeX text, for a script that was refused."""
+    return f'\\text{{{escape_text(script)}}}'
+
+
+@contextmanager
+def time_limit(seconds: Optional[float]) -> Iterator[None]:
+    """Raise TimeLimitExceeded inside the block once ``seconds`` have passed.
+
+    Uses SIGALRM, so the limit only applies on the main thread of a Unix
+    process (a batch worker); elsewhere, or with no ``seconds``, the block
+    runs unlimited. The signal is handled between bytecodes: a single
+    regex call finishes before the error is raised.
+    """
+    if (not seconds or not hasattr(signal, 'setitimer')
+            or threading.current_thread() is not threading.main_thread()):
+        yield
+        return
+
+    def expired(signum, frame):
+        raise TimeLimitExceeded(f'conversion took longer than {seconds:g} s')
+
+    previous = signal.signal(signal.SIGALRM, expired)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
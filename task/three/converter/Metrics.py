@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# Read once at import; set HWP_METRICS=1 to turn the hooks on
+ENABLED = os.environ.get('HWP_METRICS', '') not in ('', '0')
+
+LATENCY_BUCKETS = (
+    0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+LENGTH_BUCKETS = (8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """Per-stage latency histograms plus equation and script-length counts."""
+
+    def __init__(self):
+        self.stages: Dict[str, Histogram] = {}
+        self.script_length = Histogram(LENGTH_BUCKETS)
+        self._lock = threading.Lock()
+
+    def observe_stage(self, stage: str, seconds: float):
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+
+    def observe_script(self, length: int):
+        with self._lock:
+            self.script_length.observe(length)
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        lines: List[str] = [
+            '# HELP hwp_stage_seconds Time spent in each conversion stage.',
+            '# TYPE hwp_stage_seconds histogram',
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self.stages.items()):
+                lines += _histogram_lines('hwp_stage_seconds', histogram, f'stage="{stage}",')
+            lines += [
+                '# HELP hwp_equations_total Equation scripts converted.',
+                '# TYPE hwp_equations_total counter',
+                f'hwp_equations_total {self.script_length.count}',
+                '# HELP hwp_script_length_chars Length of converted equation scripts.',
+                '# TYPE hwp_script_length_chars histogram',
+            ]
+            lines += _histogram_lines('hwp_script_length_chars', self.script_length)
+        return '\n'.join(lines) + '\n'
+
+
+def _histogram_lines(name: str, histogram: Histogram, labels: str = '') -> List[str]:
+    lines = []
+    cumulative = 0
+    bounds: Tuple = histogram.bounds + ('+Inf',)
+    for bound, count in zip(bounds, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels}le="{bound}"}} {cumulative}')
+    suffix = f'{{{labels.rstrip(",")}}}' if labels else ''
+    lines.append(f'{name}_sum{suffix} {histogram.sum}')
+    lines.append(f'{name}_count{suffix} {histogram.count}')
+    return lines
+
+
+REGISTRY = Registry()
+
+
+def enable(enabled: bool = True):
+    """Switch the hooks on or off; affects hooks created afterwards."""
+    global ENABLED
+    ENABLED = enabled
+
+
+def timed(stage: str, func: Callable, script: bool = False) -> Callable:
+    """Wrap ``func`` so its calls are timed under ``stage``.
+
+    When metrics are disabled ``func`` itself is returned, so a hook bound
+    once (e.g. in a constructor) costs nothing per call. With ``script``
+    the length of the first argument is recorded as an equation script.
+    """
+    if not ENABLED:
+        return func
+
+    clock = time.perf_counter
+    registry = REGISTRY
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if script:
+            registry.observe_script(len(args[0]))
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            registry.observe_stage(stage, clock() - start)
+
+    return wrapper
+
+
+class _TimedReader:
+    """File object whose ``read`` calls are timed, e.g. zip inflation."""
+
+    def __init__(self, fp, stage: str):
+        self._fp = fp
+        self.read = timed(stage, fp.read)
+
+    def __getattr__(self, name):
+        return getattr(self._fp, name)
+
+
+def timed_reader(fp, stage: str):
+    """Time ``fp.read``; returns ``fp`` unchanged when metrics are disabled."""
+    return _TimedReader(fp, stage) if ENABLED else fp
+
+
+def render() -> Optional[str]:
+    """Current metrics as Prometheus text, or None when disabled."""
+    return REGISTRY.render() if ENABLED else None
@@ -0,0 +1,231 @@
+from typing import FrozenSet, List, Optional, Union
+
+from .Ast import (Fenced, Fraction, Group, Identifier, Matrix, Node, Number, Operator,
+                  Root, Row, Scripts, Space, Symbol, Text)
+from .Lexer import FIRST_KEYWORD, KEY_IDS, KEY_NAMES, Token, TokenStream, tokenize_stream
+from .Limits import MAX_DEPTH, too_deep
+from .Symbols import symbol_name
+
+
+# Tables are keyed by the lexer's interned token keys (``Lexer.KEY_IDS``)
+(NUMBER, WORD, TEXT, QUOTE, LBRACE, RBRACE, LPAREN, RPAREN, AMP, ROW,
+ LEFT, RIGHT, OF) = (KEY_IDS[name] for name in ('NUMBER', 'WORD', 'TEXT', 'QUOTE', 'LBRACE', 'RBRACE',
+                                                'LPAREN', 'RPAREN', 'AMP', 'ROW', 'left', 'right', 'of'))
+
+FRACTIONS = {KEY_IDS['over']: True, KEY_IDS['atop']: False}
+SCRIPTS = {KEY_IDS['SUP']: 'sup', KEY_IDS['SUB']: 'sub', KEY_IDS['sup']: 'sup', KEY_IDS['sub']: 'sub'}
+STYLES = {KEY_IDS['rm']: 'rm', KEY_IDS['bold']: 'bold', KEY_IDS['it']: None}
+ROOTS = frozenset({KEY_IDS['sqrt'], KEY_IDS['root']})
+MATRICES = frozenset(KEY_IDS[name] for name in
+                     ('matrix', 'pmatrix', 'bmatrix', 'dmatrix', 'cases', 'pile', 'lpile', 'rpile'))
+SPACES = {KEY_IDS['THIN']: 'thin', KEY_IDS['TILDE']: 'normal'}
+
+DELIMITERS = frozenset({'(', ')', '[', ']', '{', '}', '|', '||', '.', '<', '>', '/'})
+WORD_DELIMITERS = {'lbrace': '{', 'rbrace': '}'}
+
+NO_STOPS: FrozenSet[int] = frozenset()
+BRACE_STOPS = frozenset({RBRACE})
+CELL_STOPS = frozenset({AMP, ROW, RBRACE})
+
+
+class Parser:
+    """Recursive-descent parser for HWP equation scripts.
+
+    Every token is looked at a constant number of times, so building the AST
+    is linear in the length of the script however deeply it is nested.
+    Malformed input never raises: unmatched brackets close at the end of the
+    enclosing group and a leading ``over`` gets an empty numerator. Only
+    nesting deeper than ``Limits.MAX_DEPTH`` raises ConversionError, before
+    the recursion could exhaust the stack.
+    """
+
+    def __init__(self, source: str, tokens: Optional[Union[TokenStream, List[Token]]] = None):
+        self.source = source
+        if tokens is None:
+            tokens = tokenize_stream(source)
+        elif not isinstance(tokens, TokenStream):
+            tokens = TokenStream.from_tokens(tokens)
+        self.tokens = tokens
+        self.keys = tokens.keys
+        self.pos = 0
+        self.depth = 0
+        self.style: Optional[str] = None
+
+    def parse(self) -> Row:
+        return self.parse_row(NO_STOPS)
+
+    def _peek(self) -> Optional[int]:
+        return self.keys[self.pos] if self.pos < len(self.keys) else None
+
+    def parse_row(self, stops: FrozenSet[int]) -> Row:
+        # Every level of nesting but a root's operand starts a row
+        self._enter()
+        items: List[Node] = []
+        keys = self.keys
+
+        while self.pos < len(keys):
+            key = keys[self.pos]
+            if key in stops:
+                break
+
+            if key in FRACTIONS:
+                self.pos += 1
+                numerator = items.pop() if items else Row()
+                denominator = self.parse_term(stops) or Row()
+                items.append(Fraction(numerator, denominator, FRACTIONS[key]))
+                continue
+
+            node = self.parse_term(stops)
+            if node is not None:
+                items.append(node)
+
+        self.depth -= 1
+        return Row(items)
+
+    def _enter(self):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise too_deep()
+
+    def parse_term(self, stops: FrozenSet[int]) -> Optional[Node]:
+        """A primary followed by any number of ``^``/``_`` scripts."""
+        base = None if self._peek() in SCRIPTS else self.parse_primary(stops)
+        scripts: Optional[Scripts] = None
+
+        keys = self.keys
+        while self.pos < len(keys):
+            # Spacing between a base and its script is not significant
+            ahead = self.pos
+            while ahead < len(keys) and keys[ahead] in SPACES:
+                ahead += 1
+            which = SCRIPTS.get(keys[ahead]) if ahead < len(keys) else None
+            if which is None:
+                break
+            self.pos = ahead + 1
+            operand = self.parse_primary(stops) or Row()
+
+            if scripts is None:
+                scripts = Scripts(base)
+            elif getattr(scripts, which) is not None:
+                scripts = Scripts(scripts)
+            setattr(scripts, which, operand)
+
+        return scripts if scripts is not None else base
+
+    def parse_primary(self, stops: FrozenSet[int]) -> Optional[Node]:
+        """One atom or bracketed construct; None when there is nothing to parse."""
+        # Style switches apply to what follows and produce no node
+        while self.pos < len(self.keys) and self.keys[self.pos] in STYLES:
+            self.style = STYLES[self.keys[self.pos]]
+            self.pos += 1
+
+        if self.pos >= len(self.keys):
+            return None
+        key = self.keys[self.pos]
+        if key in stops or key in FRACTIONS or key in SCRIPTS:
+            return None
+
+        index = self.pos
+        self.pos += 1
+
+        if key == LBRACE:
+            style = self.style
+            body = self.parse_row(BRACE_STOPS)
+            self.style = style
+            self._accept(RBRACE)
+            return Group(body)
+
+        if key == LPAREN:
+            body = self.parse_row(stops | {RPAREN})
+            right = ')' if self._accept(RPAREN) else ''
+            return Fenced('(', right, body, sized=False)
+
+        if key == LEFT:
+            left = self._delimiter()
+            body = self.parse_row(stops | {RIGHT})
+            right = self._delimiter() if self._accept(RIGHT) else ''
+            return Fenced(left, right, body)
+
+        if key == RIGHT:
+            # RIGHT without a LEFT: keep the delimiter itself
+            delimiter = self._delimiter()
+            return Operator(delimiter) if delimiter not in ('', '.') else None
+
+        if key in ROOTS:
+            self._enter()
+            body = self.parse_primary(stops) or Row()
+            index = None
+            if self._accept(OF):
+                index, body = body, self.parse_primary(stops) or Row()
+            self.depth -= 1
+            return Root(body, index)
+
+        if key in MATRICES:
+            if not self._accept(LBRACE):
+                return Identifier(KEY_NAMES[key], self.style)
+            return Matrix(KEY_NAMES[key], self._parse_matrix())
+
+        if key == NUMBER:
+            return Number(self.tokens.text(index))
+
+        if key == WORD or key >= FIRST_KEYWORD:
+            text = self.tokens.text(index)
+            name = symbol_name(text)
+            if name is not None:
+                return Symbol(name)
+            return Identifier(text, self.style)
+
+        if key in SPACES:
+            return Space(SPACES[key])
+
+        if key == TEXT:
+            return Text(self.tokens.text(index))
+
+        if key == QUOTE:
+            return Text(self.tokens.text(index).strip('"'))
+
+        if key == RBRACE:
+            # Stray closing brace: nothing to show
+            return None
+
+        return Operator(self.tokens.text(index))
+
+    def _parse_matrix(self) -> List[List[Row]]:
+        rows: List[List[Row]] = [[]]
+        style = self.style
+
+        while True:
+            rows[-1].append(self.parse_row(CELL_STOPS))
+            if self._accept(AMP):
+                continue
+            if self._accept(ROW):
+                rows.append([])
+                continue
+            self._accept(RBRACE)
+            break
+
+        self.style = style
+        return rows
+
+    def _accept(self, key: int) -> bool:
+        if self.pos < len(self.keys) and self.keys[self.pos] == key:
+            self.pos += 1
+            return True
+        return False
+
+    def _delimiter(self) -> str:
+        """Delimiter after LEFT/RIGHT; a missing one is the invisible ``.``."""
+        if self.pos < len(self.keys):
+            text = self.tokens.text(self.pos)
+            if text in DELIMITERS:
+                self.pos += 1
+                return text
+            if text.lower() in WORD_DELIMITERS:
+                self.pos += 1
+                return WORD_DELIMITERS[text.lower()]
+        return '.'
+
+
+def parse(source: str, tokens: Optional[Union[TokenStream, List[Token]]] = None) -> Row:
+    """Parse an HWP equation script (or its already lexed tokens) into an AST."""
+    return Parser(source, tokens).parse()
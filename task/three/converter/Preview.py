@@ -0,0 +1,307 @@
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .Ast import Row
+from .Emitter import LatexEmitter
+from .Lexer import Token, iter_tokens, key_of
+from .Limits import check_length
+from .Parser import (AMP, BRACE_STOPS, CELL_STOPS, DELIMITERS, FRACTIONS, LBRACE, LEFT, LPAREN, MATRICES,
+                     NO_STOPS, RBRACE, RIGHT, ROOTS, ROW, RPAREN, SCRIPTS, SPACES, STYLES, WORD_DELIMITERS,
+                     OF, Parser)
+
+# Top-level operators that start a new, independently parsed segment
+SEPARATORS = frozenset({'=', '+', '-', ',', '<', '>', '<=', '>=', '!=', '==', '->', '<-', ':', ';'})
+# Keys that take the following token as an operand
+BINDERS = frozenset(FRACTIONS) | frozenset(SCRIPTS) | ROOTS | {OF, LEFT, RIGHT}
+# Tokens that make no node (spaces, styles, a stray "}") do not shield a separator
+TRANSPARENT = frozenset(SPACES) | frozenset(STYLES) | {RBRACE}
+
+# Characters the lexer reads past the end of a token (``1.5``)
+LOOKAHEAD = 2
+# A cut is decided by looking at most this many segments ahead
+LOOKAHEAD_SEGMENTS = 3
+
+
+def _owns(frame: Tuple[int, frozenset, int], key: int) -> bool:
+    """The frame consumes ``key``: its closer, or ``&``/``#`` inside a matrix."""
+    return key == frame[0] or (frame[1] is CELL_STOPS and key in (AMP, ROW))
+
+
+class _Scanner:
+    """Cut a token stream into segments that parse independently.
+
+    Cuts go around separator operators at the top level only, following
+    the parser's own stop sets: ``(`` inside ``LEFT`` also stops at ``RIGHT``,
+    ``{...}`` and matrices start afresh. A separator next to anything that
+    binds it (``over``, ``^``, ``sqrt``, ``LEFT``) stays in its segment, so
+    joining the segments' output gives exactly the whole script's output.
+    Tokens are pulled only as far as the next cut needs.
+    """
+
+    def __init__(self, tokens: Iterable[Token]):
+        self._source = iter(tokens)
+        self.tokens: List[Token] = []
+        self.keys: List[int] = []
+
+    def _has(self, index: int) -> bool:
+        while len(self.tokens) <= index:
+            token = next(self._source, None)
+            if token is None:
+                return False
+            self.tokens.append(token)
+            self.keys.append(key_of(token))
+        return True
+
+    def _delimiter_length(self, index: int) -> int:
+        """1 if ``tokens[index]`` is the delimiter consumed after LEFT/RIGHT."""
+        if self._has(index):
+            text = self.tokens[index].text
+            if text in DELIMITERS or text.lower() in WORD_DELIMITERS:
+                return 1
+        return 0
+
+    def _before(self, index: int) -> Optional[int]:
+        """Key of the nearest token before ``index`` that makes a node."""
+        index -= 1
+        while index >= 0 and self.keys[index] in TRANSPARENT:
+            index -= 1
+        return self.keys[index] if index >= 0 else None
+
+    def _after(self, index: int) -> Optional[int]:
+        """Key of the nearest token after ``index`` that makes a node."""
+        index += 1
+        while self._has(index) and self.keys[index] in TRANSPARENT:
+            index += 1
+        return self.keys[index] if self._has(index) else None
+
+    def segments(self) -> Iterator[Tuple[int, int, bool]]:
+        """Yield ``(start, end, opens)`` token ranges as soon as their cuts are decided.
+
+        ``opens`` marks a range that ends with a ``{``, ``(`` or ``LEFT`` that
+        is never closed: its body runs to the end of the script, so the body
+        is cut like a script of its own and the bracket is closed after the
+        last segment.
+        """
+        keys = self.keys
+        frames: List[Tuple[int, frozenset, int]] = []   # (closing key, stop keys, opener)
+        last = 0
+        i = 0
+
+        while True:
+            if not self._has(i):
+                if not frames or frames[0][1] is CELL_STOPS:
+                    break
+                i = frames[0][2] + 1
+                if frames[0][0] == RIGHT:
+                    i += self._delimiter_length(i)
+                yield last, i, True
+                last = i
+                frames = []
+                continue
+
+            key = keys[i]
+            stops = frames[-1][1] if frames else NO_STOPS
+
+            if frames and key in stops:
+                # Inner frames that stop here close without consuming the key
+                while frames and key in frames[-1][1] and not _owns(frames[-1], key):
+                    frames.pop()
+                if frames and key == frames[-1][0]:
+                    frames.pop()
+                    i += 1 + (self._delimiter_length(i + 1) if key == RIGHT else 0)
+                    continue
+                if frames and _owns(frames[-1], key):
+                    # Matrix cell separator
+                    i += 1
+                    continue
+                stops = frames[-1][1] if frames else NO_STOPS
+
+            if key == LBRACE:
+                frames.append((RBRACE, BRACE_STOPS, i))
+            elif key in MATRICES and self._has(i + 1) and keys[i + 1] == LBRACE:
+                frames.append((RBRACE, CELL_STOPS, i))
+                i += 1
+            elif key == LPAREN:
+                frames.append((RPAREN, stops | {RPAREN}, i))
+            elif key == LEFT or key == RIGHT:
+                if key == LEFT:
+                    frames.append((RIGHT, stops | {RIGHT}, i))
+                # The delimiter after LEFT/RIGHT is not an opener or a separator
+                i += self._delimiter_length(i + 1)
+            elif not frames and self.tokens[i].text in SEPARATORS and self.tokens[i].kind in ('CHAR', 'OP'):
+                if self._before(i) not in BINDERS and self._after(i) not in BINDERS:
+                    if last != i:
+                        yield last, i, False
+                    yield i, i + 1, False
+                    last = i + 1
+            i += 1
+
+        if last != len(self.tokens):
+            yield last, len(self.tokens), False
+
+
+class _BodyParser(Parser):
+    """Parser that remembers the first row that starts at the end of the tokens.
+
+    For a segment that ends with an unclosed bracket, that row is the
+    bracket's (still empty) body.
+    """
+
+    body: Optional[Row] = None
+
+    def parse_row(self, stops: FrozenSet[int]) -> Row:
+        at_end = self.pos == len(self.keys)
+        row = super().parse_row(stops)
+        if at_end and self.body is None:
+            self.body = row
+        return row
+
+
+class Segment(NamedTuple):
+    start: int              # source offsets of the first token's start and the last token's end
+    end: int
+    text: str
+    tokens: List[Token]     # token offsets are those of the render that cut the segment
+    opens: bool             # ends with a bracket closed only at the end of the script
+
+
+class LivePreview:
+    """Per-editor LaTeX preview that reparses only the segments that changed.
+
+    The script is cut into top-level segments and each segment's LaTeX is
+    cached by its source text and the style (``rm``/``it``) in effect where
+    it starts. An edit keeps the segments of the unchanged prefix, tokenizes
+    from a few segments before the change, and stops as soon as a cut lines
+    up with an old cut in the unchanged suffix, whose segments are shifted
+    and kept. A keystroke therefore parses a few segments, whatever the
+    length of the script, even while a bracket is still open.
+    """
+
+    def __init__(self, emitter: Optional[LatexEmitter] = None):
+        self.emitter = emitter or LatexEmitter()
+        self.text = ''
+        self.reparsed = 0
+        self.reused = 0
+        self._source = ''                   # text the segments were cut from
+        self._segments: List[Segment] = []
+        # (text, style in, opens) -> (LaTeX, style out, LaTeX after the open body)
+        self._outputs: Dict[Tuple[str, Optional[str], bool], Tuple[str, Optional[str], str]] = {}
+
+    def edit(self, start: int, end: int, text: str):
+        """Replace ``self.text[start:end]`` with ``text``."""
+        start = max(0, min(start, len(self.text)))
+        end = max(start, min(end, len(self.text)))
+        self.text = self.text[:start] + text + self.text[end:]
+
+    def _convert(self, segment: Segment, style: Optional[str]) -> Tuple[str, Optional[str], str]:
+        parser = _BodyParser(segment.text, segment.tokens)
+        parser.style = style
+        row = parser.parse()
+        if not segment.opens:
+            return self.emitter.emit(row), parser.style, ''
+
+        # Emit around the empty body of the unclosed bracket
+        dispatch = self.emitter._dispatch
+        separate = self.emitter._separate
+        out: List[str] = []
+        stack: list = [row]
+        split = -1
+        while stack:
+            part = stack.pop()
+            if part is parser.body:
+                split = len(out)
+            elif type(part) is str:
+                if part:
+                    if out and len(out) != split and separate(out[-1], part):
+                        out.append(' ')
+                    out.append(part)
+            else:
+                stack.extend(reversed(dispatch[type(part)](part)))
+        return ''.join(out[:split]), parser.style, ''.join(out[split:])
+
+    def _cut(self, source: str) -> List[Segment]:
+        old, segments = self._source, self._segments
+        limit = min(len(old), len(source))
+        prefix = 0
+        while prefix < limit and old[prefix] == source[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and old[-1 - suffix] == source[-1 - suffix]:
+            suffix += 1
+
+        # Segments whose tokens and cuts cannot see the change; whether a "{"
+        # is ever closed depends on everything after it
+        kept = 0
+        while (kept < len(segments) and segments[kept].end + LOOKAHEAD <= prefix
+               and not segments[kept].opens):
+            kept += 1
+        kept = max(0, kept - LOOKAHEAD_SEGMENTS)
+        result = segments[:kept]
+        start = segments[kept].start if kept else 0
+
+        # From a cut in the unchanged suffix on, the old cuts hold
+        delta = len(source) - len(old)
+        unchanged = len(old) - suffix
+        old_starts = {segment.start: index for index, segment in enumerate(segments)
+                      if segment.start >= unchanged}
+        scanner = _Scanner(iter_tokens(source, start))
+        for first, last, opens in scanner.segments():
+            tokens = scanner.tokens[first:last]
+            begin, end = tokens[0].start, tokens[-1].end
+            index = old_starts.get(begin - delta)
+            if index is not None:
+                result.extend(segment._replace(start=segment.start + delta, end=segment.end + delta)
+                              for segment in segments[index:])
+                break
+            result.append(Segment(begin, end, source[begin:end], tokens, opens))
+        return result
+
+    def render(self, is_stale: Optional[Callable[[], bool]] = None) -> Optional[str]:
+        """LaTeX of the current text; None if ``is_stale()`` turned true meanwhile.
+
+        Raises ConversionError for a text over the length limit or a segment
+        nested too deeply, as ``korean_to_latex`` does.
+        """
+        source = self.text
+        check_length(source)
+        segments = self._cut(source)
+        previous, current = self._outputs, {}
+        separate = self.emitter._separate
+        out: List[str] = []
+        style: Optional[str] = None
+        closing: List[str] = []
+
+        for segment in segments:
+            key = (segment.text, style, segment.opens)
+            cached = current.get(key) or previous.get(key)
+            if cached is None:
+                if is_stale is not None and is_stale():
+                    return None
+                cached = self._convert(segment, style)
+                self.reparsed += 1
+            else:
+                self.reused += 1
+            current[key] = cached
+            latex, style, close = cached
+            if segment.opens:
+                closing.append(close)
+            if latex:
+                if out and separate(out[-1], latex):
+                    out.append(' ')
+                out.append(latex)
+        for latex in reversed(closing):
+            if latex:
+                if out and separate(out[-1], latex):
+                    out.append(' ')
+                out.append(latex)
+
+        self._source, self._segments, self._outputs = source, segments, current
+        return ''.join(out)
+
+    def update(self, text: str, is_stale: Optional[Callable[[], bool]] = None) -> Optional[str]:
+        self.text = text
+        return self.render(is_stale)
+
+
+def preview(script: str) -> str:
+    """Whole-script LaTeX through the segment path (same output as ``korean_to_latex``)."""
+    return LivePreview().update(script) or ''
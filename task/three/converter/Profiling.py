@@ -0,0 +1,215 @@
+import contextvars
+import cProfile
+import itertools
+import os
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+# Read once at import; set HWP_PROFILE_DIR to turn the hooks on
+DIRECTORY = os.environ.get('HWP_PROFILE_DIR') or None
+ENABLED = DIRECTORY is not None
+# Fraction of runs profiled unasked; 0 profiles only requests that send HEADER
+RATE = float(os.environ.get('HWP_PROFILE_RATE', '1'))
+# Seconds between stack samples (at least the interpreter's switch interval in practice)
+INTERVAL = float(os.environ.get('HWP_PROFILE_INTERVAL', '0.001'))
+# Allocation sites written per run
+TOP = int(os.environ.get('HWP_PROFILE_TOP', '25'))
+# Request header that asks for a request to be profiled, whatever the rate
+HEADER = 'x-hwp-profile'
+
+T = TypeVar('T')
+
+# True while handling a request that sent HEADER
+_requested = contextvars.ContextVar('hwp_profile_requested', default=False)
+# .session: the run being profiled on this thread; calls inside it are part of it
+_local = threading.local()
+_sequence = itertools.count()
+_tracing_lock = threading.Lock()
+_tracing = 0
+
+
+def _start_tracing():
+    global _tracing
+    with _tracing_lock:
+        if _tracing == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracing += 1
+
+
+def _stop_tracing():
+    global _tracing
+    with _tracing_lock:
+        _tracing -= 1
+        if _tracing == 0:
+            tracemalloc.stop()
+
+
+def _stack(frame) -> str:
+    names = []
+    while frame is not None:
+        names.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class Session:
+    """One profiled run: cProfile stats, sampled stacks and allocation sites.
+
+    The work may move between threads one step at a time (a streamed
+    response is produced by whichever pool thread asks for the next
+    chunk); each ``step`` profiles the thread it runs on. ``close`` writes
+    ``<name>-<time>-<pid>-<n>`` with ``.pstats`` (cProfile), ``.collapsed``
+    (``frame;frame;... count`` for flame graph tools) and ``.alloc.txt``
+    (the top TOP allocation sites since the run started, by size; tracing
+    is process-wide, so concurrent work shows up too) to DIRECTORY.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.profiler = cProfile.Profile()
+        self.stacks: Counter = Counter()
+        self._thread: Optional[int] = None
+        self._done = threading.Event()
+        _start_tracing()
+        self._before = tracemalloc.take_snapshot()
+        self._sampler = threading.Thread(target=self._sample, name='hwp-profile-sampler', daemon=True)
+        self._sampler.start()
+
+    def _sample(self):
+        while not self._done.wait(INTERVAL):
+            thread = self._thread
+            frame = sys._current_frames().get(thread) if thread is not None else None
+            if frame is not None:
+                self.stacks[_stack(frame)] += 1
+
+    @contextmanager
+    def step(self) -> Iterator[None]:
+        previous = getattr(_local, 'session', None)
+        _local.session = self
+        self._thread = threading.get_ident()
+        self.profiler.enable()
+        try:
+            yield
+        finally:
+            self.profiler.disable()
+            self._thread = None
+            _local.session = previous
+
+    def close(self) -> str:
+        """Write the results; returns their path without the extension."""
+        self._done.set()
+        self._sampler.join()
+        allocations = tracemalloc.take_snapshot().compare_to(self._before, 'lineno')[:TOP]
+        _stop_tracing()
+
+        os.makedirs(DIRECTORY, exist_ok=True)
+        name = re.sub(r'[^\w.-]+', '_', self.name).strip('_')[:80] or 'run'
+        base = os.path.join(DIRECTORY, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_sequence)}")
+        self.profiler.dump_stats(base + '.pstats')
+        with open(base + '.collapsed', 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f'{stack} {count}\n')
+        with open(base + '.alloc.txt', 'w', encoding='utf-8') as f:
+            f.write(f'# {self.name}: top {TOP} allocation sites, by size\n')
+            for statistic in allocations:
+                f.write(f'{statistic}\n')
+        return base
+
+
+def _chosen() -> bool:
+    """True if a new run is profiled: asked for, or sampled at RATE, and not inside another run."""
+    if getattr(_local, 'session', None) is not None:
+        return False
+    return _requested.get() or random.random() < RATE
+
+
+@contextmanager
+def _run(name: str) -> Iterator[None]:
+    session = Session(name)
+    try:
+        with session.step():
+            yield
+    finally:
+        session.close()
+
+
+@contextmanager
+def profile(name: str) -> Iterator[None]:
+    """Profile the block when profiling is on and the run is chosen; otherwise just run it."""
+    if not ENABLED or not _chosen():
+        yield
+        return
+    with _run(name):
+        yield
+
+
+def profiled(name: str, func: Callable) -> Callable:
+    """Wrap ``func`` so its calls may be profiled as runs called ``name``.
+
+    When profiling is off ``func`` itself is returned, so a hook bound
+    once (e.g. in a constructor) costs nothing per call. Calls made inside
+    a run being profiled are part of that run.
+    """
+    if not ENABLED:
+        return func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _chosen():
+            return func(*args, **kwargs)
+        with _run(name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def start(name: str) -> Optional[Session]:
+    """A session for a run done in separate steps, if it is chosen now; None otherwise.
+
+    Each step runs inside ``with session.step():`` on whatever thread does
+    it, and ``close`` writes the run once the last step is done.
+    """
+    if not ENABLED or not _chosen():
+        return None
+    return Session(name)
+
+
+def profiled_iter(name: str, items: Iterable[T]) -> Iterable[T]:
+    """``items``, profiled step by step as one run if it is chosen now; ``items`` itself otherwise."""
+    if not ENABLED or not _chosen():
+        return items
+    return _steps(name, iter(items))
+
+
+def _steps(name: str, items: Iterator[T]) -> Iterator[T]:
+    # The session starts with the first item, so an iterator never started leaves nothing behind
+    session = Session(name)
+    try:
+        while True:
+            with session.step():
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+            yield item
+    finally:
+        session.close()
+        if hasattr(items, 'close'):
+            items.close()
+
+
+def request(asked: bool) -> contextvars.Token:
+    """Mark the current context (a request) as asking to be profiled; undo with :func:`reset`."""
+    return _requested.set(asked)
+
+
+def reset(token: contextvars.Token):
+    _requested.reset(token)
@@ -0,0 +1,182 @@
+import re
+from typing import Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+from .Limits import check_length
+from .Substitution import compile_trie, separated
+
+
+# A replacement is a template (``\1`` for a group, ``\\`` for a backslash)
+# or a function of the rule's groups and the engine, e.g. to convert a group
+# with the same rules.
+Replacement = Union[str, Callable[[Tuple[Optional[str], ...], 'RuleEngine'], str]]
+
+TEMPLATE_PATTERN = re.compile(r'\\(\d+|\\)')
+
+# Longest word a superscript/subscript rule takes as its base or script.
+# An unbounded ``(\w+)\^`` is retried from every letter of a word with no
+# ``^`` after it, which makes a long word quadratic.
+MAX_RUN = 64
+
+
+class Rule(NamedTuple):
+    name: str
+    pattern: str                      # regex source; no numbered backreferences
+    replace: Replacement
+    priority: int = 0
+    nested: bool = False              # convert the groups with the engine first
+    mapping: Optional[Mapping[str, str]] = None   # literal rules: match text -> output
+
+
+def _template(template: str) -> Callable[[Tuple[Optional[str], ...]], str]:
+    """Compile ``\\frac{\\1}{\\2}`` once into a function of the groups."""
+    pieces: List[Union[str, int]] = []
+    last = 0
+    for match in TEMPLATE_PATTERN.finditer(template):
+        pieces.append(template[last:match.start()])
+        ref = match.group(1)
+        pieces.append('\\' if ref == '\\' else int(ref) - 1)
+        last = match.end()
+    pieces.append(template[last:])
+
+    def expand(groups: Tuple[Optional[str], ...]) -> str:
+        return ''.join(piece if type(piece) is str else (groups[piece] or '') for piece in pieces)
+
+    return expand
+
+
+class RuleEngine:
+    """Rewrite rules fused into one regex and applied in a single scan.
+
+    Rules are registered with a priority: the combined pattern tries them
+    from the highest priority down at every position, and the leftmost
+    match wins. A replacement ending in a control word gets a space when a
+    letter follows it, as in ``LatexEmitter``. Output is never rescanned, so one rule cannot rewrite
+    another rule's output (``\\frac{1}{2}`` keeps its braces even when ``{``
+    is a literal rule). Literal tables become one prefix trie each
+    (``Substitution.compile_trie``), so their cost does not grow with the
+    number of keys. Rules marked ``nested`` convert their groups with the
+    same engine before filling in the template, which is what running the
+    other passes over the inner text used to do.
+    """
+
+    def __init__(self, rules: Iterable[Rule] = ()):
+        self.rules: List[Rule] = []
+        self._compiled: Optional[Tuple['re.Pattern[str]', Dict[str, tuple]]] = None
+        for rule in rules:
+            self.add_rule(rule)
+
+    def add_rule(self, rule: Rule) -> 'RuleEngine':
+        self.rules.append(rule)
+        self._compiled = None
+        return self
+
+    def add(self, name: str, pattern: str, replace: Replacement,
+            priority: int = 0, nested: bool = False) -> 'RuleEngine':
+        return self.add_rule(Rule(name, pattern, replace, priority, nested))
+
+    def add_literals(self, name: str, mapping: Mapping[str, str],
+                     priority: int = 0, word_boundary: bool = True) -> 'RuleEngine':
+        """Register a literal table; a key that ends in a letter must end a word."""
+        pattern = compile_trie(mapping, word_boundary).pattern
+        return self.add_rule(Rule(name, pattern, '', priority, mapping=dict(mapping)))
+
+    def extend(self, other: 'RuleEngine') -> 'RuleEngine':
+        for rule in other.rules:
+            self.add_rule(rule)
+        return self
+
+    def compile(self) -> 're.Pattern[str]':
+        return self._compile()[0]
+
+    def _compile(self) -> Tuple['re.Pattern[str]', Dict[str, tuple]]:
+        if self._compiled is None:
+            # Stable sort: equal priorities keep registration order
+            ordered = sorted(self.rules, key=lambda rule: -rule.priority)
+            branches = []
+            actions: Dict[str, tuple] = {}
+            offset = 1
+            for index, rule in enumerate(ordered):
+                group = f'r{index}'
+                width = re.compile(rule.pattern).groups
+                branches.append(f'(?P<{group}>{rule.pattern})')
+                if rule.mapping is not None:
+                    action = rule.mapping.__getitem__
+                elif callable(rule.replace):
+                    action = rule.replace
+                else:
+                    action = _template(rule.replace)
+                actions[group] = (offset, offset + width, rule.mapping is not None, rule.nested,
+                                  callable(rule.replace) and rule.mapping is None, action)
+                offset += width + 1
+            pattern = re.compile('|'.join(branches) if branches else r'(?!)')
+            self._compiled = (pattern, actions)
+        return self._compiled
+
+    def sub(self, text: str) -> str:
+        """Apply every rule in one left-to-right scan."""
+        check_length(text)
+        pattern, actions = self._compile()
+
+        def replace(match: 're.Match[str]') -> str:
+            start, end, literal, nested, takes_engine, action = actions[match.lastgroup]
+            if literal:
+                return separated(action(match.group()), match)
+            groups = match.groups()[start:end]
+            if nested:
+                groups = tuple(self.sub(group) if group else group for group in groups)
+            return separated(action(groups, self) if takes_engine else action(groups), match)
+
+        return pattern.sub(replace, text)
+
+
+def _matrix(groups: Tuple[Optional[str], ...], engine: RuleEngine) -> str:
+    """[[1 2; 3 4]] -> pmatrix, cells converted with the same rules"""
+    rows = (groups[0] or '').split(';')
+    matrix_content = r' \\ '.join(' & '.join(engine.sub(cell) for cell in row.split()) for row in rows)
+    return f"\\begin{{pmatrix}}{matrix_content}\\end{{pmatrix}}"
+
+
+def formula_profile(symbols: Mapping[str, str]) -> RuleEngine:
+    """four.MathFormulaConverter: ``x1`` -> ``x_{1}``, ``^2`` -> ``^{2}``, ``1/3`` -> ``\\frac``.
+
+    A fraction starts at the first digit of a number: a longer match would
+    have been found there already, and trying every later digit again made
+    a long number quadratic.
+    """
+    return (RuleEngine()
+            .add('fraction', r'(?<!\d)(\d+)/(\d+)', r'\\frac{\1}{\2}', priority=40)
+            .add_literals('symbols', symbols, priority=30)
+            .add('subscript', r'(?<=[a-zA-Z])(\d+)', r'_{\1}', priority=20)
+            .add('power', r'\^(\d+)', r'^{\1}', priority=10))
+
+
+def plain_profile(symbols: Mapping[str, str]) -> RuleEngine:
+    """three.Converter2.MathConverter: ``1/3``, ``x^2``, ``√{x}``, ``[[1 2;3 4]]``.
+
+    Every pattern fails in time bounded by the text up to the next place it
+    could start again (the next number, ``√`` or ``[[``), or by ``MAX_RUN``,
+    so unbalanced roots and matrices and long words stay linear.
+    """
+    return (RuleEngine()
+            .add_literals('symbols', symbols, priority=70)
+            .add('fraction', r'(?<!\d)(\d+)\s*\/\s*(\d+)', r'\\frac{\1}{\2}', priority=60)
+            .add('superscript', r'(\w{1,%d})\^(\w{1,%d})' % (MAX_RUN, MAX_RUN), r'{\1}^{\2}',
+                 priority=50, nested=True)
+            .add('subscript', r'(\w{1,%d})_(\w{1,%d})' % (MAX_RUN, MAX_RUN), r'{\1}_{\2}',
+                 priority=40, nested=True)
+            .add('root', r'√\{([^}√]+)\}', r'\\sqrt{\1}', priority=30, nested=True)
+            .add('combination', r'_(\d+)C_(\d+)', r'C_{\1}^{\2}', priority=20)
+            .add('matrix', r'\[\[((?:(?!\[\[|\]\]).)*)\]\]', _matrix, priority=10))
+
+
+def symbol_profile(symbols: Mapping[str, str]) -> RuleEngine:
+    """two.AdvancedMathConverter: keyword and symbol table only."""
+    return RuleEngine().add_literals('symbols', symbols)
+
+
+def combine(*profiles: RuleEngine) -> RuleEngine:
+    """One engine holding every rule of ``profiles`` (e.g. the union of all converters)."""
+    engine = RuleEngine()
+    for profile in profiles:
+        engine.extend(profile)
+    return engine
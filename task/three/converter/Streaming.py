@@ -0,0 +1,204 @@
+import os
+import xml.etree.ElementTree as ET
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from .Metrics import timed
+
+
+# Local (namespace-free) tag names of the equation containers and scripts
+# HWPX: <hp:equation id=".."><hp:script>..</hp:script></hp:equation>
+# HML:  <EQUATION><SCRIPT>..</SCRIPT></EQUATION>
+EQUATION_TAGS = frozenset({'equation', 'EQUATION'})
+SCRIPT_TAGS = frozenset({'script', 'SCRIPT', 'hmath', 'math'})
+
+# Paragraphs and their text runs, for document-order export
+# HWPX: <hp:p><hp:run><hp:t>..</hp:t></hp:run></hp:p>    HML: <P><TEXT><CHAR>..</CHAR></TEXT></P>
+PARAGRAPH_TAGS = frozenset({'p', 'P'})
+TEXT_TAGS = frozenset({'t', 'CHAR'})
+LINE_BREAK_TAGS = frozenset({'lineBreak', 'LINEBREAK'})
+
+CHUNK_SIZE = 16 * 1024
+
+
+class _ScriptTarget:
+    """expat target that only collects the text of script elements."""
+
+    def __init__(self, script_tags: FrozenSet[str], equation_tags: FrozenSet[str]):
+        self.script_tags = script_tags
+        self.equation_tags = equation_tags
+        self.local_names: Dict[str, str] = {}
+        self.equation_id = ''
+        self.text: Optional[List[str]] = None
+        self.ready: List[Tuple[str, str]] = []
+
+    def _local(self, tag: str) -> str:
+        local = self.local_names.get(tag)
+        if local is None:
+            local = self.local_names[tag] = tag.rpartition('}')[2]
+        return local
+
+    def start(self, tag: str, attrib: Dict[str, str]):
+        local = self._local(tag)
+        if local in self.equation_tags:
+            self.equation_id = attrib.get('id', '')
+        elif local in self.script_tags:
+            self.text = []
+            if not self.equation_id:
+                self.equation_id = attrib.get('id', '')
+
+    def end(self, tag: str):
+        local = self._local(tag)
+        if self.text is not None and local in self.script_tags:
+            self.ready.append((self.equation_id, ''.join(self.text)))
+            self.text = None
+        elif local in self.equation_tags:
+            self.equation_id = ''
+
+    def data(self, text: str):
+        if self.text is not None:
+            self.text.append(text)
+
+    def close(self):
+        return None
+
+
+class EquationExtractor:
+    """Push-style streaming extractor for equation scripts.
+
+    Feed raw XML in chunks; ``(equation id, script)`` pairs are yielded as
+    soon as the closing script tag arrives. The expat parser calls straight
+    into a small target object, so no element tree is ever built and memory
+    does not depend on the document size.
+    """
+
+    def __init__(self,
+                 script_tags: FrozenSet[str] = SCRIPT_TAGS,
+                 equation_tags: FrozenSet[str] = EQUATION_TAGS):
+        self._target = _ScriptTarget(script_tags, equation_tags)
+        self._parser = ET.XMLParser(target=self._target)
+
+    def feed(self, data) -> Iterator[Tuple[str, str]]:
+        """Feed a chunk of XML (bytes or str) and yield the finished scripts."""
+        self._parser.feed(data)
+        return self._drain()
+
+    def close(self) -> Iterator[Tuple[str, str]]:
+        """Signal the end of input and yield whatever is left."""
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> Iterator[Tuple[str, str]]:
+        ready, self._target.ready = self._target.ready, []
+        return iter(ready)
+
+
+def iter_equations(source,
+                   script_tags: FrozenSet[str] = SCRIPT_TAGS,
+                   equation_tags: FrozenSet[str] = EQUATION_TAGS,
+                   chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, str]]:
+    """Stream ``(equation id, script)`` pairs from a path or binary file object."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as fp:
+            yield from iter_equations(fp, script_tags, equation_tags, chunk_size)
+        return
+
+    extractor = EquationExtractor(script_tags, equation_tags)
+    feed = timed('xml_parse', extractor.feed)
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        yield from feed(chunk)
+    yield from extractor.close()
+
+
+def iter_equations_from_chunks(chunks: Iterable,
+                               script_tags: FrozenSet[str] = SCRIPT_TAGS,
+                               equation_tags: FrozenSet[str] = EQUATION_TAGS
+                               ) -> Iterator[Tuple[str, str]]:
+    """Stream ``(equation id, script)`` pairs from an iterable of XML chunks."""
+    extractor = EquationExtractor(script_tags, equation_tags)
+    for chunk in chunks:
+        yield from extractor.feed(chunk)
+    yield from extractor.close()
+
+
+# Document events: (PARAGRAPH, '') opens a paragraph, (TEXT, text) is a text
+# run, (BREAK, '') a line break, (EQUATION, script) an equation, and (END, '')
+# closes the paragraph. Nested paragraphs (table cells, text boxes) are
+# flattened: the outer paragraph is closed first and reopened afterwards.
+PARAGRAPH, TEXT, BREAK, EQUATION, END = 'paragraph', 'text', 'break', 'equation', 'end'
+
+
+class _DocumentTarget(_ScriptTarget):
+    """expat target that reports paragraphs, text runs and equations in order."""
+
+    def __init__(self):
+        super().__init__(SCRIPT_TAGS, EQUATION_TAGS)
+        self.text_depth = 0
+        self.open = False
+
+    def _paragraph(self):
+        if not self.open:
+            self.ready.append((PARAGRAPH, ''))
+            self.open = True
+
+    def _close(self):
+        if self.open:
+            self.ready.append((END, ''))
+            self.open = False
+
+    def start(self, tag: str, attrib: Dict[str, str]):
+        local = self._local(tag)
+        if local in PARAGRAPH_TAGS:
+            self._close()
+        elif local in TEXT_TAGS:
+            self.text_depth += 1
+        elif local in LINE_BREAK_TAGS and self.text_depth:
+            self._paragraph()
+            self.ready.append((BREAK, ''))
+        else:
+            super().start(tag, attrib)
+
+    def end(self, tag: str):
+        local = self._local(tag)
+        if local in PARAGRAPH_TAGS:
+            self._close()
+        elif local in TEXT_TAGS:
+            self.text_depth -= 1
+        elif self.text is not None and local in self.script_tags:
+            self._paragraph()
+            self.ready.append((EQUATION, ''.join(self.text)))
+            self.text = None
+        else:
+            super().end(tag)
+
+    def data(self, text: str):
+        if self.text is not None:
+            self.text.append(text)
+        elif self.text_depth:
+            self._paragraph()
+            self.ready.append((TEXT, text))
+
+    def close(self):
+        self._close()
+
+
+def iter_document(source, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, str]]:
+    """Stream ``(event, text)`` pairs of a section/HML document in document order."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as fp:
+            yield from iter_document(fp, chunk_size)
+        return
+
+    target = _DocumentTarget()
+    parser = ET.XMLParser(target=target)
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        parser.feed(chunk)
+        ready, target.ready = target.ready, []
+        yield from ready
+    parser.close()
+    yield from target.ready
@@ -0,0 +1,104 @@
+import re
+from typing import Dict, Iterable, Optional
+
+
+LETTER = 'A-Za-z'
+
+
+def _is_letter(char: str) -> bool:
+    return 'a' <= char <= 'z' or 'A' <= char <= 'Z'
+
+
+def ends_with_command(piece: str) -> bool:
+    """True if ``piece`` ends in a control word such as ``\\times``."""
+    i = len(piece)
+    while i and piece[i - 1].isalpha():
+        i -= 1
+    return 0 < i < len(piece) and piece[i - 1] == '\\'
+
+
+def separated(replacement: str, match: 're.Match[str]') -> str:
+    """``replacement`` for ``match``, with a space after a trailing control
+    word that a letter follows (``\\forall`` before ``x`` is not ``\\forallx``)."""
+    end = match.end()
+    text = match.string
+    if end < len(text) and text[end].isalpha() and ends_with_command(replacement):
+        return replacement + ' '
+    return replacement
+
+
+def compile_trie(keys: Iterable[str], word_boundary: bool = True) -> 're.Pattern[str]':
+    """Compile literal keys into one regex shaped like a prefix trie.
+
+    At every position the regex walks at most one trie path, always trying
+    the longer continuation first, so the leftmost-longest key wins and a
+    scan costs O(n * longest key) no matter how many keys there are.
+
+    With ``word_boundary`` a key that ends in a letter must not be followed
+    by another letter (``\\cap`` never matches inside ``\\capital``), and a
+    key that starts with a letter must not be preceded by one.
+    """
+    trie: Dict = {}
+    for key in keys:
+        if not key:
+            continue
+        node = trie
+        for char in key:
+            node = node.setdefault(char, {})
+        node[None] = True
+
+    if not trie:
+        return re.compile(r'(?!)')
+
+    def emit(node: Dict, last_char: str) -> str:
+        branches = [re.escape(char) + emit(child, char)
+                    for char, child in sorted(item for item in node.items() if item[0] is not None)]
+        terminal = None in node
+        tail = f'(?![{LETTER}])' if word_boundary and _is_letter(last_char) else ''
+
+        if not branches:
+            return tail
+        body = '|'.join(branches)
+        if not terminal:
+            return body if len(branches) == 1 else f'(?:{body})'
+        if tail:
+            return f'(?:{body}|{tail})'
+        return f'(?:{body})?'
+
+    roots = []
+    for char, child in sorted(item for item in trie.items() if item[0] is not None):
+        head = f'(?<![{LETTER}])' if word_boundary and _is_letter(char) else ''
+        roots.append(head + re.escape(char) + emit(child, char))
+
+    return re.compile('|'.join(roots))
+
+
+class SymbolTable:
+    """Literal substitution map applied in a single left-to-right scan.
+
+    Replacements are never rescanned, so the result does not depend on the
+    order of the entries and one entry cannot clobber another's output.
+    """
+
+    def __init__(self, mapping: Dict[str, str], word_boundary: bool = True):
+        self.mapping = {key: value for key, value in mapping.items() if key}
+        self.word_boundary = word_boundary
+        self.pattern = compile_trie(self.mapping, word_boundary)
+        self._replace = lambda match, lookup=self.mapping.__getitem__: separated(lookup(match.group()), match)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.mapping
+
+    def __len__(self) -> int:
+        return len(self.mapping)
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        return self.mapping.get(key, default)
+
+    def sub(self, text: str) -> str:
+        """Rewrite every key occurrence in one pass."""
+        return self.pattern.sub(self._replace, text)
+
+    def inverse(self) -> 'SymbolTable':
+        """Table for the opposite direction (later entries win on duplicates)."""
+        return SymbolTable({value: key for key, value in self.mapping.items()}, self.word_boundary)
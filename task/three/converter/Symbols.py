@@ -0,0 +1,124 @@
+from typing import Dict, Optional
+
+
+# HWP equation words -> LaTeX. Greek letters are case sensitive
+# (``pi`` is π, ``PI`` is Π); every other word is matched in any case.
+GREEK = {
+    'alpha': r'\alpha', 'beta': r'\beta', 'gamma': r'\gamma', 'delta': r'\delta',
+    'epsilon': r'\epsilon', 'zeta': r'\zeta', 'eta': r'\eta', 'theta': r'\theta',
+    'iota': r'\iota', 'kappa': r'\kappa', 'lambda': r'\lambda', 'mu': r'\mu',
+    'nu': r'\nu', 'xi': r'\xi', 'omicron': 'o', 'pi': r'\pi', 'rho': r'\rho',
+    'sigma': r'\sigma', 'tau': r'\tau', 'upsilon': r'\upsilon', 'phi': r'\phi',
+    'chi': r'\chi', 'psi': r'\psi', 'omega': r'\omega',
+    'GAMMA': r'\Gamma', 'DELTA': r'\Delta', 'THETA': r'\Theta', 'LAMBDA': r'\Lambda',
+    'XI': r'\Xi', 'PI': r'\Pi', 'SIGMA': r'\Sigma', 'UPSILON': r'\Upsilon',
+    'PHI': r'\Phi', 'PSI': r'\Psi', 'OMEGA': r'\Omega',
+}
+
+WORDS = {
+    # Operators
+    'times': r'\times', 'div': r'\div', 'cdot': r'\cdot', 'pm': r'\pm', 'mp': r'\mp',
+    'circ': r'\circ', 'bullet': r'\bullet', 'deg': r'^{\circ}', 'prime': r'\prime',
+
+    # Relations
+    'leq': r'\leq', 'geq': r'\geq', 'neq': r'\neq', 'approx': r'\approx', 'sim': r'\sim',
+    'simeq': r'\simeq', 'equiv': r'\equiv', 'propto': r'\propto',
+    'larrow': r'\leftarrow', 'rarrow': r'\rightarrow', 'lrarrow': r'\leftrightarrow',
+
+    # Sets and logic
+    'smallinter': r'\cap', 'smallunion': r'\cup', 'cap': r'\cap', 'cup': r'\cup',
+    'subset': r'\subset', 'supset': r'\supset', 'subseteq': r'\subseteq',
+    'supseteq': r'\supseteq', 'in': r'\in', 'notin': r'\notin', 'ni': r'\ni',
+    'emptyset': r'\emptyset', 'forall': r'\forall', 'exists': r'\exists',
+    'therefore': r'\therefore', 'because': r'\because', 'neg': r'\neg',
+
+    # Miscellaneous
+    'infty': r'\infty', 'inf': r'\infty', 'partial': r'\partial', 'nabla': r'\nabla',
+    'angle': r'\angle', 'triangle': r'\triangle', 'perp': r'\perp', 'parallel': r'\parallel',
+    'cdots': r'\cdots', 'ldots': r'\ldots', 'vdots': r'\vdots', 'ddots': r'\ddots',
+    'lbrace': r'\{', 'rbrace': r'\}',
+
+    # Big operators
+    'sum': r'\sum', 'prod': r'\prod', 'int': r'\int', 'oint': r'\oint',
+    'dint': r'\iint', 'tint': r'\iiint', 'bigcup': r'\bigcup', 'bigcap': r'\bigcap',
+
+    # Functions
+    'sin': r'\sin', 'cos': r'\cos', 'tan': r'\tan', 'cot': r'\cot', 'sec': r'\sec',
+    'csc': r'\csc', 'arcsin': r'\arcsin', 'arccos': r'\arccos', 'arctan': r'\arctan',
+    'sinh': r'\sinh', 'cosh': r'\cosh', 'tanh': r'\tanh', 'log': r'\log', 'ln': r'\ln',
+    'lg': r'\lg', 'exp': r'\exp', 'lim': r'\lim', 'max': r'\max', 'min': r'\min',
+    'det': r'\det', 'gcd': r'\gcd',
+}
+
+# Arrows whose upper-case spelling is a different (double) arrow
+CASED_WORDS = {
+    'LARROW': r'\Leftarrow', 'RARROW': r'\Rightarrow', 'LRARROW': r'\Leftrightarrow',
+}
+
+OPERATORS = {
+    '<=': r'\leq', '>=': r'\geq', '!=': r'\neq', '==': r'\equiv',
+    '->': r'\to', '<-': r'\gets',
+    '%': r'\%', '$': r'\$', '&': r'\&', '#': r'\\', '\\': r'\backslash',
+}
+
+
+def symbol_name(word: str) -> Optional[str]:
+    """Return the canonical symbol name of an HWP word, or None."""
+    if word in GREEK or word in CASED_WORDS:
+        return word
+    lowered = word.lower()
+    if lowered in WORDS:
+        return lowered
+    return None
+
+
+def latex_symbol(name: str) -> str:
+    """LaTeX for a canonical symbol name returned by :func:`symbol_name`."""
+    return GREEK.get(name) or CASED_WORDS.get(name) or WORDS[name]
+
+
+def _latex_names() -> Dict[str, str]:
+    names: Dict[str, str] = {}
+    for table in (WORDS, CASED_WORDS, GREEK):
+        for name, latex in table.items():
+            # Skip non-commands (``o``, ``^{\circ}``); the first spelling wins
+            if latex[:1] == '\\' and latex[1:].isalpha():
+                names.setdefault(latex, name)
+    return names
+
+
+# LaTeX command -> canonical symbol name, for the LaTeX -> HWP direction
+LATEX_NAMES = _latex_names()
+LATEX_NAMES.update({
+    r'\cap': 'cap', r'\cup': 'cup', r'\infty': 'infty',
+    r'\le': 'leq', r'\ge': 'geq', r'\ne': 'neq',
+    r'\leftarrow': 'larrow', r'\rightarrow': 'rarrow',
+    r'\iint': 'dint', r'\iiint': 'tint', r'\varepsilon': 'epsilon', r'\varphi': 'phi',
+    r'\lnot': 'neg',
+})
+
+
+# LaTeX command -> character, for output that is not LaTeX (MathML)
+UNICODE = {
+    r'\alpha': 'α', r'\beta': 'β', r'\gamma': 'γ', r'\delta': 'δ', r'\epsilon': 'ϵ',
+    r'\zeta': 'ζ', r'\eta': 'η', r'\theta': 'θ', r'\iota': 'ι', r'\kappa': 'κ',
+    r'\lambda': 'λ', r'\mu': 'μ', r'\nu': 'ν', r'\xi': 'ξ', r'\pi': 'π', r'\rho': 'ρ',
+    r'\sigma': 'σ', r'\tau': 'τ', r'\upsilon': 'υ', r'\phi': 'ϕ', r'\chi': 'χ',
+    r'\psi': 'ψ', r'\omega': 'ω',
+    r'\Gamma': 'Γ', r'\Delta': 'Δ', r'\Theta': 'Θ', r'\Lambda': 'Λ', r'\Xi': 'Ξ',
+    r'\Pi': 'Π', r'\Sigma': 'Σ', r'\Upsilon': 'Υ', r'\Phi': 'Φ', r'\Psi': 'Ψ', r'\Omega': 'Ω',
+    r'\times': '×', r'\div': '÷', r'\cdot': '⋅', r'\pm': '±', r'\mp': '∓', r'\circ': '∘',
+    r'\bullet': '∙', '^{\\circ}': '°', r'\prime': '′',
+    r'\leq': '≤', r'\geq': '≥', r'\neq': '≠', r'\approx': '≈', r'\sim': '∼', r'\simeq': '≃',
+    r'\equiv': '≡', r'\propto': '∝', r'\leftarrow': '←', r'\rightarrow': '→',
+    r'\leftrightarrow': '↔', r'\Leftarrow': '⇐', r'\Rightarrow': '⇒', r'\Leftrightarrow': '⇔',
+    r'\to': '→', r'\gets': '←',
+    r'\cap': '∩', r'\cup': '∪', r'\subset': '⊂', r'\supset': '⊃', r'\subseteq': '⊆',
+    r'\supseteq': '⊇', r'\in': '∈', r'\notin': '∉', r'\ni': '∋', r'\emptyset': '∅',
+    r'\forall': '∀', r'\exists': '∃', r'\therefore': '∴', r'\because': '∵', r'\neg': '¬',
+    r'\infty': '∞', r'\partial': '∂', r'\nabla': '∇', r'\angle': '∠', r'\triangle': '△',
+    r'\perp': '⊥', r'\parallel': '∥', r'\cdots': '⋯', r'\ldots': '…', r'\vdots': '⋮',
+    r'\ddots': '⋱', r'\{': '{', r'\}': '}',
+    r'\sum': '∑', r'\prod': '∏', r'\int': '∫', r'\oint': '∮', r'\iint': '∬', r'\iiint': '∭',
+    r'\bigcup': '⋃', r'\bigcap': '⋂',
+}
@@ -0,0 +1,77 @@
+import time
+import zipfile
+
+from task.three.converter import Batch
+from task.three.converter.Limits import MAX_DEPTH, fallback_latex
+
+DEEP = '{' * (MAX_DEPTH + 1) + 'x' + '}' * (MAX_DEPTH + 1)
+
+
+def _document(tmp_path, *scripts):
+    path = tmp_path / 'doc.hml'
+    equations = ''.join(f'<EQUATION><SCRIPT>{script}</SCRIPT></EQUATION>' for script in scripts)
+    path.write_text(f'<HWPML><BODY>{equations}</BODY></HWPML>', encoding='utf-8')
+    return str(path)
+
+
+def test_refused_script_is_kept_as_text(tmp_path):
+    Batch._init_worker()
+    result = Batch.convert_document(_document(tmp_path, '1 over 2', DEEP))
+    assert result.error is None
+    assert result.equations[1] == (DEEP, fallback_latex(DEEP))
+    assert (result.recomputed, result.rejected) == (1, 1)
+
+
+def test_refused_script_with_a_manifest(tmp_path):
+    Batch._init_worker(manifest_dir=str(tmp_path / 'manifests'))
+    try:
+        result = Batch.convert_document(_document(tmp_path, '1 over 2', DEEP))
+    finally:
+        Batch._init_worker()
+    assert result.error is None
+    assert result.equations == [('1 over 2', r'\frac{1}{2}'), (DEEP, fallback_latex(DEEP))]
+    assert (result.recomputed, result.rejected) == (1, 1)
+
+
+def test_time_limit_fails_the_document(tmp_path, monkeypatch):
+    Batch._init_worker(seconds=0.01)
+    try:
+        # Interrupted by the alarm; not a script the limits refused
+        monkeypatch.setattr(Batch._converter, 'korean_to_latex', lambda script: time.sleep(1))
+        result = Batch.convert_document(_document(tmp_path, '{1} over {2}'))
+    finally:
+        Batch._init_worker()
+    assert result.error.startswith('TimeLimitExceeded')
+    assert (result.equations, result.rejected) == ([], 0)
+
+
+def test_refused_script_is_not_recorded_in_the_manifest(tmp_path):
+    document = _document(tmp_path, '1 over 2', DEEP)
+    Batch._init_worker(manifest_dir=str(tmp_path / 'manifests'))
+    try:
+        first = Batch.convert_document(document)
+        second = Batch.convert_document(document)
+    finally:
+        Batch._init_worker()
+    assert first.equations == second.equations
+    # The converted script is reused; the refused one is tried again
+    assert (second.reused, second.recomputed, second.rejected) == (1, 0, 1)
+
+
+def _sections(tmp_path, *sections):
+    path = tmp_path / 'doc.hwpx'
+    with zipfile.ZipFile(path, 'w') as archive:
+        for number, scripts in enumerate(sections):
+            equations = ''.join(f'<hp:equation id="{i}"><hp:script>{script}</hp:script></hp:equation>'
+                                for i, script in enumerate(scripts))
+            archive.writestr(f'Contents/section{number}.xml', f'<hp:sec xmlns:hp="urn:x">{equations}</hp:sec>')
+    return str(path)
+
+
+def test_parallel_sections_match_serial(tmp_path):
+    document = _sections(tmp_path, ['1 over 2', 'x ^{2}'], ['sqrt {y}', DEEP], ['alpha'], ['a over b'])
+    serial, = Batch.convert_many([document], seconds=None)
+    parallel, = Batch.convert_many([document], section_jobs=2, seconds=None)
+    assert parallel == serial
+    assert [script for script, _ in parallel.equations] == ['1 over 2', 'x ^{2}', 'sqrt {y}', DEEP, 'alpha', 'a over b']
+    assert (parallel.recomputed, parallel.rejected) == (5, 1)
@@ -0,0 +1,39 @@
+from task.three.converter.Cache import CachedConverter, ConversionCache
+from task.three.converter.Converter import KoreanMathConverter
+from task.three.converter.Converter2 import MathConverter as MathConverter2
+from task.three.converter.Converter3 import MathConverter as MathConverter3
+from task.three.converter.Incremental import converter_version
+
+
+def test_same_class_name_in_two_modules_does_not_share_entries():
+    cache = ConversionCache()
+    two = CachedConverter(MathConverter2(), cache)
+    three = CachedConverter(MathConverter3(), cache)
+    script = '1/3 + x^2'
+
+    assert two.hangul_to_latex(script) == MathConverter2().hangul_to_latex(script)
+    assert three.hangul_to_latex(script) == MathConverter3().hangul_to_latex(script)
+    assert len(cache) == 2
+
+
+def test_whitespace_variants_share_one_entry():
+    converter = CachedConverter(KoreanMathConverter())
+    first = converter.korean_to_latex('{1} over {2}')
+    assert converter.korean_to_latex('  {1}   over {2} ') == first
+    assert converter.stats.hits == 1
+
+
+def test_cached_output_equals_uncached():
+    scripts = ['"a    b" + x', '"a b" + x', 'rm  abc', 'rm abc', '{1}  over {2}']
+    for cls, method in ((KoreanMathConverter, 'korean_to_latex'), (KoreanMathConverter, 'latex_to_korean'),
+                        (MathConverter2, 'hangul_to_latex'), (MathConverter3, 'hangul_to_latex')):
+        cached = getattr(CachedConverter(cls()), method)
+        uncached = getattr(cls(), method)
+        for script in scripts + [r'\text{a    b}', r'\text{a b}']:
+            # Twice: the second answer comes from the cache
+            assert cached(script) == cached(script) == uncached(script), (cls, method, script)
+
+
+def test_manifest_version_names_the_module():
+    assert converter_version(MathConverter2()) != converter_version(MathConverter3())
+    assert converter_version(CachedConverter(KoreanMathConverter())) == converter_version(KoreanMathConverter())
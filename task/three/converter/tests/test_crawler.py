@@ -0,0 +1,38 @@
+import asyncio
+import time
+
+import pytest
+
+httpx = pytest.importorskip('httpx')
+
+from task.three.converter.Batch import DocumentResult
+from task.크롤링 import Crawler
+
+
+def _slow_convert(url, data):
+    time.sleep(0.2)
+    return DocumentResult(url, [], None)
+
+
+def test_slow_converter_holds_the_downloads_back(monkeypatch):
+    # Module-level so the (forked) worker can unpickle it
+    monkeypatch.setattr(Crawler, '_convert', _slow_convert)
+    requested = []
+
+    def handler(request):
+        requested.append(request.url)
+        return httpx.Response(200, content=b'x' * 1024)
+
+    urls = [f'http://example.test/{i}.hml' for i in range(20)]
+
+    async def first():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            results = Crawler.crawl(urls, jobs=1, per_host=1, queue_size=1, client=client)
+            try:
+                await results.__anext__()
+                return len(requested)
+            finally:
+                await results.aclose()
+
+    # One converting, one queued, one downloaded and waiting to be queued
+    assert asyncio.run(first()) <= 3
@@ -0,0 +1,40 @@
+import pytest
+
+from task.three.converter.Converter import KoreanMathConverter
+from task.three.converter.Emitter import PlainEmitter
+from task.three.converter.LatexParser import parse_latex
+
+
+@pytest.fixture(scope='module')
+def converter():
+    return KoreanMathConverter()
+
+
+@pytest.mark.parametrize('script, latex', [
+    ('"50%"', r'\text{50\%}'),
+    ('"a_b {x}"', r'\text{a\_b \{x\}}'),
+    ('"a#b & c"', r'\text{a\#b \& c}'),
+    ('"x^2~y"', r'\text{x\^{}2\~{}y}'),
+    ('확률', r'\text{확률}'),
+])
+def test_text_is_escaped(converter, script, latex):
+    assert converter.korean_to_latex(script) == latex
+
+
+@pytest.mark.parametrize('script', ['"50%"', '"a_b {x}"', '"a#b & c\\ d^e~f$"'])
+def test_escaped_text_reads_back(converter, script):
+    assert converter.latex_to_korean(converter.korean_to_latex(script)) == script
+
+
+@pytest.mark.parametrize('latex, plain', [
+    (r'\frac{1}{\frac{2}{3}}', '1/(2/3)'),
+    (r'\frac{\frac{1}{2}}{3}', '(1/2)/3'),
+    (r'\frac{a+b}{2}', '(a+b)/2'),
+    (r'\frac{x^2}{3}', '(x^2)/3'),
+    (r'x_{ij}^{2}', 'x_(ij)^2'),
+    (r'x_{i+1}', 'x_(i+1)'),
+    (r'x^{10}', 'x^10'),
+    (r'{x^2}^3', '(x^2)^3'),
+])
+def test_plain_operands_are_unambiguous(latex, plain):
+    assert PlainEmitter().emit(parse_latex(latex)) == plain
@@ -0,0 +1,179 @@
+import asyncio
+import io
+import json
+import time
+import zipfile
+
+import pytest
+
+pytest.importorskip('fastapi')
+pytest.importorskip('httpx')
+
+from fastapi.testclient import TestClient
+
+from task.fastapi import main
+
+
+@pytest.fixture
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+def _records(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_batch_lines_split_across_chunks(client):
+    body = [b'{"id": 1, "expression": "1 ov', b'er 2"}\n{"id": 2, "lat', b'ex": "\\\\frac{1}{2}"}\n', b'not json']
+    records = _records(client.post('/batch', content=iter(body)))
+    assert records[0] == {'id': 1, 'latex': r'\frac{1}{2}'}
+    assert records[1]['id'] == 2 and 'expression' in records[1]
+    assert records[2]['error'].startswith('invalid JSON')
+
+
+def test_batch_answers_before_the_body_ends():
+    sent = []
+    second = asyncio.Event()
+
+    async def run():
+        messages = iter([
+            {'type': 'http.request', 'body': b'{"id": 1, "expression": "x"}\n', 'more_body': True},
+            {'type': 'http.request', 'body': b'{"id": 2, "expression": "y"}\n', 'more_body': False},
+        ])
+
+        async def receive():
+            message = next(messages)
+            if not message['more_body']:
+                # The last chunk only arrives once the first answer is out
+                await second.wait()
+            return message
+
+        async def send(message):
+            sent.append(message)
+            if message.get('body'):
+                second.set()
+
+        scope = {'type': 'http', 'method': 'POST', 'path': '/batch', 'raw_path': b'/batch',
+                 'query_string': b'', 'headers': [], 'app': main.app}
+        main.app.state.converter = main.CachedConverter(main.KoreanMathConverter())
+        await asyncio.wait_for(main.app(scope, receive, send), 5)
+
+    asyncio.run(run())
+    bodies = [json.loads(line) for m in sent if m.get('body') for line in m['body'].splitlines()]
+    assert [record['id'] for record in bodies] == [1, 2]
+
+
+def test_unexpected_error_becomes_a_record(client, monkeypatch):
+    def broken(script):
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(client.app.state.converter, 'korean_to_latex', broken)
+    records = _records(client.post('/batch', content=b'{"id": 1, "expression": "x"}\n'))
+    assert records == [{'id': 1, 'error': 'RuntimeError: boom'}]
+
+
+def test_broken_hwpx_section_ends_with_an_error_record(client):
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, 'w') as archive:
+        archive.writestr('Contents/section0.xml', '<hp:sec xmlns:hp="urn:x"><hp:script>1 over 2')
+    response = client.post('/upload/hwpx', content=data.getvalue())
+    assert response.status_code == 200
+    assert 'error' in _records(response)[-1]
+
+
+def test_upload_hml(client):
+    body = '<HWPML><BODY><EQUATION><SCRIPT>1 over 2</SCRIPT></EQUATION></BODY></HWPML>'.encode()
+    records = _records(client.post('/upload/hml', content=body))
+    assert [record['latex'] for record in records] == [r'\frac{1}{2}']
+    assert client.post('/upload/hml', content=b'<HWPML><BODY>').status_code == 400
+
+
+def _hwpx(section: str) -> bytes:
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('Contents/section0.xml', section)
+    return data.getvalue()
+
+
+def test_oversized_uploads_are_refused(client, monkeypatch):
+    monkeypatch.setattr(main, 'MAX_BODY', 64)
+    assert client.post('/upload/hml', content=b'x' * 65).status_code == 413
+    # Without a Content-Length the running total is what counts
+    assert client.post('/upload/hwpx', content=iter([b'x' * 40] * 2)).status_code == 413
+
+
+def test_oversized_section_is_refused_before_inflating(client, monkeypatch):
+    monkeypatch.setattr(main, 'MAX_SECTION', 1024)
+    body = _hwpx('<hp:sec xmlns:hp="urn:x">' + ' ' * 4096 + '</hp:sec>')
+    response = client.post('/upload/hwpx', content=body)
+    assert response.status_code == 413
+    assert 'section0.xml' in response.json()['detail']
+
+
+def test_request_past_its_time_limit(client, monkeypatch):
+    monkeypatch.setattr(main, 'REQUEST_TIME_LIMIT', 0.05)
+
+    class SlowExtractor(main.EquationExtractor):
+        def feed(self, data):
+            time.sleep(0.1)
+            return super().feed(data)
+
+    monkeypatch.setattr(main, 'EquationExtractor', SlowExtractor)
+    assert client.post('/upload/hml', content=b'<HWPML><BODY></BODY></HWPML>').status_code == 503
+
+    def slow_convert(script):
+        time.sleep(0.06)
+        return script
+
+    monkeypatch.setattr(client.app.state.converter, 'korean_to_latex', slow_convert)
+    equation = '<hp:equation id="{0}"><hp:script>x</hp:script></hp:equation>'
+    body = _hwpx('<hp:sec xmlns:hp="urn:x">' + ''.join(map(equation.format, range(3))) + '</hp:sec>')
+    records = _records(client.post('/upload/hwpx', content=body))
+    assert len(records) < 4 and records[-1]['error'].startswith('TimeLimitExceeded')
+
+
+def test_preview_renders_the_newest_edit(client):
+    with client.websocket_connect('/ws/preview') as websocket:
+        websocket.send_json({'seq': 1, 'script': '1 over 2'})
+        assert websocket.receive_json() == {'seq': 1, 'latex': r'\frac{1}{2}'}
+
+        # A burst: renders overtaken by a newer edit are never sent
+        script = '1 over 2'
+        for seq, text in enumerate(['x', ' over y', ' + 1'], 2):
+            websocket.send_json({'seq': seq, 'start': len(script), 'end': len(script), 'text': text})
+            script += text
+        seqs = []
+        while not seqs or seqs[-1] != 4:
+            reply = websocket.receive_json()
+            seqs.append(reply['seq'])
+        assert seqs == sorted(seqs)
+        assert reply['latex'] == client.app.state.converter.korean_to_latex(script)
+
+
+
+def test_batch_is_profiled_as_one_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(main.Profiling, 'ENABLED', True)
+    monkeypatch.setattr(main.Profiling, 'DIRECTORY', str(tmp_path))
+    monkeypatch.setattr(main.Profiling, 'RATE', 1.0)
+    sent = []
+
+    async def run():
+        # Three chunks, each converted as it arrives
+        messages = iter([{'type': 'http.request', 'body': f'{{"id": {i}, "expression": "x"}}\n'.encode(),
+                          'more_body': i < 3} for i in (1, 2, 3)])
+
+        async def receive():
+            return next(messages)
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'method': 'POST', 'path': '/batch', 'raw_path': b'/batch',
+                 'query_string': b'', 'headers': [], 'app': main.app}
+        main.app.state.converter = main.CachedConverter(main.KoreanMathConverter())
+        await asyncio.wait_for(main.app(scope, receive, send), 5)
+
+    asyncio.run(run())
+    assert sum(m.get('body', b'').count(b'\n') for m in sent) == 3
+    assert len(list(tmp_path.glob('batch-*.pstats'))) == 1
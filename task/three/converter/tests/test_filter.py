@@ -0,0 +1,36 @@
+import json
+
+from task.three.converter import Filter
+from task.three.converter.Limits import MAX_DEPTH
+
+DEEP = '{' * (MAX_DEPTH + 1) + 'x' + '}' * (MAX_DEPTH + 1)
+
+
+def _lines():
+    lines = [json.dumps({'id': i, 'script': f'{i} over {i + 1}'}).encode() for i in range(40)]
+    lines[5] = b'not json'
+    lines[11] = json.dumps({'id': 11, 'script': DEEP}).encode()
+    lines[17] = json.dumps({'id': 17, 'script': 'x', 'direction': 'sideways'}).encode()
+    lines[23] = json.dumps({'id': 23, 'latex': r'\frac{1}{2}'}).encode()
+    lines[29] = json.dumps({'id': 29, 'script': r'\frac{1}{2}', 'direction': 'latex_to_korean'}).encode()
+    return lines
+
+
+def _records(output):
+    return [json.loads(line) for data, _, _ in output for line in data.splitlines()]
+
+
+def test_two_jobs_keep_input_order_and_errors():
+    serial = list(Filter.iter_output(_lines(), chunk=3))
+    parallel = list(Filter.iter_output(_lines(), jobs=2, chunk=3, window=1))
+    assert parallel == serial
+
+    records = _records(parallel)
+    assert len(records) == 40 and sum(failed for _, failed, _ in parallel) == 4
+    assert [record.get('id') for record in records] == [None if i == 5 else i for i in range(40)]
+    assert records[0] == {'id': 0, 'result': r'\frac{0}{1}'}
+    assert records[5]['error'].startswith('invalid JSON')
+    assert 'error' in records[11]
+    assert records[17]['error'] == "unsupported direction 'sideways'"
+    assert records[23]['error'] == 'expected "script"'
+    assert records[29] == {'id': 29, 'result': '{1} over {2}'}
@@ -0,0 +1,33 @@
+from task.three.converter.Html import HEAD, MATHJAX_URL, MATHML_HEAD, TAIL, iter_html
+from task.three.converter.Limits import ConversionError
+from task.three.converter.Streaming import BREAK, END, EQUATION, PARAGRAPH, TEXT
+
+
+def _document():
+    return [
+        (PARAGRAPH, ''), (TEXT, 'a < b & '), (EQUATION, 'x'), (END, ''),
+        (PARAGRAPH, ''), (END, ''),
+        (PARAGRAPH, ''), (TEXT, 'one'), (BREAK, ''), (EQUATION, 'refused'), (END, ''),
+    ]
+
+
+def _convert(script):
+    if script == 'refused':
+        raise ConversionError('too long')
+    return f'{script}<1'
+
+
+def test_chunks_come_in_document_order():
+    chunks = list(iter_html(_document(), _convert, title='<T>'))
+    assert chunks == [
+        HEAD.format(title='&lt;T&gt;', mathjax=MATHJAX_URL),
+        '<p>a &lt; b &amp; \\(x&lt;1\\)</p>\n',
+        # An empty paragraph writes nothing; a refused script is shown as text
+        '<p>one<br>\\(\\text{refused}\\)</p>\n',
+        TAIL,
+    ]
+
+
+def test_mathml_goes_in_as_it_is():
+    chunks = list(iter_html(_document()[:4], lambda script: '<math/>', mathml=True))
+    assert chunks == [MATHML_HEAD.format(title=''), '<p>a &lt; b &amp; <math/></p>\n', TAIL]
@@ -0,0 +1,45 @@
+import io
+import zipfile
+
+from task.three.converter.HwpxReader import HwpxReader
+
+CONTENT_HPF = '''<opf:package xmlns:opf="http://www.idpf.org/2007/opf/">
+<opf:manifest>
+<opf:item id="s0" href="Contents/section0.xml"/>
+<opf:item id="s1" href="section1.xml"/>
+<opf:item id="s2" href="Contents/section2.xml"/>
+<opf:item id="image" href="BinData/image1.png"/>
+</opf:manifest>
+<opf:spine><opf:itemref idref="s2"/><opf:itemref idref="s0"/></opf:spine>
+</opf:package>'''
+
+
+def _section(*scripts):
+    equations = ''.join(f'<hp:equation id="{i}"><hp:script>{script}</hp:script></hp:equation>'
+                        for i, script in enumerate(scripts))
+    return f'<hp:sec xmlns:hp="urn:x">{equations}</hp:sec>'
+
+
+def _archive(manifest=True):
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, 'w', zipfile.ZIP_DEFLATED) as archive:
+        if manifest:
+            archive.writestr('Contents/content.hpf', CONTENT_HPF)
+        for number in (10, 2, 1, 0):
+            archive.writestr(f'Contents/section{number}.xml', _section(f's{number}'))
+        archive.writestr('BinData/image1.png', b'\x89PNG')
+    data.seek(0)
+    return data
+
+
+def test_spine_order_then_the_rest_of_the_manifest():
+    with HwpxReader(_archive()) as reader:
+        # section1 is relative to content.hpf; section10 is not in the manifest
+        assert reader.sections() == ['Contents/section2.xml', 'Contents/section0.xml', 'Contents/section1.xml']
+        assert [script for _, _, script in reader.iter_equations()] == ['s2', 's0', 's1']
+
+
+def test_without_a_manifest_sections_go_by_number():
+    with HwpxReader(_archive(manifest=False)) as reader:
+        assert reader.sections() == [f'Contents/section{number}.xml' for number in (0, 1, 2, 10)]
+
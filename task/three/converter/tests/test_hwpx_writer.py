@@ -0,0 +1,61 @@
+import os
+import zipfile
+
+from task.three.converter.HwpxReader import HwpxReader
+from task.three.converter.HwpxWriter import HwpxWriter
+
+SAMPLE = os.path.join(os.path.dirname(__file__), '..', '..', 'sample2.hwpx')
+SECTION = ('<hs:sec xmlns:hs="urn:s" xmlns:hp="urn:p"><hp:p>'
+           '<hp:equation id="7"><hp:script>a &#60; b &amp;&#x26; c</hp:script></hp:equation>'
+           '</hp:p></hs:sec>')
+
+
+def _archive(path, section=SECTION):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(zipfile.ZipInfo('mimetype'), 'application/hwp+zip')
+        archive.writestr('Contents/section0.xml', section)
+        archive.writestr('BinData/image1.png', os.urandom(4096))
+    return str(path)
+
+
+def _members(path):
+    with zipfile.ZipFile(path) as archive:
+        return [(info.filename, info.compress_type, archive.read(info)) for info in archive.infolist()]
+
+
+def test_unchanged_sample_is_identical(tmp_path):
+    target = tmp_path / 'out.hwpx'
+    with HwpxWriter(SAMPLE) as writer:
+        assert writer.write(target, script=lambda _, script: None) == 0
+    assert _members(target) == _members(SAMPLE)
+
+
+def test_other_members_keep_their_compressed_bytes(tmp_path):
+    source = _archive(tmp_path / 'in.hwpx')
+    target = tmp_path / 'out.hwpx'
+    with HwpxWriter(source) as writer:
+        writer.write(target, comment=lambda _, script: 'x')
+    with open(source, 'rb') as a, open(target, 'rb') as b:
+        before, after = a.read(), b.read()
+    with zipfile.ZipFile(source) as archive:
+        info = archive.getinfo('BinData/image1.png')
+    start = info.header_offset + 30 + len(info.filename)
+    assert before[start:start + info.compress_size] in after
+
+
+def test_character_references_are_read_like_the_reader(tmp_path):
+    source = _archive(tmp_path / 'in.hwpx')
+    seen = []
+    with HwpxWriter(source) as writer:
+        writer.write(tmp_path / 'out.hwpx', script=lambda _, script: seen.append(script))
+    with HwpxReader(source) as reader:
+        assert seen == [script for _, _, script in reader.iter_equations()] == ['a < b && c']
+
+
+def test_rewritten_script_is_escaped(tmp_path):
+    source = _archive(tmp_path / 'in.hwpx')
+    target = tmp_path / 'out.hwpx'
+    with HwpxWriter(source) as writer:
+        assert writer.write(target, script=lambda _, script: script + ' > 0') == 1
+    with HwpxReader(target) as reader:
+        assert [script for _, _, script in reader.iter_equations()] == ['a < b && c > 0']
@@ -0,0 +1,49 @@
+from task.three.converter.Converter import KoreanMathConverter
+from task.three.converter.Incremental import Manifest, convert_equations, converter_version
+
+
+class CountingConverter(KoreanMathConverter):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def korean_to_latex(self, expression):
+        self.calls += 1
+        return super().korean_to_latex(expression)
+
+
+def test_unchanged_equations_are_reused(tmp_path):
+    converter = CountingConverter()
+    version = converter_version(converter)
+    path = str(tmp_path / 'doc.json')
+    equations = [('1', '{1} over {2}'), ('2', 'x ^{2}'), ('3', 'sqrt {y}')]
+
+    first, manifest = convert_equations(converter, equations, Manifest(version))
+    manifest.save(path)
+    assert (first.reused, first.recomputed, converter.calls) == (0, 3, 3)
+
+    # One edited, one removed, one only respaced
+    edited = [('1', '{1}   over {2}'), ('2', 'x ^{3}')]
+    second, _ = convert_equations(converter, edited, Manifest.load(path, version))
+    assert (second.reused, second.recomputed, second.removed) == (1, 1, 2)
+    assert converter.calls == 4
+    assert [latex for _, _, latex in second.equations] == [r'\frac{1}{2}', 'x^{3}']
+
+
+def test_another_converter_version_recomputes_everything(tmp_path):
+    converter = CountingConverter()
+    path = str(tmp_path / 'doc.json')
+    _, manifest = convert_equations(converter, [('1', 'x')], Manifest(converter_version(converter)))
+    manifest.save(path)
+
+    assert len(Manifest.load(path, converter_version(converter))) == 1
+    assert len(Manifest.load(path, 'other:1')) == 0
+    result, _ = convert_equations(converter, [('1', 'x')], Manifest.load(path, 'other:1'))
+    assert (result.reused, result.recomputed) == (0, 1)
+
+
+def test_repeated_ids_share_outputs_by_script():
+    converter = CountingConverter()
+    _, manifest = convert_equations(converter, [('7', 'a over b')], Manifest('v'))
+    result, _ = convert_equations(converter, [('9', 'a over b'), ('9', 'a over b')], manifest)
+    assert (result.reused, result.recomputed) == (2, 0)
@@ -0,0 +1,52 @@
+import pytest
+
+from task.four.Converter import MathFormulaConverter
+from task.three.converter.Converter import KoreanMathConverter
+from task.three.converter.Converter2 import MathConverter as MathConverter2
+from task.three.converter.Limits import MAX_DEPTH, MAX_LENGTH, ConversionError, fallback_latex
+
+
+@pytest.fixture(scope='module')
+def converter():
+    return KoreanMathConverter()
+
+
+def _nested(depth, opening='{', closing='}'):
+    return opening * depth + 'x' + closing * depth
+
+
+@pytest.mark.parametrize('script', [
+    'x' * (MAX_LENGTH + 1),
+    _nested(MAX_DEPTH + 1),
+    'sqrt ' * (MAX_DEPTH + 1) + 'x',
+    _nested(MAX_DEPTH + 1, 'LEFT ( ', ' RIGHT )'),
+    '{' * 100_000,
+])
+def test_korean_to_latex_refuses(converter, script):
+    with pytest.raises(ConversionError):
+        converter.korean_to_latex(script)
+
+
+@pytest.mark.parametrize('latex', [
+    '\\alpha' * MAX_LENGTH,
+    _nested(MAX_DEPTH + 1),
+    '\\frac{' * (MAX_DEPTH + 1),
+])
+def test_latex_to_korean_refuses(converter, latex):
+    with pytest.raises(ConversionError):
+        converter.latex_to_korean(latex)
+
+
+def test_nesting_under_the_limit_converts(converter):
+    depth = MAX_DEPTH // 2
+    assert converter.korean_to_latex(_nested(depth)) == _nested(depth)
+
+
+def test_rule_engines_refuse_long_scripts():
+    for convert in (MathConverter2().hangul_to_latex, MathFormulaConverter().convert_korean_to_latex):
+        with pytest.raises(ConversionError):
+            convert('1/2 ' * MAX_LENGTH)
+
+
+def test_fallback_is_escaped_text():
+    assert fallback_latex('{50%}') == r'\text{\{50\%\}}'
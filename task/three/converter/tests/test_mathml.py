@@ -0,0 +1,49 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from task.three.benchmarks import sample_scripts
+from task.three.converter.Converter import KoreanMathConverter
+
+M = '{http://www.w3.org/1998/Math/MathML}'
+
+
+@pytest.fixture(scope='module')
+def converter():
+    return KoreanMathConverter()
+
+
+def _tree(converter, script):
+    return ET.fromstring(converter.korean_to_mathml(script))
+
+
+def _shape(element):
+    """``tag(children...)`` without the namespace, leaves with their text."""
+    tag = element.tag.replace(M, '')
+    if len(element):
+        return f"{tag}({' '.join(map(_shape, element))})"
+    return f'{tag}:{element.text}'
+
+
+@pytest.mark.parametrize('script, shape', [
+    ('{1} over {2}', 'math(mfrac(mn:1 mn:2))'),
+    ('sqrt {x}', 'math(msqrt(mi:x))'),
+    ('root {3} of {x}', 'math(mroot(mi:x mn:3))'),
+    ('x^2_1', 'math(msubsup(mi:x mn:1 mn:2))'),
+    ('alpha < 3', 'math(mi:α mo:< mn:3)'),
+    ('"a<b"', 'math(mtext:a<b)'),
+    ('matrix {1 & 2 # 3 & 4}', 'math(mrow(mtable(mtr(mtd(mn:1) mtd(mn:2)) mtr(mtd(mn:3) mtd(mn:4)))))'),
+])
+def test_mathml_structure(converter, script, shape):
+    assert _shape(_tree(converter, script)) == shape
+
+
+def test_fences_stretch_and_atop_has_no_line(converter):
+    fences = _tree(converter, 'LEFT ( a RIGHT )').findall(f'.//{M}mo')
+    assert [(mo.text, mo.get('stretchy')) for mo in fences] == [('(', 'true'), (')', 'true')]
+    assert _tree(converter, '{a} atop {b}').find(f'{M}mfrac').get('linethickness') == '0'
+
+
+def test_every_sample_is_well_formed(converter):
+    for script in sample_scripts():
+        assert _tree(converter, script).tag == f'{M}math'
@@ -0,0 +1,27 @@
+import pytest
+
+from task.four.Converter import MathFormulaConverter
+from task.three.converter import Metrics
+from task.three.converter.Converter import KoreanMathConverter
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    monkeypatch.setattr(Metrics, 'REGISTRY', Metrics.Registry())
+    monkeypatch.setattr(Metrics, 'ENABLED', True)
+    yield Metrics.REGISTRY
+
+
+def test_both_directions_are_timed_by_stage(metrics):
+    converter = KoreanMathConverter()
+    converter.latex_to_korean(converter.korean_to_latex('{1} over {2}'))
+    MathFormulaConverter().convert_korean_to_latex('1/2 ≤ x')
+    assert {'tokenize', 'parse', 'emit', 'latex_parse', 'hwp_emit', 'rule_rewrite'} <= set(metrics.stages)
+    assert metrics.script_length.count == 1
+    assert 'hwp_stage_seconds_count{stage="rule_rewrite"} 1' in Metrics.render()
+
+
+def test_disabled_hooks_are_the_functions_themselves(monkeypatch):
+    monkeypatch.setattr(Metrics, 'ENABLED', False)
+    converter = MathFormulaConverter()
+    assert converter._rewrite == converter.rules.sub
@@ -0,0 +1,59 @@
+import pytest
+
+from task.three.benchmarks import sample_scripts
+from task.three.converter.Bulk import korean_to_latex_many
+from task.three.converter.Converter import KoreanMathConverter
+from task.three.converter.Preview import preview
+
+
+@pytest.fixture(scope='module')
+def converter():
+    return KoreanMathConverter()
+
+
+@pytest.fixture(scope='module')
+def scripts():
+    return sample_scripts()
+
+
+@pytest.mark.parametrize('script, latex', [
+    ('{1} over {3}', r'\frac{1}{3}'),
+    ('sqrt {x+1}', r'\sqrt{x+1}'),
+    ('x ^{2} TIMES y _{1}', r'x^{2}\times y_{1}'),
+    ('LEFT ( a over b RIGHT )', r'\left(\frac{a}{b}\right)'),
+    ('alpha x', r'\alpha x'),
+])
+def test_korean_to_latex(converter, script, latex):
+    assert converter.korean_to_latex(script) == latex
+
+
+@pytest.mark.parametrize('script', ['{1} over {3}', 'sqrt {x+1}', 'LEFT ( a over b RIGHT )', 'alpha x'])
+def test_round_trip(converter, script):
+    latex = converter.korean_to_latex(script)
+    assert converter.korean_to_latex(converter.latex_to_korean(latex)) == latex
+
+
+@pytest.mark.parametrize('latex, script', [
+    (r'\mathbb{R}', 'rm R it'),
+    (r'\hat{x}', 'hat{x}'),
+    (r'\foo{x}+y', r'\foo{x}+y'),
+])
+def test_latex_commands(converter, latex, script):
+    # Unknown commands keep their backslash instead of becoming a variable name
+    assert converter.latex_to_korean(latex) == script
+
+
+def test_sample_round_trip_settles(converter, scripts):
+    # The first trip may add braces (rm C -> {rm C}); after that nothing changes
+    def trip(latex):
+        return converter.korean_to_latex(converter.latex_to_korean(latex))
+
+    for script in scripts:
+        latex = trip(converter.korean_to_latex(script))
+        assert trip(latex) == latex, script
+
+
+def test_bulk_and_preview_match_one_at_a_time(converter, scripts):
+    expected = [converter.korean_to_latex(script) for script in scripts]
+    assert korean_to_latex_many(scripts, converter.korean_to_latex) == expected
+    assert [preview(script) for script in scripts] == expected
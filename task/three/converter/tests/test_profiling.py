@@ -0,0 +1,51 @@
+import pytest
+
+from task.three.converter import Profiling
+
+
+def _work(n):
+    return sum(range(n))
+
+
+@pytest.fixture
+def enabled(tmp_path, monkeypatch):
+    monkeypatch.setattr(Profiling, 'ENABLED', True)
+    monkeypatch.setattr(Profiling, 'DIRECTORY', str(tmp_path))
+    # Profile only the requests that ask for it
+    monkeypatch.setattr(Profiling, 'RATE', 0.0)
+    return tmp_path
+
+
+def test_disabled_hooks_are_the_functions_themselves(tmp_path, monkeypatch):
+    monkeypatch.setattr(Profiling, 'ENABLED', False)
+    monkeypatch.setattr(Profiling, 'DIRECTORY', str(tmp_path))
+    items = iter([1, 2])
+    assert Profiling.profiled('work', _work) is _work
+    assert Profiling.profiled_iter('items', items) is items
+    with Profiling.profile('block'):
+        _work(10)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_only_requested_runs_are_written(enabled):
+    assert Profiling.profiled('work', _work)(1000) == _work(1000)
+    assert list(enabled.iterdir()) == []
+
+    token = Profiling.request(True)
+    try:
+        Profiling.profiled('work', _work)(1000)
+    finally:
+        Profiling.reset(token)
+    assert sorted(path.suffix for path in enabled.iterdir()) == ['.collapsed', '.pstats', '.txt']
+
+
+def test_an_iterator_never_started_writes_nothing(enabled):
+    token = Profiling.request(True)
+    try:
+        items = Profiling.profiled_iter('items', iter([1, 2]))
+        items.close()
+        assert list(enabled.iterdir()) == []
+        assert list(Profiling.profiled_iter('items', iter([1, 2]))) == [1, 2]
+    finally:
+        Profiling.reset(token)
+    assert len(list(enabled.glob('items-*.pstats'))) == 1
@@ -0,0 +1,17 @@
+from task.four.Converter import MathFormulaConverter
+from task.three.converter.Rules import RuleEngine
+
+
+def test_rule_engine_separates_a_trailing_control_word():
+    engine = (RuleEngine()
+              .add_literals('symbols', {'∈': r'\in'})
+              .add('root', r'√(\d)', r'\\sqrt\1'))
+    assert engine.sub('x∈R') == r'x\in R'
+    assert engine.sub('√2x') == r'\sqrt2x'
+
+
+def test_formula_round_trip():
+    converter = MathFormulaConverter()
+    latex = converter.convert_korean_to_latex('∀x∈R, |x| ≥ 0')
+    assert latex == r'\forall x\in R, |x| \geq 0'
+    assert converter.convert_latex_to_korean(latex) == '∀x∈R,|x|≥0'
@@ -0,0 +1,15 @@
+import pytest
+
+from task.three.converter.Substitution import SymbolTable
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('∀x∈R', r'\forall x\in R'),
+    ('x×y', r'x\times y'),
+    ('∀∃x', r'\forall\exists x'),
+    ('x∈ R', r'x\in R'),
+    ('x∈1', r'x\in1'),
+])
+def test_symbol_table_separates_a_trailing_control_word(text, expected):
+    table = SymbolTable({'∀': r'\forall', '∃': r'\exists', '∈': r'\in', '×': r'\times'})
+    assert table.sub(text) == expected
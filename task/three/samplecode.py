@@ -1,11 +1,6 @@
-import hml_equation_parser as hp
-import codecs
+from task.three.converter.Converter import KoreanMathConverter
+from task.three.converter.Html import write_html
 
-doc = hp.parseHmlSample("sample.hml")  # parse hml document and make ElementTree
-
-doc = hp.convertEquationSample(doc)  # find equations from ElementTree and convert them to latex string
-string = hp.extract2HtmlStrSample(doc)  # convert ElementTree to html document with MathJax.
-
-f = codecs.open("sample.hml", "w", "utf8")
-f.write(string)
-f.close()
\ No newline at end of file
+# Paragraph text and \( LaTeX \) equations are written to the file as they are converted,
+# so neither the document tree nor the whole HTML string is built in memory.
+write_html(KoreanMathConverter(), "task/three/sample2.hwpx", "sample.html")
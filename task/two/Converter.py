@@ -1,63 +1,56 @@
-import re
-from typing import List, Dict, Tuple
+from types import MappingProxyType
+from typing import List, Tuple
+
+from task.three.converter.Lexer import OPENING, Token, match_group, tokenize
+from task.three.converter.Metrics import timed
+from task.three.converter.Rules import symbol_profile
+
+
+MATH_SYMBOLS = MappingProxyType({
+    'sqrt': r'\sqrt',
+    'lim': r'\lim',
+    'frac': r'\frac',
+    '->': r'\to',
+    '^': r'^',
+    '{': r'{',
+    '}': r'}'
+})
+
+# 모듈 로드 시 한 번만 컴파일해 모든 인스턴스가 공유
+SYMBOL_RULES = symbol_profile(MATH_SYMBOLS)
 
 
 class AdvancedMathConverter:
+    # 출력이 바뀌면 올려서 캐시·매니페스트에 남은 이전 결과를 쓰지 않게 함
+    VERSION = '2'
+
     def __init__(self):
-        self.math_symbols = {
-            'sqrt': r'\sqrt',
-            'lim': r'\lim',
-            'frac': r'\frac',
-            '->': r'\to',
-            '^': r'^',
-            '{': r'{',
-            '}': r'}'
-        }
-
-    def _extract_sequence(self, text: str, start_pos: int) -> Tuple[str, int]:
+        self.math_symbols = MATH_SYMBOLS
+        self.rules = SYMBOL_RULES
+        # 기호 매핑·분수 등 규칙 치환 단계 (HWP_METRICS가 없으면 원래 함수 그대로)
+        self._rewrite = timed('rule_rewrite', self.rules.sub)
+
+    def _extract_sequence(self, text: str, tokens: List[Token], index: int) -> Tuple[str, int]:
         """수학 표현식에서 시퀀스를 추출하는 메서드"""
-        brackets = {'{': '}', '(': ')', '[': ']'}
-        stack = []
-        sequence = ""
-        i = start_pos
-
-        while i < len(text):
-            char = text[i]
-            if char in brackets.keys():
-                stack.append(char)
-            elif char in brackets.values():
-                if not stack:
-                    break
-                if char == brackets[stack[-1]]:
-                    stack.pop()
-                    if not stack:  # 모든 괄호가 닫힘
-                        sequence += char
-                        i += 1
-                        break
-            sequence += char
-            i += 1
-
-        return sequence, i
+        start = tokens[index].start
+        end, index = match_group(tokens, index)
+        return text[start:end], index
 
     def parse_mathematical_components(self, expression: str) -> List[str]:
         """수학 표현식을 구성 요소로 분해"""
+        tokens = tokenize(expression)
         components = []
         i = 0
-        current_component = ""
 
-        while i < len(expression):
-            if expression[i] in ['{', '(', '[']:
-                seq, new_i = self._extract_sequence(expression, i)
+        while i < len(tokens):
+            if tokens[i].kind in OPENING:
+                seq, i = self._extract_sequence(expression, tokens, i)
                 components.append(seq)
-                i = new_i
             else:
-                current_component += expression[i]
+                token = tokens[i]
+                components.append(expression[token.start:token.end])
                 i += 1
 
-            if current_component.strip():
-                components.append(current_component.strip())
-                current_component = ""
-
         return components
 
     def korean_to_latex(self, expression: str) -> str:
@@ -66,34 +59,11 @@ class AdvancedMathConverter:
         latex = ""
 
         for component in components:
-            # 기본 수학 기호 변환
-            for k, v in self.math_symbols.items():
-                component = component.replace(k, v)
-
-            # 특수 케이스 처리
-            if component.startswith('sqrt'):
-                component = self._handle_sqrt(component)
-            elif component.startswith('lim'):
-                component = self._handle_limit(component)
-            elif component.startswith('frac'):
-                component = self._handle_fraction(component)
-
-            latex += component
+            # 기호 변환 (sqrt, lim, frac도 기호 표에 있음)
+            latex += self._rewrite(component)
 
         return latex
 
-    def _handle_sqrt(self, component: str) -> str:
-        """루트 표현식 처리"""
-        return component.replace('sqrt', r'\sqrt')
-
-    def _handle_limit(self, component: str) -> str:
-        """극한 표현식 처리"""
-        return component.replace('lim', r'\lim')
-
-    def _handle_fraction(self, component: str) -> str:
-        """분수 표현식 처리"""
-        return component.replace('frac', r'\frac')
-
 
 def test_converter():
     """변환기 테스트"""
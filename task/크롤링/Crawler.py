@@ -0,0 +1,273 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+import httpx
+
+from task.three.converter.Batch import EXTENSIONS, TIME_LIMIT, DocumentResult, _init_worker, convert_document
+
+# Requests in flight to one host; the pool as a whole keeps CONNECTIONS open
+PER_HOST = 4
+CONNECTIONS = 32
+# Downloaded documents waiting for a converter; with the downloads in flight, at most
+# QUEUE_SIZE + PER_HOST bodies are held in memory
+QUEUE_SIZE = 8
+RETRIES = 3
+# First retry waits about this long, each further one twice as long
+BACKOFF = 0.5
+MAX_BACKOFF = 30.0
+# Largest document accepted, in bytes
+MAX_BYTES = 64 * 1024 * 1024
+# Responses worth asking again for; any other error status is final
+RETRY_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def is_document(url: str) -> bool:
+    return urlsplit(url).path.lower().endswith(EXTENSIONS)
+
+
+class LinkParser(HTMLParser):
+    """Collects the ``href`` of every link of an HTML page."""
+
+    def __init__(self):
+        super().__init__()
+        self.links: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            self.links.extend(value for name, value in attrs if name == 'href' and value)
+
+
+def document_links(base: str, html: str) -> List[str]:
+    """Absolute URLs of the HWPX/HML documents a page links to, in page order."""
+    parser = LinkParser()
+    parser.feed(html)
+    parser.close()
+    found = dict.fromkeys(urldefrag(urljoin(base, link)).url for link in parser.links)
+    return [url for url in found if is_document(url)]
+
+
+class Fetcher:
+    """GETs over one pooled keep-alive client, at most ``per_host`` at a time per host.
+
+    Connection errors, timeouts and the statuses of RETRY_STATUS are tried
+    again up to ``retries`` times, waiting ``backoff`` seconds doubled each
+    time with full jitter (or the server's ``Retry-After``); the wait
+    happens outside the host's slot, so other downloads keep it busy.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, per_host: int = PER_HOST, retries: int = RETRIES,
+                 backoff: float = BACKOFF, max_bytes: int = MAX_BYTES):
+        self.client = client
+        self.per_host = per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.max_bytes = max_bytes
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    def _slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        slot = self._hosts.get(host)
+        if slot is None:
+            slot = self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return slot
+
+    def _delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after is not None and retry_after.strip().isdigit():
+            return min(float(retry_after), MAX_BACKOFF)
+        return random.uniform(0, min(self.backoff * 2 ** (attempt - 1), MAX_BACKOFF))
+
+    async def _read(self, response: httpx.Response) -> bytes:
+        length = response.headers.get('content-length')
+        if length is not None and length.isdigit() and int(length) > self.max_bytes:
+            raise ValueError(f'{length} bytes (limit {self.max_bytes})')
+        body = bytearray()
+        async for chunk in response.aiter_bytes():
+            body += chunk
+            if len(body) > self.max_bytes:
+                raise ValueError(f'more than {self.max_bytes} bytes')
+        return bytes(body)
+
+    async def get(self, url: str) -> Tuple[bytes, str]:
+        """The body and content type of ``url``; raises httpx.HTTPError once the retries are spent."""
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                async with self._slot(url):
+                    async with self.client.stream('GET', url) as response:
+                        if response.status_code not in RETRY_STATUS or attempt > self.retries:
+                            response.raise_for_status()
+                            return await self._read(response), response.headers.get('content-type', '')
+                        delay = self._delay(attempt, response.headers.get('retry-after'))
+            except httpx.TransportError:
+                if attempt > self.retries:
+                    raise
+                delay = self._delay(attempt)
+            await asyncio.sleep(delay)
+
+
+async def discover(fetcher: Fetcher, seeds: Iterable[str]) -> Tuple[List[str], List[DocumentResult]]:
+    """Document URLs of ``seeds`` (documents as they are, pages by the documents
+    they link to) and a result with an error for each page that failed."""
+    seeds = list(seeds)
+    pages = [url for url in seeds if not is_document(url)]
+    failed: List[DocumentResult] = []
+
+    async def links(url: str) -> List[str]:
+        try:
+            body, content_type = await fetcher.get(url)
+        except (httpx.HTTPError, ValueError) as e:
+            failed.append(DocumentResult(url, [], f'{type(e).__name__}: {e}'))
+            return []
+        if 'html' not in content_type:
+            return []
+        return document_links(url, body.decode('utf-8', 'replace'))
+
+    found = iter(await asyncio.gather(*map(links, pages)))
+    urls: Dict[str, None] = {}
+    for url in seeds:
+        urls.update(dict.fromkeys([url] if is_document(url) else next(found)))
+    return list(urls), failed
+
+
+def _convert(url: str, data: bytes) -> DocumentResult:
+    # The URL's path carries the extension; a query string would hide it
+    return convert_document(urlsplit(url).path, data)._replace(path=url)
+
+
+async def crawl(seeds: Iterable[str], jobs: int = 1, per_host: int = PER_HOST,
+                connections: int = CONNECTIONS, queue_size: int = QUEUE_SIZE,
+                retries: int = RETRIES, backoff: float = BACKOFF, timeout: float = 30.0,
+                seconds: Optional[float] = TIME_LIMIT,
+                client: Optional[httpx.AsyncClient] = None) -> AsyncIterator[DocumentResult]:
+    """Download the documents of ``seeds`` and convert them as they arrive.
+
+    Seeds are document URLs or pages (a directory listing) whose links to
+    ``.hwpx``/``.hml`` files are followed one level. Downloads hand their
+    bytes to ``jobs`` converter processes through a queue of
+    ``queue_size``, so converting overlaps downloading. A download holds
+    one of ``queue_size + per_host`` slots from its request until its
+    document is taken off the queue, so a slow converter stops new
+    downloads instead of piling documents up in memory. Results are
+    yielded as each document finishes, not in input order; a download
+    that fails comes back with an error.
+    """
+    own_client = client is None
+    if own_client:
+        limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+        client = httpx.AsyncClient(limits=limits, timeout=timeout, follow_redirects=True)
+    fetcher = Fetcher(client, per_host, retries, backoff)
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(queue_size)
+    results: asyncio.Queue = asyncio.Queue()
+    # Bodies downloading or waiting in the queue; released when a converter takes one
+    slots = asyncio.Semaphore(queue_size + per_host)
+    done = object()
+
+    async def download(url: str):
+        await slots.acquire()
+        try:
+            data, _ = await fetcher.get(url)
+        except (httpx.HTTPError, ValueError) as e:
+            slots.release()
+            await results.put(DocumentResult(url, [], f'{type(e).__name__}: {e}'))
+            return
+        await queue.put((url, data))
+
+    async def convert(pool: ProcessPoolExecutor):
+        while True:
+            url, data = await queue.get()
+            slots.release()
+            try:
+                result = await loop.run_in_executor(pool, _convert, url, data)
+            except Exception as e:
+                # A crashed worker fails its document, not the crawl
+                result = DocumentResult(url, [], f'{type(e).__name__}: {e}')
+            try:
+                await results.put(result)
+            finally:
+                queue.task_done()
+
+    async def run(pool: ProcessPoolExecutor):
+        converters = [asyncio.create_task(convert(pool)) for _ in range(jobs)]
+        try:
+            urls, failed = await discover(fetcher, seeds)
+            for result in failed:
+                await results.put(result)
+            await asyncio.gather(*map(download, urls))
+            await queue.join()
+        finally:
+            for task in converters:
+                task.cancel()
+            await results.put(done)
+
+    try:
+        with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(None, None, seconds)) as pool:
+            runner = asyncio.create_task(run(pool))
+            try:
+                while (result := await results.get()) is not done:
+                    yield result
+                await runner
+            finally:
+                runner.cancel()
+    finally:
+        if own_client:
+            await client.aclose()
+
+
+async def _main(args: argparse.Namespace):
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    documents = equations = failed = 0
+    start = time.perf_counter()
+    try:
+        async for result in crawl(args.urls, args.jobs, args.per_host, args.connections, args.queue_size,
+                                  args.retries, args.backoff, args.timeout, args.time_limit):
+            record = {
+                'path': result.path,
+                'equations': [{'script': script, 'latex': latex} for script, latex in result.equations],
+            }
+            if result.rejected:
+                record['rejected'] = result.rejected
+            if result.error:
+                record['error'] = result.error
+                failed += 1
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            documents += 1
+            equations += len(result.equations)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"{documents} documents ({failed} failed), {equations} equations in {elapsed:.2f} s",
+          file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='HWPX/HML 문서를 내려받으며 수식을 LaTeX로 변환')
+    parser.add_argument('urls', nargs='+', help='문서 URL 또는 문서 링크가 있는 페이지 URL')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='변환 프로세스 수')
+    parser.add_argument('-o', '--output', help='결과 NDJSON 파일 (기본값: 표준 출력)')
+    parser.add_argument('--per-host', type=int, default=PER_HOST, help='호스트당 동시 요청 수')
+    parser.add_argument('--connections', type=int, default=CONNECTIONS, help='연결 풀의 최대 연결 수')
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE,
+                        help='변환을 기다리는 문서 수, 가득 차면 내려받기를 멈춤')
+    parser.add_argument('--retries', type=int, default=RETRIES, help='요청 실패 시 재시도 횟수')
+    parser.add_argument('--backoff', type=float, default=BACKOFF, help='첫 재시도 대기 시간(초), 매번 두 배')
+    parser.add_argument('--timeout', type=float, default=30.0, help='요청 시간 제한(초)')
+    parser.add_argument('--time-limit', type=float, default=TIME_LIMIT,
+                        help=f'문서 하나의 최대 변환 시간(초), 0이면 제한 없음 (기본값: {TIME_LIMIT:g})')
+    asyncio.run(_main(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()